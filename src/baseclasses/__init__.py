@@ -40,7 +40,13 @@ from nomad.metainfo import MEnum, Quantity, Reference, Section, SectionProxy, Su
 from .atmosphere import Atmosphere
 from .customreadable_identifier import ReadableIdentifiersCustom
 from .helper.add_solar_cell import add_solar_cell
-from .helper.utilities import get_processes, update_archive
+from .helper.utilities import (
+    get_processes,
+    get_processes_bulk,
+    resolve_entity_references,
+    update_archive,
+    write_batch_ids,
+)
 
 
 class PubChemPureSubstanceSectionCustom(PubChemPureSubstanceSection):
@@ -84,28 +90,22 @@ class Batch(Collection):
 
         if self.export_batch_ids and self.entities:
             self.export_batch_ids = False
-            # try:
-            samples = []
-            for sample in self.entities:
-                sample_id = (
+            samples = [
+                (
                     sample.reference.lab_id
                     if sample.reference is not None
-                    else self.lab_id
-                )
-                sample_entry_id = sample.reference.m_parent.entry_id
-                samples.append(
-                    [sample_id]
-                    + [p[1] for p in get_processes(archive, sample_entry_id)]
+                    else self.lab_id,
+                    sample.reference.m_parent.entry_id,
                 )
-            import pandas as pd
-
-            df = pd.DataFrame(samples)
+                for sample in self.entities
+            ]
+            processes = get_processes_bulk(
+                archive, [sample_entry_id for _, sample_entry_id in samples]
+            )
             export_file_name = f'list_of_ids_{self.name}.csv'
             with archive.m_context.raw_file(export_file_name, 'w') as outfile:
-                df.to_csv(outfile.name)
+                write_batch_ids(outfile, samples, processes)
             self.csv_export_file = export_file_name
-            # except BaseException:
-            #     pass
 
 
 class SampleReference(CompositeSystemReference):
@@ -306,8 +306,7 @@ class BaseProcess(Process):
             self.samples = self.batch.entities
 
         if self.samples:
-            for s in self.samples:
-                s.normalize(archive, logger)
+            resolve_entity_references(archive, self.samples, logger)
 
         super().normalize(archive, logger)
 
@@ -530,8 +529,7 @@ class BaseMeasurement(Measurement):
 
     def normalize(self, archive, logger):
         if self.samples:
-            for s in self.samples:
-                s.normalize(archive, logger)
+            resolve_entity_references(archive, self.samples, logger)
         super().normalize(archive, logger)
 
 
@@ -25,7 +25,7 @@ from .spv import SPV
 from .sxm import SXM
 from .tem import TEM
 from .tga import TGA
-from .xas import XAS, XASFluorescence, XASTransmission, XASWithSDD
+from .xas import XAS, XASFluorescence, XASMerge, XASTransmission, XASWithSDD
 from .xpeem import XPEEM
 from .xps import (
     PES,
@@ -22,7 +22,7 @@ from nomad.metainfo import Datetime, MEnum, Quantity, Section
 
 from baseclasses.helper.utilities import get_parameter
 
-from .microscope import Image, SEMMicroscopeTechnique
+from .microscope import Image, SEMMicroscopeTechnique, load_signal
 
 
 class SEMImage_Zeiss_Detector(Image):
@@ -139,17 +139,17 @@ class SEM_Microscope_Merlin(SEMMicroscopeTechnique):
         if file_name.lower().endswith('.tif'):
             from datetime import datetime
 
-            import hyperspy.api as hs
-
             try:
-                tif_file = hs.load(file_name)
+                tif_file = load_signal(file_name)
                 png_file = None
                 if original_file_name:
                     png_file = os.path.splitext(original_file_name)[0] + '_preview.png'
-                    try:
-                        tif_file.save(png_file, overwrite=False)
-                    except Exception:
-                        pass
+                    # only the preview needs the pixel data
+                    if not os.path.exists(png_file):
+                        try:
+                            tif_file.save(png_file, overwrite=False)
+                        except Exception:
+                            pass
 
                 store_resolution = get_parameter(
                     ['CZ_SEM', 'dp_image_store'], tif_file.original_metadata, 1
@@ -104,7 +104,7 @@ class EDXScan(ArchiveSection):
 
 class TEM_EDX(TEMMicroscopeTechnique):
     @staticmethod
-    def get_data(file_name):
+    def get_data(file_name, original_file_name=None):
         if file_name.lower().endswith('.emsa'):
             return None
 
@@ -23,7 +23,12 @@ from nomad.metainfo import Quantity, SubSection
 
 from baseclasses.helper.utilities import get_parameter
 
-from .microscope import Image, MicroscopeConfiguration2, TEMMicroscopeTechnique
+from .microscope import (
+    Image,
+    MicroscopeConfiguration2,
+    TEMMicroscopeTechnique,
+    load_signal,
+)
 
 
 class HighLevel(ArchiveSection):
@@ -104,10 +109,8 @@ class TEM_Gatam_US1000(TEMMicroscopeTechnique):
     @staticmethod
     def get_data(file_name, original_file_name=None):
         if file_name.lower().endswith('.dm3'):
-            import hyperspy.api as hs
-
             try:
-                dm3_file = hs.load(file_name)
+                dm3_file = load_signal(file_name)
                 high_level = HighLevel(
                     binning=get_parameter(
                         [
@@ -23,7 +23,12 @@ from nomad.metainfo import Quantity, Section, SubSection
 
 from baseclasses.helper.utilities import get_parameter
 
-from .microscope import Image, MicroscopeConfiguration2, TEMMicroscopeTechnique
+from .microscope import (
+    Image,
+    MicroscopeConfiguration2,
+    TEMMicroscopeTechnique,
+    load_signal,
+)
 
 
 class Illumination(ArchiveSection):
@@ -104,10 +109,8 @@ class TEM_HAADE(TEMMicroscopeTechnique):
     @staticmethod
     def get_data(file_name, original_file_name=None):
         if file_name.lower().endswith('.tif'):
-            import hyperspy.api as hs
-
             try:
-                tif_file = hs.load(file_name)
+                tif_file = load_signal(file_name)
                 illumination = Illumination(
                     magnification=get_parameter(
                         ['Acquisition_instrument', 'SEM', 'magnification'],
@@ -16,6 +16,7 @@
 # limitations under the License.
 #
 
+import logging
 import os
 
 import numpy as np
@@ -23,6 +24,8 @@ from nomad.metainfo import MEnum, Quantity
 
 from .microscope import Image, TEMMicroscopeTechnique
 
+logger = logging.getLogger(__name__)
+
 
 class Lambda750kImage(Image):
     bit_depth_readout = Quantity(
@@ -77,6 +80,93 @@ class Lambda750kImage(Image):
 
     data_integrated = Quantity(type=np.dtype(np.float64), shape=['*', '*'])
 
+    data_maximum = Quantity(type=np.dtype(np.float64), shape=['*', '*'])
+
+    frame_intensity = Quantity(
+        type=np.dtype(np.float64),
+        shape=['*'],
+        description='The total intensity of every frame.',
+    )
+
+
+# upper limit for the frames read at once by integrate_frames
+BLOCK_SIZE = 64 * 1024**2
+
+
+def get_block_frames(dataset, block_size=BLOCK_SIZE):
+    """
+    Returns how many entries of the first axis are read at once: a multiple of
+    the hdf5 chunk size along that axis which stays below block_size bytes.
+    """
+    entry_size = dataset.dtype.itemsize * int(np.prod(dataset.shape[1:]))
+    chunk_frames = dataset.chunks[0] if dataset.chunks else 1
+    return chunk_frames * max(1, block_size // max(1, chunk_frames * entry_size))
+
+
+def integrate_frames(dataset, block_size=BLOCK_SIZE):
+    """
+    Integrates the frames of a (n, y, x) or (n, m, y, x) detector dataset,
+    reading it in blocks. Returns the sum, mean and maximum image and the total
+    intensity of every frame.
+    """
+    frame_shape = dataset.shape[-2:]
+    block_frames = get_block_frames(dataset, block_size)
+    total = np.zeros(frame_shape, dtype=np.float64)
+    maximum = np.full(frame_shape, -np.inf)
+    intensities = []
+    for start in range(0, dataset.shape[0], block_frames):
+        block = dataset[start : start + block_frames].reshape(-1, *frame_shape)
+        total += block.sum(axis=0, dtype=np.float64)
+        np.maximum(maximum, block.max(axis=0), out=maximum)
+        intensities.append(block.reshape(len(block), -1).sum(axis=1, dtype=np.float64))
+    intensities = np.concatenate(intensities) if intensities else np.zeros(0)
+    mean = total / len(intensities) if len(intensities) else total
+    return total, mean, maximum, intensities
+
+
+def read_lambda750k_image(file_name, nxs_file):
+    data_integrated = data_maximum = frame_intensity = None
+    data = nxs_file.get('/entry/instrument/detector/data')
+    if data is not None and data.shape[0]:
+        data_integrated, _, data_maximum, frame_intensity = integrate_frames(data)
+    image_section = Lambda750kImage(
+        file_name=os.path.basename(file_name),
+        bit_depth_readout=str(
+            nxs_file['/entry/instrument/detector/bit_depth_readout'][()]
+        ),
+        counter_mode=nxs_file['/entry/instrument/detector/collection/counter_mode'][
+            ()
+        ].decode('utf-8'),
+        charge_summing=nxs_file['/entry/instrument/detector/collection/charge_summing'][
+            ()
+        ].decode('utf-8'),
+        number_of_frames=nxs_file[
+            '/entry/instrument/detector/collection/number_of_frames'
+        ][()],
+        shutter_time=nxs_file['/entry/instrument/detector/collection/shutter_time'][()],
+        thresholds=nxs_file['/entry/instrument/detector/collection/thresholds'][()],
+        trigger_mode=nxs_file['/entry/instrument/detector/collection/trigger_mode'][
+            ()
+        ].decode('utf-8'),
+        saturation_value=nxs_file['/entry/instrument/detector/saturation_value'][()],
+        sensor_material=nxs_file['/entry/instrument/detector/sensor_material'][
+            ()
+        ].decode('utf-8'),
+        sensor_thickness=nxs_file['/entry/instrument/detector/sensor_thickness'][()],
+        threshold_energy=nxs_file['/entry/instrument/detector/threshold_energy'][()],
+        trigger_dead_time=nxs_file['/entry/instrument/detector/trigger_dead_time'][()],
+        trigger_delay_time=nxs_file['/entry/instrument/detector/trigger_delay_time'][
+            ()
+        ],
+        type_type=nxs_file['/entry/instrument/detector/type'][()].decode('utf-8'),
+        x_pixel_size=nxs_file['/entry/instrument/detector/x_pixel_size'][()],
+        y_pixel_size=nxs_file['/entry/instrument/detector/y_pixel_size'][()],
+        data_integrated=data_integrated,
+        data_maximum=data_maximum,
+        frame_intensity=frame_intensity,
+    )
+    return image_section
+
 
 class TEM_lambda750k(TEMMicroscopeTechnique):
     gain_mode = Quantity(
@@ -90,69 +180,12 @@ class TEM_lambda750k(TEMMicroscopeTechnique):
             import h5py
 
             try:
-                nxs_file = h5py.File(file_name, 'r')
-
-                # data = np.array(nxs_file['/entry/instrument/detector/data'][()])
-                # ones = np.ones(data.shape[0])
-
-                # data_integrated = np.einsum('i,ijk->jk',ones,data)
-
-                image_section = Lambda750kImage(
-                    file_name=os.path.basename(file_name),
-                    bit_depth_readout=str(
-                        nxs_file['/entry/instrument/detector/bit_depth_readout'][()]
-                    ),
-                    counter_mode=nxs_file[
-                        '/entry/instrument/detector/collection/counter_mode'
-                    ][()].decode('utf-8'),
-                    charge_summing=nxs_file[
-                        '/entry/instrument/detector/collection/charge_summing'
-                    ][()].decode('utf-8'),
-                    number_of_frames=nxs_file[
-                        '/entry/instrument/detector/collection/number_of_frames'
-                    ][()],
-                    shutter_time=nxs_file[
-                        '/entry/instrument/detector/collection/shutter_time'
-                    ][()],
-                    thresholds=nxs_file[
-                        '/entry/instrument/detector/collection/thresholds'
-                    ][()],
-                    trigger_mode=nxs_file[
-                        '/entry/instrument/detector/collection/trigger_mode'
-                    ][()].decode('utf-8'),
-                    saturation_value=nxs_file[
-                        '/entry/instrument/detector/saturation_value'
-                    ][()],
-                    sensor_material=nxs_file[
-                        '/entry/instrument/detector/sensor_material'
-                    ][()].decode('utf-8'),
-                    sensor_thickness=nxs_file[
-                        '/entry/instrument/detector/sensor_thickness'
-                    ][()],
-                    threshold_energy=nxs_file[
-                        '/entry/instrument/detector/threshold_energy'
-                    ][()],
-                    trigger_dead_time=nxs_file[
-                        '/entry/instrument/detector/trigger_dead_time'
-                    ][()],
-                    trigger_delay_time=nxs_file[
-                        '/entry/instrument/detector/trigger_delay_time'
-                    ][()],
-                    type_type=nxs_file['/entry/instrument/detector/type'][()].decode(
-                        'utf-8'
-                    ),
-                    x_pixel_size=nxs_file['/entry/instrument/detector/x_pixel_size'][
-                        ()
-                    ],
-                    y_pixel_size=nxs_file['/entry/instrument/detector/y_pixel_size'][
-                        ()
-                    ],
-                    # data_integrated=data_integrated,
+                with h5py.File(file_name, 'r') as nxs_file:
+                    return read_lambda750k_image(file_name, nxs_file)
+            except Exception:
+                logger.warning(
+                    'Could not read the Lambda 750k file %s.', file_name, exc_info=True
                 )
-                print(type(image_section))
-                return image_section
-            except Exception as e:
-                print(e)
                 return None
 
     def normalize(self, archive, logger):
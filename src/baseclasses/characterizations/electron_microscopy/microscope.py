@@ -23,9 +23,73 @@ from nomad.datamodel.metainfo.eln import Entity
 from nomad.metainfo import MEnum, Quantity, Reference, Section, SubSection
 
 from baseclasses import BaseMeasurement
+from baseclasses.helper.folder_sync import sync_folder
 
 from .TEM_Session import TEM_Session
 
+# number of raw image files fetched at the same time by MicroscopeTechnique
+MAX_IMAGE_WORKERS = 4
+
+
+def get_manifest_name(detector_data_folder):
+    """The raw file with the sync manifest of a detector data folder."""
+    folder = detector_data_folder.strip('/').replace('/', '_')
+    return f'.{folder}.sync_manifest.json'
+
+
+def load_signal(file_name):
+    """
+    Loads a hyperspy signal lazily: only the headers are read, the pixel data
+    is read when it is used, e.g. for a preview.
+    """
+    import hyperspy.api as hs
+
+    return hs.load(file_name, lazy=True)
+
+
+def fetch_image(archive, image, temp_dir):
+    """
+    Returns a local path of an image of the upload and the name of its raw
+    file. The raw file is used in place, it is only copied to temp_dir if the
+    upload files are not on the local file system.
+    """
+    try:
+        path = archive.m_context.upload_files.raw_file_object(image).os_path
+    except AttributeError:
+        path = None
+    if path is not None and os.path.isfile(path):
+        return path, path
+
+    import shutil
+    import tempfile
+
+    with archive.m_context.raw_file(image, 'rb') as f:
+        temp_path = os.path.join(
+            tempfile.mkdtemp(dir=temp_dir), os.path.basename(image)
+        )
+        with open(temp_path, 'wb') as temp_file:
+            shutil.copyfileobj(f, temp_file)
+        return temp_path, f.name
+
+
+def read_images(archive, get_data, images):
+    """
+    Reads the images of the upload with the get_data of a microscope technique
+    and returns the results in the order of images. Only the raw files are
+    fetched in up to MAX_IMAGE_WORKERS threads, get_data runs in the calling
+    thread, as the readers and preview writers are not thread safe.
+    """
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from functools import partial
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with ThreadPoolExecutor(min(MAX_IMAGE_WORKERS, len(images))) as executor:
+            files = executor.map(
+                partial(fetch_image, archive, temp_dir=temp_dir), images
+            )
+            return [get_data(path, original) for path, original in files]
+
 
 class TEMMicroscopeConfiguration(Entity):
     zeroloss_filtered = Quantity(
@@ -113,7 +177,6 @@ class MicroscopeTechnique(BaseMeasurement):
 
     def normalize(self, archive, logger):
         super().normalize(archive, logger)
-        import tempfile
 
         if not self.detector_data and not self.detector_data_folder:
             return
@@ -126,38 +189,38 @@ class MicroscopeTechnique(BaseMeasurement):
             detector_data_folder = os.path.join(
                 '/measurement_data', self.detector_data_folder
             )
-            for file in os.listdir(detector_data_folder):
-                file_with_path = os.path.join(detector_data_folder, file)
-                dst_path = archive.m_context.upload_files._raw_dir.os_path
-                if file not in os.listdir(dst_path):
-                    import shutil
-
-                    shutil.copyfile(file_with_path, os.path.join(dst_path, file))
+            dst_path = archive.m_context.upload_files._raw_dir.os_path
+            folder_files, changed, _ = sync_folder(
+                detector_data_folder,
+                dst_path,
+                os.path.join(dst_path, get_manifest_name(self.detector_data_folder)),
+            )
+            if changed and self.images:
+                # changed files are read again
+                changed = set(changed)
+                self.images = [
+                    img for img in self.images if img.file_name not in changed
+                ]
 
-            imgs.extend(os.listdir(detector_data_folder))
+            imgs.extend(folder_files)
 
         # process images
         # self.detector_data = imgs
-        for image in imgs:
-            with archive.m_context.raw_file(image, 'rb') as f:
-                processed = False
-                for img in self.images:
-                    if img.file_name == image:
-                        processed = True
-                if not processed:
-                    file_content = f.read()
-                    with tempfile.NamedTemporaryFile(
-                        delete=False, suffix='.tif'
-                    ) as temp_file:
-                        temp_file.write(file_content)
-                        temp_file_path = temp_file.name
-                    image_data = self.get_data(temp_file_path, f.name)
-
-                    if image_data:
-                        if not self.images:
-                            self.images = []
-                        self.images.section_def = image_data.m_def
-                        self.images.append(image_data)
+        processed = {img.file_name for img in self.images}
+        new_images = [
+            image
+            for image in dict.fromkeys(imgs)
+            if image not in processed and os.path.basename(image) not in processed
+        ]
+        if not new_images:
+            return
+
+        for image_data in read_images(archive, self.get_data, new_images):
+            if image_data:
+                if not self.images:
+                    self.images = []
+                self.images.section_def = image_data.m_def
+                self.images.append(image_data)
 
 
 class TEMMicroscopeTechnique(MicroscopeTechnique):
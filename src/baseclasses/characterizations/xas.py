@@ -16,15 +16,15 @@
 # limitations under the License.
 #
 
-import json
 
 import numpy as np
 from nomad.datamodel.data import ArchiveSection
 from nomad.datamodel.metainfo.plot import PlotlyFigure, PlotSection
 from nomad.metainfo import Quantity, Reference, Section, SectionProxy, SubSection
-from scipy.optimize import curve_fit
 
-from baseclasses.helper.plotly_plots import make_xas_plot
+from baseclasses.helper.plotly_plots import cached_figure, make_xas_plot
+from baseclasses.helper.sdd_dead_time import fit_dead_time_channels
+from baseclasses.helper.xas_merge import merge_xas_scans
 
 from .. import BaseMeasurement
 
@@ -200,20 +200,17 @@ class SiliconDriftDetector(PlotSection, ArchiveSection):
     def normalize(self, archive, logger):
         super().normalize(archive, logger)
         if self.fluo is not None and self.icr is not None and self.ocr is not None:
-
-            def exp_func(icr, a, k):
-                return a * (1 - np.exp(-k * icr))
-
-            # estimate starting values
-            a0 = self.ocr.max()
-            initial_k = 1e-5
-            try:
-                params, _ = curve_fit(
-                    exp_func, self.icr, self.ocr, p0=(a0, initial_k), maxfev=10000
-                )
-                a_fit, k_fit = params
-            except Exception:
-                a_fit, k_fit = (1, 1)
+            # fit the channels of all detectors of the measurement together, the
+            # other detectors then use the cached fits
+            detectors = [
+                sdd
+                for sdd in getattr(self.m_parent, 'sdd_parameters', None) or []
+                if sdd.icr is not None and sdd.ocr is not None
+            ]
+            if not any(sdd is self for sdd in detectors):
+                detectors.append(self)
+            fits = fit_dead_time_channels([(sdd.icr, sdd.ocr) for sdd in detectors])
+            a_fit, k_fit = next(fit for sdd, fit in zip(detectors, fits) if sdd is self)
 
             self.slope = a_fit * k_fit
             self.fluo_dead_time_corrected = (
@@ -224,9 +221,13 @@ class SiliconDriftDetector(PlotSection, ArchiveSection):
             )
             self.fluo_tlt = self.fluo_dead_time_corrected / self.tlt
             self.fluo_tlt_result = self.fluo_tlt / self.m_parent.k0
-        fig1 = make_xas_plot('OCR/ICR', self.ocr, 'ICR', [self.icr], 'OCR')
         self.figures = [
-            PlotlyFigure(label='OCR vs ICR Plot', figure=json.loads(fig1.to_json())),
+            PlotlyFigure(
+                label='OCR vs ICR Plot',
+                figure=cached_figure(
+                    make_xas_plot, 'OCR/ICR', self.ocr, 'ICR', [self.icr], 'OCR'
+                ),
+            ),
         ]
 
 
@@ -290,22 +291,22 @@ class XASWithSDD(XAS, PlotSection):
 
         self.figures = []
         if self.sdd_parameters is not None:
-            fig1 = make_xas_plot(
+            fig1 = cached_figure(
+                make_xas_plot,
                 'Absorbance of Sample (FluoResult of SDD channels)',
                 self.energy,
                 'Energy',
                 fluo_result_list,
                 'Fluo corrected',
             )
-            self.figures.append(
-                PlotlyFigure(label='SDD overview', figure=json.loads(fig1.to_json()))
-            )
+            self.figures.append(PlotlyFigure(label='SDD overview', figure=fig1))
 
         if (
             self.manual_energy_shift is not None
             and self.absorbance_of_the_sample is not None
         ):
-            fig2 = make_xas_plot(
+            fig2 = cached_figure(
+                make_xas_plot,
                 'Absorbance of Sample',
                 self.energy + self.manual_energy_shift,
                 'Energy (aligned energy scale)',
@@ -313,9 +314,7 @@ class XASWithSDD(XAS, PlotSection):
                 'µ',
             )
             self.figures.append(
-                PlotlyFigure(
-                    label='Sample Absorbance Plot', figure=json.loads(fig2.to_json())
-                )
+                PlotlyFigure(label='Sample Absorbance Plot', figure=fig2)
             )
 
 
@@ -412,3 +411,138 @@ class XASTransmission(XAS):
 
         if self.k1 is not None and self.k0 is not None:
             self.absorbance_of_the_reference = -np.log(self.k3 / self.k1)
+
+
+class XASMerge(PlotSection, ArchiveSection):
+    """Merge of repeated XAS scans of the same edge"""
+
+    scans = Quantity(
+        type=Reference(XAS.m_def),
+        shape=['*'],
+        a_eln=dict(component='ReferenceEditQuantity'),
+    )
+
+    align_to_reference = Quantity(
+        type=bool,
+        description='Aligns the scans by cross-correlating the derivatives of '
+        'their absorbance_of_the_reference (the reference foil). If not set, the '
+        'scans are aligned if all of them have a reference.',
+        a_eln=dict(component='BoolEditQuantity'),
+    )
+
+    outlier_threshold = Quantity(
+        type=np.dtype(np.float64),
+        default=3.5,
+        description='Scans whose RMS deviation from the median scan has a robust '
+        'z-score above this threshold are not merged.',
+        a_eln=dict(component='NumberEditQuantity'),
+    )
+
+    energy_shifts = Quantity(
+        type=np.dtype(np.float64),
+        shape=['*'],
+        unit='keV',
+        description='The energy shift added to every scan for the alignment, NaN '
+        'for the scans without data.',
+    )
+
+    rejected_scans = Quantity(
+        type=int,
+        shape=['*'],
+        description='The indices in scans of the scans that were not merged.',
+    )
+
+    energy = Quantity(
+        type=np.dtype(np.float64),
+        shape=['*'],
+        unit='keV',
+        description='The energy range covered by all scans.',
+    )
+
+    absorbance_of_the_sample = Quantity(
+        type=np.dtype(np.float64),
+        shape=['*'],
+        description='The mean absorbance_of_the_sample of the merged scans.',
+        a_plot=[
+            {
+                'x': 'energy',
+                'y': 'absorbance_of_the_sample',
+                'layout': {
+                    'yaxis': {'fixedrange': False},
+                    'xaxis': {'fixedrange': False},
+                },
+            }
+        ],
+    )
+
+    absorbance_uncertainty = Quantity(
+        type=np.dtype(np.float64),
+        shape=['*'],
+        description='The standard error of the mean absorbance_of_the_sample.',
+    )
+
+    def normalize(self, archive, logger):
+        super().normalize(archive, logger)
+        # positions in self.scans of the scans that can be merged
+        positions = [
+            index
+            for index, scan in enumerate(self.scans or [])
+            if scan.energy is not None
+            and getattr(scan, 'absorbance_of_the_sample', None) is not None
+        ]
+        if not positions:
+            return
+        skipped = sorted(set(range(len(self.scans))) - set(positions))
+        if skipped:
+            logger.warning(
+                f'the scans {skipped} have no energy or absorbance_of_the_sample '
+                'and are not merged'
+            )
+        scans = [self.scans[index] for index in positions]
+
+        energies = [scan.energy.to('keV').magnitude for scan in scans]
+        for index, scan in enumerate(scans):
+            if scan.manual_energy_shift is not None:
+                energies[index] = (
+                    energies[index] + scan.manual_energy_shift.to('keV').magnitude
+                )
+        references = [
+            getattr(scan, 'absorbance_of_the_reference', None) for scan in scans
+        ]
+        if any(reference is None for reference in references):
+            if self.align_to_reference:
+                logger.warning('not all scans have a reference absorbance to align')
+            references = None
+        elif self.align_to_reference is False:
+            references = None
+
+        try:
+            merged = merge_xas_scans(
+                energies,
+                [scan.absorbance_of_the_sample for scan in scans],
+                references,
+                self.outlier_threshold,
+            )
+        except ValueError as e:
+            logger.warning('could not merge the XAS scans', exc_info=e)
+            return
+
+        self.energy = merged.energy
+        self.absorbance_of_the_sample = merged.absorbance
+        self.absorbance_uncertainty = merged.uncertainty
+        energy_shifts = np.full(len(self.scans), np.nan)
+        energy_shifts[positions] = merged.shifts
+        self.energy_shifts = energy_shifts
+        self.rejected_scans = sorted(
+            skipped + [positions[index] for index in merged.rejected]
+        )
+
+        fig = cached_figure(
+            make_xas_plot,
+            'Merged Absorbance of Sample',
+            self.energy,
+            'Energy',
+            [merged.absorbance],
+            'µ',
+        )
+        self.figures = [PlotlyFigure(label='Merged Absorbance', figure=fig)]
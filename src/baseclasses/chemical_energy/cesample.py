@@ -31,6 +31,8 @@ from nomad.metainfo import Datetime, Quantity, Reference, Section, SubSection
 from baseclasses import PubChemPureSubstanceSectionCustom
 
 from .. import ReadableIdentifiersCustom
+from ..helper.chemical_formula import set_material_formulas
+from ..helper.id_allocator import next_sample_number, reserve_sample_number
 from ..helper.utilities import log_error
 
 
@@ -80,7 +82,6 @@ class SampleIDCE(ReadableIdentifiersCustom):
 
     def normalize(self, archive, logger):
         super().normalize(archive, logger)
-        from nomad.app.v1.models import MetadataPagination
 
         if self.institute and self.short_name and self.owner:
             from unidecode import unidecode
@@ -105,23 +106,19 @@ class SampleIDCE(ReadableIdentifiersCustom):
             owner='all', query=query, user_id=archive.metadata.main_author.user_id
         )
 
-        if self.project_sample_number is None or (
-            len(search_result_1.data) != 0
-            and archive.metadata.entry_id
-            not in [d['entry_id'] for d in search_result_1.data]
-        ):
-            query = {'results.eln.lab_ids': self.lab_id}
-            pagination = MetadataPagination()
-            pagination.page_size = 9999
-            search_result = search(
-                owner='all',
-                query=query,
-                pagination=pagination,
-                user_id=archive.metadata.main_author.user_id,
+        query = {'results.eln.lab_ids': self.lab_id}
+        if (
+            self.project_sample_number is None
+            or (
+                len(search_result_1.data) != 0
+                and archive.metadata.entry_id
+                not in [d['entry_id'] for d in search_result_1.data]
             )
-            self.project_sample_number = get_next_project_sample_number(
-                search_result.data, archive.metadata.entry_id
+            or not reserve_sample_number(
+                archive, self.lab_id, query, self.project_sample_number
             )
+        ):
+            self.project_sample_number = next_sample_number(archive, self.lab_id, query)
 
         if self.lab_id is not None and self.project_sample_number is not None:
             sample_id_old = self.lab_id
@@ -147,26 +144,12 @@ def build_initial_id(institute, owner, datetime=None):
 
 
 def create_id(archive, lab_id_base):
-    from nomad.app.v1.models import MetadataPagination
-    from nomad.search import search
+    if lab_id_base is None or archive.data.lab_id:
+        return
 
     query = {'results.eln.lab_ids': lab_id_base}
-    pagination = MetadataPagination()
-    pagination.page_size = 9999
-    search_result = search(
-        owner='all',
-        query=query,
-        pagination=pagination,
-        user_id=archive.metadata.main_author.user_id,
-    )
-    project_sample_number = get_next_project_sample_number(
-        search_result.data, archive.metadata.entry_id
-    )
-
-    if lab_id_base is not None and project_sample_number is not None:
-        lab_id = f'{lab_id_base}_{project_sample_number:04d}'
-        if not archive.data.lab_id:
-            archive.data.lab_id = lab_id
+    project_sample_number = next_sample_number(archive, lab_id_base, query)
+    archive.data.lab_id = f'{lab_id_base}_{project_sample_number:04d}'
 
 
 class SampleIDCE2(ReadableIdentifiersCustom):
@@ -264,33 +247,8 @@ class CESample(CompositeSystem):
             if not archive.results.material:
                 archive.results.material = Material()
             material = archive.results.material
-            from ase import Atoms
-            from pymatgen.core import Composition
-
             try:
-                formulas = [
-                    Atoms(
-                        Composition(formula.strip()).get_integer_formula_and_factor()[0]
-                    )
-                    for formula in self.chemical_composition_or_formulas.split(',')
-                    if formula
-                ]
-                elements = []
-                for f in formulas:
-                    elements.extend(f.get_chemical_symbols())
-                material.elements = []
-                material.elements = list(set(elements))
-                if len(formulas) == 1:
-                    formula = formulas[0]
-                    material.chemical_formula_hill = formula.get_chemical_formula(
-                        mode='hill'
-                    )
-                    material.chemical_formula_reduced = formula.get_chemical_formula(
-                        mode='reduce'
-                    )
-                    material.chemical_formula_descriptive = (
-                        self.chemical_composition_or_formulas
-                    )
+                set_material_formulas(material, self.chemical_composition_or_formulas)
             except Exception:
                 log_error(
                     self,
@@ -17,7 +17,6 @@
 #
 import numpy as np
 import plotly.graph_objects as go
-from nomad.atomutils import Formula
 from nomad.datamodel.metainfo.basesections import (
     CompositeSystem,
     CompositeSystemReference,
@@ -28,6 +27,8 @@ from nomad.metainfo import Datetime, Quantity, Reference, SubSection
 from unidecode import unidecode
 
 from baseclasses import PubChemPureSubstanceSectionCustom
+from baseclasses.helper.chemical_formula import parse_formula
+from baseclasses.helper.plotly_plots import cached_figure, decimate
 from baseclasses.helper.utilities import create_short_id, export_lab_id
 
 from .. import BaseMeasurement
@@ -90,36 +91,27 @@ class ElectrolyserProperties(CompositeSystem):
 
     cathode = SubSection(section_def=NESDElectrode)
 
-    def is_valid_formula(self, formula, logger):
+    def get_formula_elements(self, formula, logger):
         try:
-            Formula(formula)
-            return True
+            return parse_formula(formula).elements
         except Exception as e:
             logger.warn('Could not analyse material', exc_info=e)
-            return False
+            return ()
 
     def normalize(self, archive, logger):
         if not self.lab_id:
             self.lab_id = make_nesd_id(archive)
-        elements = ''
-        if self.cathode:
-            if self.is_valid_formula(self.cathode.catalyst, logger):
-                elements += self.cathode.catalyst
-            if self.is_valid_formula(self.cathode.electrode_material.name, logger):
-                elements += self.cathode.electrode_material.name
-        if self.anode:
-            if self.is_valid_formula(self.anode.catalyst, logger):
-                elements += self.anode.catalyst
-            if self.is_valid_formula(self.anode.electrode_material.name, logger):
-                elements += self.anode.electrode_material.name
+        elements = set()
+        for electrode in [self.cathode, self.anode]:
+            if electrode:
+                elements.update(self.get_formula_elements(electrode.catalyst, logger))
+                elements.update(
+                    self.get_formula_elements(electrode.electrode_material.name, logger)
+                )
         if elements and not archive.results:
             archive.results = Results()
         archive.results.material = Material()
-        try:
-            formula = Formula(elements, unknown='remove')
-            archive.results.material.elements = list(set(formula.elements()))
-        except Exception as e:
-            logger.warn('Could not analyse material', exc_info=e)
+        archive.results.material.elements = list(elements)
         super().normalize(archive, logger)
 
 
@@ -178,12 +170,14 @@ class ElectrolyserPerformanceEvaluation(BaseMeasurement, PlotSection):
     )
 
     def make_flow_figure(self):
+        h2_time, h2_flow = decimate(self.time, self.h2_flow)
+        o2_time, o2_flow = decimate(self.time, self.o2_flow)
         fig = go.Figure(
             data=[
                 go.Scatter(
                     name='H2 Flow',
-                    x=self.time,
-                    y=self.h2_flow,
+                    x=h2_time,
+                    y=h2_flow,
                     line=dict(color='green'),
                 )
             ]
@@ -191,8 +185,8 @@ class ElectrolyserPerformanceEvaluation(BaseMeasurement, PlotSection):
         fig.add_traces(
             go.Scatter(
                 name='O2 Flow',
-                x=self.time,
-                y=self.o2_flow,
+                x=o2_time,
+                y=o2_flow,
                 yaxis='y2',
                 line=dict(color='red'),
             )
@@ -221,8 +215,10 @@ class ElectrolyserPerformanceEvaluation(BaseMeasurement, PlotSection):
 
     def normalize(self, archive, logger):
         if self.h2_flow is not None:
-            fig1 = self.make_flow_figure()
+            fig1 = cached_figure(
+                self.make_flow_figure, key_data=(self.time, self.h2_flow, self.o2_flow)
+            )
             self.figures = [
-                PlotlyFigure(label='H2 O2 Flow Figure', figure=fig1.to_plotly_json()),
+                PlotlyFigure(label='H2 O2 Flow Figure', figure=fig1),
             ]
         super().normalize(archive, logger)
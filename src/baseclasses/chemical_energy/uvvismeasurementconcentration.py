@@ -26,6 +26,7 @@ from nomad.metainfo import MProxy, Quantity, Reference, Section
 
 from baseclasses.solar_energy import UVvisData
 
+from ..helper.plotly_plots import cached_figure, decimate
 from ..helper.utilities import get_reference
 
 
@@ -86,6 +87,27 @@ class UVvisDataConcentration(UVvisData, PlotSection):
         a_eln=dict(component='ReferenceEditQuantity', label='Concentration Detection'),
     )
 
+    def make_uvvis_figure(self):
+        wavelength, intensity = decimate(self.wavelength, self.intensity)
+        fig = go.Figure(
+            data=[go.Scatter(name='UVvis', x=wavelength, y=intensity, mode='lines')]
+        )
+        fig.update_layout(
+            xaxis_title=f'Wavelength [{self.wavelength.units}]',
+            yaxis_title='Intensity',
+            title_text='UVvis',
+        )
+        fig.update_layout(xaxis={'fixedrange': False})
+        if self.peak_value is not None and self.peak_wavelength is not None:
+            fig.add_traces(
+                go.Scatter(
+                    x=[self.peak_wavelength.magnitude],
+                    y=[self.peak_value],
+                    mode='markers',
+                )
+            )
+        return fig
+
     def normalize(self, archive, logger):
         super().normalize(archive, logger)
 
@@ -135,28 +157,16 @@ class UVvisDataConcentration(UVvisData, PlotSection):
                 self.peak_value = peak['intensity']
                 self.peak_wavelength = peak['wavelength']
 
-            fig = go.Figure(
-                data=[
-                    go.Scatter(
-                        name='UVvis', x=self.wavelength, y=self.intensity, mode='lines'
-                    )
-                ]
-            )
-            fig.update_layout(
-                xaxis_title=f'Wavelength [{self.wavelength.units}]',
-                yaxis_title='Intensity',
-                title_text='UVvis',
+            fig = cached_figure(
+                self.make_uvvis_figure,
+                key_data=(
+                    self.wavelength,
+                    self.intensity,
+                    self.peak_wavelength,
+                    self.peak_value,
+                ),
             )
-            fig.update_layout(xaxis={'fixedrange': False})
-            if self.peak_value is not None and self.peak_wavelength is not None:
-                fig.add_traces(
-                    go.Scatter(
-                        x=[self.peak_wavelength.magnitude],
-                        y=[self.peak_value],
-                        mode='markers',
-                    )
-                )
-            self.figures = [PlotlyFigure(label='figure 1', figure=fig.to_plotly_json())]
+            self.figures = [PlotlyFigure(label='figure 1', figure=fig)]
 
         if (
             self.chemical_composition_or_formulas
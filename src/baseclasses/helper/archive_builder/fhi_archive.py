@@ -29,13 +29,13 @@ def get_xrd_data_entry(archive, data_files):
 
     for data_file in data_files:
         if os.path.splitext(data_file)[-1] == '.uxd':
-            from baseclasses.helper.file_parser.fhi_parsers import readUXD
+            from baseclasses.helper.file_parser.fhi_parsers import read_uxd
 
             with archive.m_context.raw_file(data_file) as f:
-                data = readUXD(f.name)
+                data, metadata = read_uxd(f.name)
 
                 with archive.m_context.raw_file(f'_{data_file}.json', 'w') as outfile:
-                    json.dump(readUXD(f.name, False), outfile)
+                    json.dump(metadata, outfile)
 
                 datarange = 1
                 while True:
@@ -58,10 +58,10 @@ def get_xrd_data_entry(archive, data_files):
                         break
 
         if os.path.splitext(data_file)[-1] == '.xy':
-            from baseclasses.helper.file_parser.fhi_parsers import readXY
+            from baseclasses.helper.file_parser.fhi_parsers import read_xy
 
             with archive.m_context.raw_file(data_file) as f:
-                data = readXY(f.name)
+                data = read_xy(f.name)
 
                 xrr_data_entry = XRDShiftedData()
                 xrr_data_entry.model = 'XRD, TOPAS, EVA'
@@ -79,13 +79,13 @@ def get_xrr_data_entry(archive, data_files):
     measurement = None
     for data_file in data_files:
         if os.path.splitext(data_file)[-1] == '.uxd':
-            from baseclasses.helper.file_parser.fhi_parsers import readUXD
+            from baseclasses.helper.file_parser.fhi_parsers import read_uxd
 
             with archive.m_context.raw_file(data_file) as f:
-                data = readUXD(f.name)
+                data, metadata = read_uxd(f.name)
 
                 with archive.m_context.raw_file(f'_{data_file}.json', 'w') as outfile:
-                    json.dump(readUXD(f.name, False), outfile)
+                    json.dump(metadata, outfile)
                 xrr_data_entry = XRRData()
                 xrr_data_entry.angle_type = '2THETA'
                 xrr_data_entry.angle = data[' Detector type  Scintillation counter'][
@@ -98,10 +98,10 @@ def get_xrr_data_entry(archive, data_files):
                 measurement = xrr_data_entry
 
         if os.path.splitext(data_file)[-1] == '.ray':
-            from baseclasses.helper.file_parser.fhi_parsers import readRayFile
+            from baseclasses.helper.file_parser.fhi_parsers import read_ray_file
 
             with archive.m_context.raw_file(data_file) as f:
-                data, data_nice = readRayFile(f.name)
+                data, data_nice = read_ray_file(f.name)
 
                 with archive.m_context.raw_file(f'_{data_file}.json', 'w') as outfile:
                     json.dump(data_nice, outfile)
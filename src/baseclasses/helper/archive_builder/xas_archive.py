@@ -1,7 +1,74 @@
+from collections import namedtuple
 from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
 
 from baseclasses.characterizations.xas import SiliconDriftDetector
 
+# quantity -> (column, factor) of the beamline formats, the first column in a
+# file is used
+XAS_COLUMNS = {
+    'energy': [('#monoE', 1.0), ('monoE', 1.0), ('mono_eV', 1e-3), ('monoE_eV', 1e-3)],
+    'seconds': [('Seconds', 1.0), ('time_ms', 1e-3)],
+    'k0': [('K0', 1.0), ('I0_A', 1.0)],
+    'k1': [('K1', 1.0), ('I1_A', 1.0)],
+    'k3': [('K3', 1.0), ('I2_A', 1.0)],
+}
+
+SDD_CHANNELS = 13
+SDD_COLUMNS = {
+    'fluo': 'fluo.{}',
+    'icr': 'ICR.{}',
+    'ocr': 'OCR.{}',
+    'tlt': 'TLT.{}',
+    'lt': 'LT.{}',
+    'rt': 'RT.{}',
+}
+
+XASColumnMap = namedtuple('XASColumnMap', ['quantities', 'indices', 'factors', 'sdd'])
+XASColumnMap.__doc__ = """
+The columns of a file header: the XAS quantities found, the indices and factors
+of all used columns and for every SDD channel its (quantity, position) pairs.
+The XAS quantities come first in indices.
+"""
+
+
+def register_xas_column(quantity, column, factor=1.0):
+    """Adds the column of a beamline format for an XAS quantity."""
+    XAS_COLUMNS[quantity].append((column, factor))
+    get_xas_column_map.cache_clear()
+
+
+@lru_cache(maxsize=64)
+def get_xas_column_map(header):
+    positions = {}
+    for index, column in enumerate(header):
+        positions.setdefault(column, index)
+
+    quantities, indices, factors = [], [], []
+    for quantity, columns in XAS_COLUMNS.items():
+        for column, factor in columns:
+            if column in positions:
+                quantities.append(quantity)
+                indices.append(positions[column])
+                factors.append(factor)
+                break
+
+    sdd = []
+    for channel in range(SDD_CHANNELS):
+        channel_quantities = []
+        for quantity, column in SDD_COLUMNS.items():
+            if column.format(channel) in positions:
+                channel_quantities.append((quantity, len(indices)))
+                indices.append(positions[column.format(channel)])
+                factors.append(1.0)
+        sdd.append(tuple(channel_quantities))
+
+    return XASColumnMap(
+        tuple(quantities), np.array(indices, dtype=int), np.array(factors), tuple(sdd)
+    )
+
 
 def get_xas_archive(data, dateline, entry_class):
     if dateline is not None:
@@ -15,57 +82,18 @@ def get_xas_archive(data, dateline, entry_class):
             raise ValueError('Unknown Date format')
         entry_class.datetime = datetime_object.strftime('%Y-%m-%d %H:%M:%S.%f')
 
-    entry_class.energy = (
-        data['#monoE']
-        if '#monoE' in data.columns
-        else data['monoE']
-        if 'monoE' in data.columns
-        else data['mono_eV'] / 1000
-        if 'mono_eV' in data.columns
-        else data['monoE_eV'] / 1000
-        if 'monoE_eV' in data.columns
-        else None
-    )
-    entry_class.seconds = (
-        data['Seconds']
-        if 'Seconds' in data.columns
-        else data['time_ms'] / 1000
-        if 'time_ms' in data.columns
-        else None
-    )
-    entry_class.k0 = (
-        data['K0']
-        if 'K0' in data.columns
-        else data['I0_A']
-        if 'I0_A' in data.columns
-        else None
-    )
-    entry_class.k1 = (
-        data['K1']
-        if 'K1' in data.columns
-        else data['I1_A']
-        if 'I1_A' in data.columns
-        else None
-    )
-    entry_class.k3 = (
-        data['K3']
-        if 'K3' in data.columns
-        else data['I2_A']
-        if 'I2_A' in data.columns
-        else None
+    column_map = get_xas_column_map(tuple(data.columns))
+    values = (
+        data.iloc[:, column_map.indices].to_numpy(dtype=np.float64) * column_map.factors
     )
 
-    kmc3_data = []
-
-    for index in range(0, 13):
-        kmc3_data.append(
-            SiliconDriftDetector(
-                fluo=data.get(f'fluo.{index}'),
-                icr=data.get(f'ICR.{index}'),
-                ocr=data.get(f'OCR.{index}'),
-                tlt=data.get(f'TLT.{index}'),
-                lt=data.get(f'LT.{index}'),
-                rt=data.get(f'RT.{index}'),
-            )
+    found = dict(zip(column_map.quantities, values.T))
+    for quantity in XAS_COLUMNS:
+        setattr(entry_class, quantity, found.get(quantity))
+
+    entry_class.sdd_parameters = [
+        SiliconDriftDetector(
+            **{quantity: values[:, position] for quantity, position in channel}
         )
-    entry_class.sdd_parameters = kmc3_data
+        for channel in column_map.sdd
+    ]
@@ -0,0 +1,131 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Columnar reading of catalytic reaction csv files.
+
+The header is classified once into reactant, feed and product columns, the
+product columns of the form '<quantity> <product> (%)' are read into one matrix
+of shape (quantity, product, run).
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# column prefix -> Product quantity
+PRODUCT_QUANTITIES = {
+    'x_p': 'exchange',
+    'S_p': 'selectivity',
+    'x_r': 'relative_rate',
+    'r': 'absolute_rate',
+}
+# column prefix -> quantity of the reaction data or feed
+REACTION_COLUMNS = {
+    'temperature': 'temperature',
+    'C-balance': 'c_balance',
+    'GHSV': 'flow_volume',
+}
+REACTANT_PREFIX = 'x'
+
+ReactionHeader = namedtuple(
+    'ReactionHeader', ['reactants', 'columns', 'products', 'product_columns', 'used']
+)
+ReactionHeader.__doc__ = """
+The classified columns of a header: (name, column) of the reactants, the column
+of every REACTION_COLUMNS quantity, the product names and their column for every
+PRODUCT_QUANTITIES quantity (-1 if missing) and whether any column was used.
+"""
+
+ReactionTable = namedtuple(
+    'ReactionTable',
+    ['number_of_runs', 'reactants', 'amounts', 'columns', 'products', 'values'],
+)
+ReactionTable.__doc__ = """
+The reactant names and their amounts (reactant, run), the REACTION_COLUMNS
+quantities found, and the product names with their values (quantity, product,
+run) in the order of PRODUCT_QUANTITIES, missing product columns are zero.
+"""
+
+
+@lru_cache(maxsize=64)
+def compile_reaction_header(header):
+    reactants, columns, product_index = [], {}, {}
+    quantity_columns = {}
+    used = False
+    for index, column in enumerate(header):
+        parts = column.split(' ')
+        if len(parts) < 2:
+            continue
+        used = True
+        prefix, name = parts[0], parts[1]
+        if prefix == REACTANT_PREFIX:
+            reactants.append((name, index))
+        if prefix in REACTION_COLUMNS:
+            columns[REACTION_COLUMNS[prefix]] = index
+        if len(parts) < 3 or parts[2] != '(%)':
+            continue
+        # products are ordered by their last column
+        product_index.pop(name, None)
+        product_index[name] = index
+        if prefix in PRODUCT_QUANTITIES:
+            quantity_columns[(prefix, name)] = index
+
+    products = tuple(product_index)
+    product_columns = np.full((len(PRODUCT_QUANTITIES), len(products)), -1)
+    for row, prefix in enumerate(PRODUCT_QUANTITIES):
+        for position, name in enumerate(products):
+            product_columns[row, position] = quantity_columns.get((prefix, name), -1)
+    product_columns.flags.writeable = False
+    return ReactionHeader(tuple(reactants), columns, products, product_columns, used)
+
+
+def read_reaction_table(data):
+    """Reads the classified columns of the dataframe data with one conversion."""
+    header = compile_reaction_header(tuple(data.columns))
+    number_of_runs = len(data) if header.used else 0
+
+    present = header.product_columns >= 0
+    indices = [index for _, index in header.reactants]
+    indices += header.columns.values()
+    indices += header.product_columns[present].tolist()
+    values = data.iloc[:, indices].to_numpy(dtype=np.float64).T
+
+    first_column = len(header.reactants)
+    first_product = first_column + len(header.columns)
+    amounts = values[:first_column]
+    columns = dict(zip(header.columns, values[first_column:first_product]))
+    product_values = np.zeros((*header.product_columns.shape, number_of_runs))
+    product_values[present] = values[first_product:]
+    return ReactionTable(
+        number_of_runs,
+        [name for name, _ in header.reactants],
+        amounts,
+        columns,
+        list(header.products),
+        product_values,
+    )
+
+
+def product_yields(table):
+    """The yield (%) of every product and run, exchange * selectivity / 100."""
+    quantities = list(PRODUCT_QUANTITIES.values())
+    exchange = table.values[quantities.index('exchange')]
+    selectivity = table.values[quantities.index('selectivity')]
+    return exchange * selectivity / 100
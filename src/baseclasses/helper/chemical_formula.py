@@ -0,0 +1,89 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Parsing of chemical formulas shared by the schemas. Every formula is parsed
+once per process; the results are cached and must not be modified.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+ParsedFormula = namedtuple(
+    'ParsedFormula', ['formula', 'reduced', 'hill', 'elements', 'stoichiometry']
+)
+ParsedFormula.__doc__ = """
+The reduced and hill formula, the elements in order of appearance and the
+stoichiometry as ``(element, count)`` pairs of the integer formula.
+"""
+
+
+@lru_cache(maxsize=4096)
+def parse_formula(formula):
+    """
+    Parses a formula with pymatgen (which allows fractions and brackets) and
+    scales it to integers. Raises an exception if it cannot be parsed.
+    """
+    from ase.data import atomic_numbers
+    from ase.formula import Formula
+    from pymatgen.core import Composition
+
+    formula = formula.strip()
+    integer_formula = Formula(Composition(formula).get_integer_formula_and_factor()[0])
+    stoichiometry = tuple(integer_formula.count().items())
+    for element, _ in stoichiometry:
+        if element not in atomic_numbers:
+            raise ValueError(f'Unknown element {element} in formula {formula}')
+    return ParsedFormula(
+        formula=formula,
+        reduced=integer_formula.format('reduce'),
+        hill=integer_formula.format('hill'),
+        elements=tuple(element for element, _ in stoichiometry),
+        stoichiometry=stoichiometry,
+    )
+
+
+def parse_formulas(formulas):
+    """Parses a comma separated list of formulas, skipping empty ones."""
+    return [parse_formula(formula) for formula in formulas.split(',') if formula]
+
+
+@lru_cache(maxsize=4096)
+def _formula_elements(formula):
+    from ase.formula import Formula
+
+    return tuple(Formula(formula).count())
+
+
+def formula_elements(formula):
+    """Returns the elements of a plain formula, parsed with ase only."""
+    return list(_formula_elements(formula))
+
+
+def set_material_formulas(material, formulas):
+    """
+    Sets the elements of a results material from a comma separated list of
+    formulas, and the hill and reduced formula if there is only one.
+    """
+    parsed = parse_formulas(formulas)
+    material.elements = []
+    material.elements = list({e for formula in parsed for e in formula.elements})
+    if len(parsed) == 1:
+        material.chemical_formula_hill = parsed[0].hill
+        material.chemical_formula_reduced = parsed[0].reduced
+        material.chemical_formula_descriptive = formulas
@@ -5,6 +5,7 @@ Created on Tue Jul  5 10:11:18 2022
 @author: a2853
 """
 
+import itertools
 from configparser import ConfigParser
 
 from openpyxl import load_workbook
@@ -15,86 +16,242 @@ def getGid(pid):
     return '-'.join(split)
 
 
+# None is any whitespace
+TEXT_DELIMITERS = ('\t', ',', ';', None)
+
+
+def _numbers(fields):
+    try:
+        return [float(field) for field in fields]
+    except ValueError:
+        return None
+
+
+def sniff_text_table(datafile, max_lines=200):
+    """
+    Returns the number of header lines, the delimiter and the number of columns
+    of the numeric table (at least two columns) in a text file from its first
+    lines.
+    """
+    with open(datafile, errors='replace') as file:
+        for n, line in enumerate(itertools.islice(file, max_lines)):
+            stripped_line = line.strip()
+            for delimiter in TEXT_DELIMITERS:
+                if delimiter is not None and delimiter not in stripped_line:
+                    continue
+                row = _numbers(stripped_line.split(delimiter))
+                if row and len(row) > 1:
+                    return n, delimiter, len(row)
+    raise ValueError(f'No numeric table found in {datafile}')
+
+
+def _read_mapped_text_table(datafile, skiprows, delimiter, columns, block_size):
+    import mmap
+    import warnings
+
+    import numpy as np
+
+    table = None if delimiter is None else bytes.maketrans(delimiter.encode(), b' ')
+    blocks = []
+    with open(datafile, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            pos = 0
+            for _ in range(skiprows):
+                pos = mapped.find(b'\n', pos) + 1
+            while pos < len(mapped):
+                end = min(pos + block_size, len(mapped))
+                if end < len(mapped):
+                    end = mapped.find(b'\n', end) + 1 or len(mapped)
+                text = mapped[pos:end]
+                if table is not None:
+                    text = text.translate(table)
+                with warnings.catch_warnings():
+                    # numpy only warns if the text is not read to its end
+                    warnings.simplefilter('error', DeprecationWarning)
+                    blocks.append(np.fromstring(text, sep=' '))
+                pos = end
+
+    values = np.concatenate(blocks) if blocks else np.zeros(0)
+    if values.size % columns:
+        raise ValueError(f'The table in {datafile} has missing values')
+    return values.reshape(-1, columns)
+
+
+def read_text_table(datafile, memory_map=False, block_size=16 << 20):
+    """
+    Reads the numeric table of a delimited text file into a 2d numpy array. The
+    header length and delimiter are detected from the first lines. With
+    memory_map the file is mapped and parsed in blocks of block_size bytes
+    instead of being read line by line.
+    """
+    import numpy as np
+
+    skiprows, delimiter, columns = sniff_text_table(datafile)
+    if memory_map:
+        return _read_mapped_text_table(
+            datafile, skiprows, delimiter, columns, block_size
+        )
+    return np.loadtxt(datafile, skiprows=skiprows, delimiter=delimiter, ndmin=2)
+
+
+def read_xy(datafile, memory_map=False):
+    data = read_text_table(datafile, memory_map)
+    return {'2Theta': data[:, 0], 'Intensity': data[:, 1]}
+
+
 def readXY(datafile):
-    import pandas as pd
+    return {key: value.tolist() for key, value in read_xy(datafile).items()}
 
-    data = pd.read_csv(datafile, skiprows=1, header=None, delimiter=' ')
-    result = {}
 
-    result.update({'2Theta': list(data[0])})
-    result.update({'Intensity': list(data[1])})
+def _uxd_key(text):
+    return ''.join(e for e in text if e.isalnum() or e.isspace())
 
-    return result
 
+def _is_uxd_data(line):
+    return '\t' in line and line[0] not in ';_'
 
-def readUXD(datafile, withdata=True):
-    """Reads a uxd-datafile <datafile> and outputs two lists: two_theta,intensity"""
-    res = {}
+
+def read_uxd(datafile):
+    """
+    Reads a uxd-datafile <datafile> in one pass and returns two dicts with the
+    sections of the file: with their parameters and columns (as numpy arrays),
+    and with their parameters only. Every block of data lines is parsed at once
+    by numpy.
+    """
+    import numpy as np
 
     with open(datafile) as file:
-        for line in file:
-            stripped_line = line.strip()
-            if len(stripped_line) > 0:
-                if stripped_line[0] == ';' and '\t' not in stripped_line:
-                    key = ''.join(
-                        e for e in stripped_line[1:] if e.isalnum() or e.isspace()
-                    )
-                    entry = {key: {}}
-                elif '\t' in stripped_line and stripped_line[0] == ';' and withdata:
-                    split = stripped_line[1:].split('\t')
-                    keys = list(entry.keys())
-                    col0 = split[0].strip()
-                    col0 = ''.join(e for e in col0 if e.isalnum() or e.isspace())
-                    entry[keys[0]].update({col0: []})
-                    col1 = split[1].strip()
-                    col1 = ''.join(e for e in col1 if e.isalnum() or e.isspace())
-                    entry[keys[0]].update({col1: []})
-                elif stripped_line[0] == '_':
-                    split = stripped_line[1:].split(' = ')
-                    if len(split) == 2:
-                        key = ''.join(e for e in split[0] if e.isalnum() or e.isspace())
-                        try:
-                            elm = {key: float(split[1])}
-                        except BaseException:
-                            elm = {key: split[1]}
-                        keys = list(entry.keys())
-                        entry[keys[0]].update(elm)
-                elif '\t' in stripped_line and withdata:
-                    try:
-                        int(stripped_line[0])
-                        split = stripped_line.split('\t')
-                        keys = list(entry.keys())
-                        entry[keys[0]][col0].append(float(split[0]))
-                        entry[keys[0]][col1].append(float(split[1]))
-                    except Exception as e:
-                        print(e)
-                        raise Exception
-                res.update(entry)
+        lines = [line.strip() for line in file]
+
+    res = {}
+    metadata = {}
+    columns = {}
+    entry = entry_metadata = None
+    col0 = col1 = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not line:
+            i += 1
+        elif line[0] == ';' and '\t' not in line:
+            key = _uxd_key(line[1:])
+            entry, entry_metadata = {}, {}
+            res[key], metadata[key] = entry, entry_metadata
+            i += 1
+        elif line[0] == ';':
+            split = line[1:].split('\t')
+            col0 = _uxd_key(split[0].strip())
+            col1 = _uxd_key(split[1].strip())
+            for col in (col0, col1):
+                entry[col] = []
+                columns[id(entry), col] = (entry, col)
+            i += 1
+        elif line[0] == '_':
+            split = line[1:].split(' = ')
+            if len(split) == 2:
+                key = _uxd_key(split[0])
+                try:
+                    value = float(split[1])
+                except BaseException:
+                    value = split[1]
+                entry[key] = entry_metadata[key] = value
+            i += 1
+        elif '\t' in line:
+            end = i + 1
+            while end < len(lines) and lines[end] and _is_uxd_data(lines[end]):
+                end += 1
+            values = np.loadtxt(lines[i:end], delimiter='\t', usecols=(0, 1), ndmin=2)
+            entry[col0].append(values[:, 0])
+            entry[col1].append(values[:, 1])
+            i = end
+        else:
+            i += 1
+
+    for entry, col in columns.values():
+        entry[col] = np.concatenate(entry[col]) if entry[col] else np.zeros(0)
+    return res, metadata
+
 
+def readUXD(datafile, withdata=True):
+    """Reads a uxd-datafile <datafile> and outputs two lists: two_theta,intensity"""
+    res, metadata = read_uxd(datafile)
+    if not withdata:
+        return metadata
+    for entry in res.values():
+        for key, value in entry.items():
+            if not isinstance(value, (float, str)):
+                entry[key] = value.tolist()
     return res
 
 
-def readXLSXCatalyticReaction(datafile):
-    print(datafile)
-    wb = load_workbook(datafile)
-    sheet = wb.active
-    processeddata = {}
-    for col in sheet.columns:
-        try:
-            float(col[2].value)
-            name = str(col[0].value)
-            print(name)
+def read_xlsx_catalytic_reaction(datafile, block_rows=4096):
+    """
+    Reads the active sheet of a catalytic reaction workbook row by row. The first
+    row holds the names, the second the units. Every column with a number in the
+    third row is read until its first cell that is not a number. Returns a dict
+    with a numpy array per column.
+    """
+    import numpy as np
+
+    wb = load_workbook(datafile, read_only=True)
+    try:
+        sheet = wb.active
+        rows = sheet.iter_rows(values_only=True)
+        names = next(rows, ())
+        next(rows, None)
+        first = next(rows, None)
+        if first is None:
+            return {}
+
+        columns = []
+        processeddata = {}
+        for index, value in enumerate(first):
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                continue
+            name = str(names[index] if index < len(names) else None)
             if name in processeddata:
                 name += ' 2'
-            processeddata.update({name: []})
-            for i in range(2, len(col)):
-                processeddata[name].append(float(col[i].value))
-        except BaseException:
-            continue
-
+            processeddata[name] = None
+            columns.append((name, index))
+
+        size = sheet.max_row - 2 if sheet.max_row else block_rows
+        values = np.empty((max(size, 1), len(columns)))
+        lengths = [None] * len(columns)
+        active = list(range(len(columns)))
+        n = 0
+        for row in itertools.chain((first,), rows):
+            if n == len(values):
+                values = np.concatenate((values, np.empty((block_rows, len(columns)))))
+            for k in active:
+                index = columns[k][1]
+                try:
+                    values[n, k] = float(row[index] if index < len(row) else None)
+                except (TypeError, ValueError):
+                    lengths[k] = n
+            active = [k for k in active if lengths[k] is None]
+            if not active:
+                break
+            n += 1
+    finally:
+        wb.close()
+
+    for k, (name, _) in enumerate(columns):
+        processeddata[name] = values[
+            : n if lengths[k] is None else lengths[k], k
+        ].copy()
     return processeddata
 
 
+def readXLSXCatalyticReaction(datafile):
+    print(datafile)
+    return {
+        name: column.tolist()
+        for name, column in read_xlsx_catalytic_reaction(datafile).items()
+    }
+
+
 def readTXTSEM(datafile):
     print(datafile)
     processeddata = {}
@@ -111,118 +268,170 @@ def readTXTSEM(datafile):
     return processeddata
 
 
-def readTXTSEM_ov(datafile, withdata=True):
-    """Reads a uxd-datafile <datafile> and outputs two lists: two_theta,intensity"""
+def _read_sem_header_line(res, stripped_line):
+    if stripped_line.startswith('Bruker'):
+        res.update({'name': stripped_line})
+    if ':' in stripped_line:
+        split = stripped_line.split(':')
+        if len(split) == 2:
+            res.update({split[0].strip(): split[1].strip()})
+
+
+def read_txt_sem_ov(datafile, withdata=True, memory_map=False):
+    """
+    Reads the header of a Bruker spectrum text file <datafile> and, with
+    withdata, its spectrum as numpy arrays: energy, count. Without withdata only
+    the first line is read. If no spectrum is found, energy and count are empty.
+    """
+    import numpy as np
+
     res = {}
-    energy = []
-    count = []
-    with open(datafile) as file:
-        for line in file:
-            stripped_line = line.strip()
-            if len(stripped_line) > 0:
-                if stripped_line.startswith('Bruker'):
-                    res.update({'name': stripped_line})
-                if ':' in stripped_line:
-                    split = stripped_line.split(':')
-                    if len(split) == 2:
-                        res.update({split[0].strip(): split[1].strip()})
-                if not withdata:
+    if not withdata:
+        with open(datafile) as file:
+            for line in file:
+                stripped_line = line.strip()
+                if stripped_line:
+                    _read_sem_header_line(res, stripped_line)
                     break
+        return res
+
+    try:
+        skiprows, _, _ = sniff_text_table(datafile)
+        data = read_text_table(datafile, memory_map)
+    except ValueError:
+        # e.g. comma decimals or no spectrum, the whole file is the header
+        skiprows, data = None, np.zeros((0, 2))
+    with open(datafile) as file:
+        for line in itertools.islice(file, skiprows):
+            _read_sem_header_line(res, line.strip())
+
+    res.update({'energy': data[:, 0]})
+    res.update({'count': data[:, 1]})
+    return res
 
-        if withdata:
-            res.update({'energy': energy})
-            res.update({'count': count})
 
+def readTXTSEM_ov(datafile, withdata=True):
+    """Reads a Bruker spectrum text file <datafile> and outputs two lists"""
+    res = read_txt_sem_ov(datafile, withdata)
+    if withdata:
+        res.update({'energy': res['energy'].tolist()})
+        res.update({'count': res['count'].tolist()})
     return res
 
 
-def readRayFile(datafile, withdata=True):
+def _ray_values(text):
+    import numpy as np
+
+    return np.array(text.split(), dtype=float)
+
+
+_RAY_SOLUTION = 'FitCurve/FitSolutions/Solution'
+_RAY_LAYER = (
+    f'{_RAY_SOLUTION}/SimCurve/Sample/LayersGroups/LayersGroup/Layers/Layer[@index="0"]'
+)
+
+# path below the "Fit Curve" tree node -> (field, attribute or None for the
+# text, conversion)
+RAY_FIELDS = {
+    'FitCurve/RawCurve': [('CriticalAngle', 'CriticalAngle', float)],
+    'FitCurve/RawCurve/Data/x0': [('x0 raw', None, _ray_values)],
+    'FitCurve/RawCurve/Data/y0': [('y0 raw', None, _ray_values)],
+    'FitCurve/FitSolutions/Conditions': [
+        ('chi2mode', 'chi2Mode', int),
+        ('method', 'method', int),
+    ],
+    _RAY_SOLUTION: [('chi2', 'chi2', float)],
+    f'{_RAY_SOLUTION}/SimCurve/Data/x0': [('x0 sim', None, _ray_values)],
+    f'{_RAY_SOLUTION}/SimCurve/Data/y': [('y sim', None, _ray_values)],
+    f'{_RAY_LAYER}/Geometry': [('app_roughness', 'roughness', float)],
+    f'{_RAY_LAYER}/Density': [('app_density', 'top', float)],
+    f'{_RAY_LAYER}/Parameters/Parameter[@id="17"]': [
+        ('app_roughness_std', 'stdDeviation', float)
+    ],
+    f'{_RAY_LAYER}/Parameters/Parameter[@id="18"]': [
+        ('app_density_std', 'stdDeviation', float)
+    ],
+    f'{_RAY_SOLUTION}/SimCurve/SimParam': [
+        ('diffuce_scattering', 'poisson', float),
+        ('detector_noise', 'background_poisson', float),
+    ],
+}
+RAY_DATA_FIELDS = ('x0 raw', 'y0 raw', 'x0 sim', 'y sim')
+
+
+def _ray_step(elem):
+    if elem.tag == 'Layer':
+        return f'Layer[@index="{elem.get("index")}"]'
+    if elem.tag == 'Parameter':
+        return f'Parameter[@id="{elem.get("id")}"]'
+    return elem.tag
+
+
+def parse_ray_fields(datafile, withdata=True):
+    """
+    Collects the fields of RAY_FIELDS from a .ray fit file in one streaming pass.
+    For every field the first match in the document is used, like with find.
+    Parsing stops as soon as all fields are found.
+    """
     import xml.etree.ElementTree as ET
 
-    tree = ET.parse(datafile)
-    root = tree.getroot()
-
-    CriticalAngle = float(
-        root.find('.//TreeNode[@name="Fit Curve"]/FitCurve/RawCurve').get(
-            'CriticalAngle'
-        )
-    )
-    x0_raw = (
-        root.find('.//TreeNode[@name="Fit Curve"]/FitCurve/RawCurve/Data/x0')
-        .text.strip()
-        .split()
-    )
-    y0_raw = (
-        root.find('.//TreeNode[@name="Fit Curve"]/FitCurve/RawCurve/Data/y0')
-        .text.strip()
-        .split()
-    )
-
-    chi2 = float(
-        root.find('.//TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Solution').get(
-            'chi2'
-        )
-    )
-    chi2mode = int(
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Conditions'
-        ).get('chi2Mode')
-    )
-    method = int(
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Conditions'
-        ).get('method')
-    )
-    x0_sim = (
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Solution/SimCurve/Data/x0'  # noqa 501
-        )
-        .text.strip()
-        .split()
-    )
-    y_sim = (
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Solution/SimCurve/Data/y'  # noqa 501
-        )
-        .text.strip()
-        .split()
-    )
-
-    app_roughness = float(
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Solution/SimCurve/Sample/LayersGroups/LayersGroup/Layers/Layer[@index="0"]/Geometry'  # noqa 501
-        ).get('roughness')
-    )
-
-    app_density = float(
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Solution/SimCurve/Sample/LayersGroups/LayersGroup/Layers/Layer[@index="0"]/Density'  # noqa 501
-        ).get('top')
-    )
-
-    app_roughness_std = float(
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Solution/SimCurve/Sample/LayersGroups/LayersGroup/Layers/Layer[@index="0"]/Parameters/Parameter[@id="17"]'  # noqa 501
-        ).get('stdDeviation')
-    )
-
-    app_density_std = float(
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Solution/SimCurve/Sample/LayersGroups/LayersGroup/Layers/Layer[@index="0"]/Parameters/Parameter[@id="18"]'  # noqa 501
-        ).get('stdDeviation')
-    )
-
-    diffuce_scattering = float(
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Solution/SimCurve/SimParam'  # noqa 501
-        ).get('poisson')
-    )
-
-    detector_noise = float(
-        root.find(
-            './/TreeNode[@name="Fit Curve"]/FitCurve/FitSolutions/Solution/SimCurve/SimParam'  # noqa 501
-        ).get('background_poisson')
-    )
+    fields = {
+        path: [field for field in path_fields if withdata or field[1] is not None]
+        for path, path_fields in RAY_FIELDS.items()
+    }
+    missing = sum(len(path_fields) for path_fields in fields.values())
+    values = {}
+    # steps of the open elements below the innermost open "Fit Curve" node,
+    # None outside of one
+    steps = None
+    outer_steps = []
+    with open(datafile, 'rb') as file:
+        for event, elem in ET.iterparse(file, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == 'TreeNode' and elem.get('name') == 'Fit Curve':
+                    outer_steps.append(steps)
+                    steps = []
+                elif steps is not None:
+                    steps.append(_ray_step(elem))
+                continue
+
+            if steps:
+                for field, attribute, convert in fields.get('/'.join(steps), ()):
+                    value = elem.text if attribute is None else elem.get(attribute)
+                    if field not in values and value is not None:
+                        values[field] = convert(value)
+                        missing -= 1
+                steps.pop()
+            elif steps is not None:
+                steps = outer_steps.pop()
+            elem.clear()
+            if not missing:
+                break
+
+    for path, path_fields in fields.items():
+        for field, _, _ in path_fields:
+            if field not in values:
+                raise ValueError(f'{datafile} has no {field} in {path}')
+    return values
+
+
+def read_ray_file(datafile, withdata=True):
+    """
+    Reads the fit parameters and, with withdata, the raw and simulated curves
+    (as numpy arrays) from a .ray fit file. Returns the parameters and the
+    parameters with symbols and units.
+    """
+    values = parse_ray_fields(datafile, withdata)
+    CriticalAngle = values['CriticalAngle']
+    chi2 = values['chi2']
+    chi2mode = values['chi2mode']
+    method = values['method']
+    app_roughness = values['app_roughness']
+    app_density = values['app_density']
+    app_roughness_std = values['app_roughness_std']
+    app_density_std = values['app_density_std']
+    diffuce_scattering = values['diffuce_scattering']
+    detector_noise = values['detector_noise']
 
     method_str = ''
     if method == 0:
@@ -273,13 +482,14 @@ def readRayFile(datafile, withdata=True):
     }
 
     if withdata:
-        res.update(
-            {
-                'x0 raw': [float(v) for v in x0_raw],
-                'y0 raw': [float(v) for v in y0_raw],
-                'x0 sim': [float(v) for v in x0_sim],
-                'y sim': [float(v) for v in y_sim],
-            }
-        )
+        res.update({field: values[field] for field in RAY_DATA_FIELDS})
+
+    return res, results_nice
+
 
+def readRayFile(datafile, withdata=True):
+    res, results_nice = read_ray_file(datafile, withdata)
+    for field in RAY_DATA_FIELDS:
+        if field in res:
+            res[field] = res[field].tolist()
     return res, results_nice
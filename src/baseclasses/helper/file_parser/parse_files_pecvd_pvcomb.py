@@ -5,6 +5,9 @@ Created on Tue Mar 14 11:51:01 2023
 @author: a2853
 """
 
+import re
+import warnings
+
 import numpy as np
 import pandas as pd
 
@@ -13,111 +16,102 @@ from baseclasses.vapour_based_deposition.plasma_enhanced_physical_vapour_deposit
     LogData,
 )
 
+RECIPE_LINE = re.compile(r'^(?!  //)([^=/\n]*)=([^/\n]*)', re.MULTILINE)
+RECIPE_WHITESPACE = str.maketrans('', '', ' \t')
+
+RECIPE_PARAMETERS = {
+    'PC2_rProcPressure[0]': 'pressure',
+    'PC2_rPower[0]': 'power',
+    'PC2_rSetpHub[0]': 'plate_spacing',
+    'PC2_iTimeProcess[0]': 'time',
+}
+RECIPE_GASES = {
+    f'PC2_rSetpoint{gas}[0]': gas
+    for gas in [
+        'Ar',
+        'CO2',
+        'H2',
+        'D2',
+        'SiH4',
+        'N2O',
+        'NH3',
+        'N2',
+        'NF3',
+        'PH3',
+        'B2H6',
+    ]
+}
+
+LOG_COLUMNS = {
+    'power_set': 'DETAIL_PC2.PC2_RFG.SETP',
+    'power': 'DETAIL_PC2.PC2_RFG.ACTVALUE',
+    'temperature': 'DETAIL_PC2.PC2_HT1.TEMP',
+    'pressure': 'DETAIL_PC2.PC2_BG.OUTPUT',
+}
+POWER_IGNITE = 300  # df["PC2_rPower_ign[0]"]
+
 
 def parse_recipe_line(line):
     if line.startswith('  //') or len(line) < 2:
         return None
-    else:
-        nl = ''
-        for c in line:
-            if c == '/':
-                break
-            nl += c
-        return nl.replace(' ', '').replace('\t', '')
+    return line.partition('/')[0].translate(RECIPE_WHITESPACE)
 
 
 def parse_recipe(f, process):
-    lines = f.readlines()
     gases = []
-    for line in lines:
-        pline = parse_recipe_line(line.rstrip())
-        if pline:
-            key, value = pline.split('=')
-            value = float(value)
-            if key == 'PC2_rProcPressure[0]':
-                process.pressure = value
-            if key == 'PC2_rPower[0]':
-                process.power = value
-
-            if key == 'PC2_rSetpHub[0]':
-                process.plate_spacing = value
-
-            if key == 'PC2_iTimeProcess[0]':
-                process.time = value
-
-            if 'Setpoint' in key and value > 10e-8:
-                gas = GasFlow()
-                if key == 'PC2_rSetpointAr[0]':
-                    gas.gas_str = 'Ar'
-
-                if key == 'PC2_rSetpointCO2[0]':
-                    gas.gas_str = 'CO2'
-
-                if key == 'PC2_rSetpointH2[0]':
-                    gas.gas_str = 'H2'
-
-                if key == 'PC2_rSetpointD2[0]':
-                    gas.gas_str = 'D2'
-
-                if key == 'PC2_rSetpointSiH4[0]':
-                    gas.gas_str = 'SiH4'
+    for match in RECIPE_LINE.finditer(f.read()):
+        key = match.group(1).translate(RECIPE_WHITESPACE)
+        value = float(match.group(2))
+        if key in RECIPE_PARAMETERS:
+            setattr(process, RECIPE_PARAMETERS[key], value)
+        elif key in RECIPE_GASES and value > 10e-8:
+            gases.append(GasFlow(gas_str=RECIPE_GASES[key], gas_flow_rate=value))
 
-                if key == 'PC2_rSetpointN2O[0]':
-                    gas.gas_str = 'N2O'
-
-                if key == 'PC2_rSetpointNH3[0]':
-                    gas.gas_str = 'NH3'
-
-                if key == 'PC2_rSetpointN2[0]':
-                    gas.gas_str = 'N2'
-
-                if key == 'PC2_rSetpointNF3[0]':
-                    gas.gas_str = 'NF3'
+    process.gases = gases
 
-                if key == 'PC2_rSetpointPH3[0]':
-                    gas.gas_str = 'PH3'
 
-                if key == 'PC2_rSetpointB2H6[0]':
-                    gas.gas_str = 'B2H6'
+def parse_time_diff(values):
+    """
+    Converts HH:MM:SS.fff strings to seconds, other formats and missing values
+    with pandas.
+    """
+    try:
+        return np.loadtxt(values.tolist(), delimiter=':', ndmin=2) @ [3600.0, 60.0, 1.0]
+    except (TypeError, ValueError):
+        # a missing value is a float, which numpy does not accept as a line
+        return np.array(pd.to_timedelta(values.str.strip()) / np.timedelta64(1, 's'))
 
-                if gas.gas_str is None:
-                    continue
 
-                gas.gas_flow_rate = value
-                gases.append(gas)
-
-    process.gases = gases
+def window_statistics(values, start, stop):
+    """Mean and sample variance of every column of values[start:stop]."""
+    window = values[start:stop]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmean(window, axis=0), np.nanvar(window, axis=0, ddof=1)
 
 
 def parse_log(f, entry, time=None, shift=None):
     data = LogData()
-    df = pd.read_csv(f.name, sep='\t', decimal=',')
-
-    powerset = df['DETAIL_PC2.PC2_RFG.SETP']
-    powerval = df['DETAIL_PC2.PC2_RFG.ACTVALUE']
-    tempval = df['DETAIL_PC2.PC2_HT1.TEMP']
-    # tempset = data["DETAIL_PC2.PC2_HT1.TEMPSET"]
-    pressureval = df['DETAIL_PC2.PC2_BG.OUTPUT']
-    power_ignite = 300  # df["PC2_rPower_ign[0]"]
-    ignite = powerset[powerset == power_ignite].index.max()
-
-    data.time = np.array(
-        pd.to_timedelta(df['TimeDiff'].str.strip()) / np.timedelta64(1, 's')
+    df = pd.read_csv(
+        f.name,
+        sep='\t',
+        decimal=',',
+        usecols=['TimeDiff', *LOG_COLUMNS.values()],
+        dtype={column: np.float64 for column in LOG_COLUMNS.values()},
     )
-    data.power = np.array(powerval)
-    data.pressure = np.array(pressureval)
-    data.temperature = np.array(tempval)
-    # assert powerset.index.max() - ignite > 30
 
-    # if not pd.isnull(ignite) and time is not None and shift is not None:
-
-    data.power_mean = powerval.iloc[ignite + shift : ignite + time + shift].mean()
-    data.power_var = powerval.iloc[ignite + shift : ignite + time + shift].var()
+    data.time = parse_time_diff(df['TimeDiff'])
+    values = df[list(LOG_COLUMNS.values())[1:]].to_numpy()
+    data.power, data.temperature, data.pressure = values.T
+    # assert powerset.index.max() - ignite > 30
 
-    data.temperature_mean = tempval.iloc[ignite + shift : ignite + time + shift].mean()
-    data.temperature_var = tempval.iloc[ignite + shift : ignite + time + shift].var()
+    ignitions = np.flatnonzero(df[LOG_COLUMNS['power_set']].to_numpy() == POWER_IGNITE)
+    if len(ignitions) == 0 or time is None or shift is None:
+        return data
 
-    data.pressure_mean = pressureval.iloc[ignite + shift : ignite + time + shift].mean()
-    data.pressure_var = pressureval.iloc[ignite + shift : ignite + time + shift].var()
+    ignite = ignitions[-1]
+    mean, var = window_statistics(values, ignite + shift, ignite + time + shift)
+    data.power_mean, data.temperature_mean, data.pressure_mean = mean
+    data.power_var, data.temperature_var, data.pressure_var = var
 
     return data
@@ -0,0 +1,126 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Incremental copying of a measurement data folder into an upload.
+
+A manifest (a json file next to the copies) records size, modification time
+and sha256 hash of every copied file. A sync only hashes and copies the files
+whose size or modification time changed. Files are copied to a temporary name
+and renamed, and the manifest is saved regularly, so a sync that was
+interrupted continues where it stopped. Files that were already in the upload
+before the first sync are only kept if they have the same content; differing
+files are never replaced.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+MANIFEST_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(path):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def write_manifest(path, files):
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': files}, f)
+    os.replace(temp_path, path)
+
+
+def copy_file(src, dst):
+    temp_dst = f'{dst}.part'
+    shutil.copyfile(src, temp_dst)
+    os.replace(temp_dst, dst)
+
+
+def sync_folder(src_dir, dst_dir, manifest_path, save_every=50):
+    """
+    Copies the new and changed files of src_dir to dst_dir.
+
+    Returns the names of all files in src_dir, the names of the files that were
+    copied and the names of the files that are no longer in src_dir. Copies of
+    removed files are kept. A file of dst_dir that is not in the manifest and
+    differs from its source is skipped and a warning is logged.
+    """
+    manifest = read_manifest(manifest_path)
+    current = {}
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            if entry.is_file():
+                stat = entry.stat()
+                current[entry.name] = (stat.st_size, stat.st_mtime_ns)
+
+    changed = []
+    unsaved = 0
+    for name, (size, mtime) in current.items():
+        known = manifest.get(name)
+        if known and known['size'] == size and known['mtime'] == mtime:
+            continue
+        src = os.path.join(src_dir, name)
+        dst = os.path.join(dst_dir, name)
+        digest = file_hash(src)
+        if known and known['hash'] == digest:
+            copied = os.path.isfile(dst)
+        elif not known and os.path.isfile(dst):
+            # copied before there was a manifest
+            if file_hash(dst) != digest:
+                logger.warning(
+                    'The file %s differs from %s and is not replaced.', dst, src
+                )
+                continue
+            copied = True
+        else:
+            copied = False
+        if not copied:
+            copy_file(src, dst)
+            changed.append(name)
+        manifest[name] = dict(size=size, mtime=mtime, hash=digest)
+        unsaved += 1
+        if unsaved >= save_every:
+            write_manifest(manifest_path, manifest)
+            unsaved = 0
+
+    removed = [name for name in manifest if name not in current]
+    for name in removed:
+        del manifest[name]
+    if unsaved or removed or not os.path.exists(manifest_path):
+        write_manifest(manifest_path, manifest)
+    return list(current), changed, removed
@@ -15,9 +15,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
 import re
+from functools import lru_cache
 
-from pymatgen.core import Composition
+logger = logging.getLogger(__name__)
 
 preprocess_rules = {'FAPbI': 'FAPbI3', 'MAPbI': 'MAPbI3'}
 
@@ -154,6 +156,61 @@ cation_dict_miss = {
 }
 
 
+def build_cation_pattern(cations):
+    """
+    Returns one compiled alternation of the cation abbreviations and the
+    replacement of every matched text. The abbreviations are tried longest
+    first, like replacing them one after the other did. The brackets of the
+    abbreviations only group, they are not part of the matched text.
+    """
+    replacements = {}
+    for key, value in sorted(cations.items(), key=lambda x: len(x[0]), reverse=True):
+        replacements.setdefault(key.replace('(', '').replace(')', ''), value)
+    pattern = re.compile('|'.join(re.escape(key) for key in replacements))
+    return pattern, replacements
+
+
+cation_pattern, cation_replacements = build_cation_pattern(cation_dict)
+
+
+@lru_cache(maxsize=4096)
+def normalize_formula(formula):
+    """
+    Returns the reduced formula and the elements of a (perovskite) formula
+    with cation abbreviations, or None if the formula contains an unknown
+    abbreviation and (None, None) if it cannot be parsed.
+    """
+    from pymatgen.core import Composition
+
+    formula = preprocess_rules.get(formula, formula)
+    if any(key in formula for key in cation_dict_miss):
+        logger.warning(
+            'The perovskite composition %s contains an undefined abbreviation '
+            'and could not be parsed.',
+            formula,
+        )
+        return None
+    replaced_formula = cation_pattern.sub(
+        lambda match: cation_replacements[match.group(0)], formula
+    )
+    try:
+        composition = Composition(replaced_formula)
+        logger.debug('Composition of %s: %s', formula, composition)
+        int_formula = composition.get_integer_formula_and_factor()[0]
+        composition_final = Composition(
+            int_formula
+        ).get_reduced_composition_and_factor()[0]
+        reduced_formula = composition_final.to_pretty_string()
+        elements = tuple(composition_final.chemical_system.split('-'))
+        return reduced_formula, elements
+    except ValueError:
+        logger.warning(
+            'Perovskite formula %s with a cation abbreviation could not be parsed',
+            formula,
+        )
+    return None, None
+
+
 class PerovskiteFormulaNormalizer:
     def __init__(self, input_formula: str):
         """ """
@@ -162,25 +219,23 @@ class PerovskiteFormulaNormalizer:
         self.cation_dict_miss = cation_dict_miss
 
     def pre_process_formula(self):
-        for key, value in preprocess_rules.items():
-            if key == self.input_formula:
-                self.input_formula = self.input_formula.replace(key, value)
+        self.input_formula = preprocess_rules.get(
+            self.input_formula, self.input_formula
+        )
         return self.input_formula
 
     def replace_formula(self):
         item = self.input_formula
-        if any(key in item for key in self.cation_dict_miss.keys()):
-            print("""
-                  The given perovskite composition contains an undefined abbreviation.
-                  The composition could not be parsed.
-                  """)
+        if any(key in item for key in self.cation_dict_miss):
+            logger.warning(
+                'The perovskite composition %s contains an undefined abbreviation '
+                'and could not be parsed.',
+                item,
+            )
         else:
-            for word, replacement in sorted(
-                self.cation_dict.items(), key=lambda x: len(x[0]), reverse=True
-            ):
-                item = re.sub(word, replacement, item)
-            output_formula = item
-            return output_formula
+            return cation_pattern.sub(
+                lambda match: cation_replacements[match.group(0)], item
+            )
 
     def clean_formula(self):
         """
@@ -190,31 +245,8 @@ class PerovskiteFormulaNormalizer:
             chemical_formula_reduced: A string of the formatted *reduced* formula
             elements: A list of the elements in the formula
         """
-        self.pre_process_formula()
-        replaced_formula = self.replace_formula()
-        if replaced_formula is not None:
-            try:
-                composition = Composition(replaced_formula)
-                print(composition)
-                int_formula = composition.get_integer_formula_and_factor()[0]
-                composition_final = Composition(int_formula)
-                clean_formulas_no_brackets = (
-                    composition_final.get_reduced_composition_and_factor()[0]
-                )
-                composition_final_int = Composition(clean_formulas_no_brackets)
-                # hill_formula = composition_final_int.hill_formula
-                reduced_formula = (
-                    composition_final_int.get_reduced_composition_and_factor()[
-                        0
-                    ].to_pretty_string()
-                )
-                # reduced_formula = Composition(hill_formula).reduced_formula
-                elements = composition_final_int.chemical_system.split('-')
-                return reduced_formula, elements
-
-            except ValueError:
-                print(
-                    'Perovskite formula with a cation abbreviation could not be parsed'
-                )
-
-            return None, None
+        result = normalize_formula(self.input_formula)
+        if result is None:
+            return None
+        reduced_formula, elements = result
+        return reduced_formula, list(elements) if elements is not None else None
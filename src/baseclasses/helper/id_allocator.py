@@ -0,0 +1,251 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Allocation of the project sample numbers at the end of lab ids.
+
+An allocator hands out the next number of a lab id prefix (institute, project
+and owner) with ``next_id(prefix, entry_id, scan)``. ``scan`` is only called
+when the allocator has to know the numbers already in use and returns
+``(entry_id, number)`` pairs. Entries that already got a number get the same
+number again, so normalizing an entry twice does not use up numbers.
+
+The default ``SearchIDAllocator`` scans all entries of the prefix for every new
+id. ``SQLiteIDAllocator`` keeps one sequence per prefix in a local SQLite
+database: the scan is only run once to seed a new prefix and the numbers are
+handed out in a write transaction, so concurrent processes never get the same
+number. Set the ``NOMAD_BASECLASSES_LAB_ID_DATABASE`` environment variable to a
+database path, or call ``set_id_allocator``, to use it. SQLite relies on file
+locks, which are unreliable on network file systems like NFS: all workers
+allocating numbers have to use the database on a local disk of one host.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+LAB_ID_DATABASE_VARIABLE = 'NOMAD_BASECLASSES_LAB_ID_DATABASE'
+
+
+def parse_project_sample_number(lab_id, lab_id_base=None):
+    """Returns the four digit number after the last '_' of a lab id or None."""
+    if lab_id_base is not None and not lab_id.startswith(f'{lab_id_base}_'):
+        return None
+    number = lab_id.split('_')[-1]
+    if number.isdigit() and len(number) == 4:
+        return int(number)
+    return None
+
+
+def parse_short_sample_number(lab_id, lab_id_base):
+    """Returns the digits following the lab id base of a short id or None."""
+    if not lab_id.startswith(lab_id_base):
+        return None
+    number = lab_id[len(lab_id_base) :]
+    if number.isdigit():
+        return int(number)
+    return None
+
+
+def project_sample_numbers(data, parse=parse_project_sample_number):
+    """
+    Returns the ``(entry_id, number)`` pairs of the lab ids of search hits. Only
+    the first lab id of an entry is its own id, the numbers of the other lab ids
+    are in use but get None as entry id.
+    """
+    numbers = []
+    for entry in data:
+        for index, lab_id in enumerate(entry['results']['eln']['lab_ids']):
+            number = parse(lab_id)
+            if number is not None:
+                numbers.append((entry['entry_id'] if index == 0 else None, number))
+    return numbers
+
+
+class SearchIDAllocator:
+    """Finds the next number by scanning all entries of the prefix."""
+
+    def next_id(self, prefix, entry_id, scan):
+        highest = 0
+        for number_entry_id, number in scan():
+            if number_entry_id is not None and number_entry_id == entry_id:
+                return number
+            highest = max(highest, number)
+        return highest + 1
+
+    def reserve(self, prefix, entry_id, number, scan):
+        return True
+
+
+class SQLiteIDAllocator:
+    """Hands out the numbers of every prefix from a sequence in SQLite."""
+
+    def __init__(self, path, timeout=60.0):
+        self.path = path
+        self.timeout = timeout
+
+    def _connect(self):
+        connection = sqlite3.connect(
+            self.path, timeout=self.timeout, isolation_level=None
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS sequences '
+            '(prefix TEXT PRIMARY KEY, last_number INTEGER NOT NULL)'
+        )
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS allocations '
+            '(prefix TEXT NOT NULL, entry_id TEXT NOT NULL, number INTEGER NOT NULL, '
+            'PRIMARY KEY (prefix, entry_id))'
+        )
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS allocations_number '
+            'ON allocations (prefix, number)'
+        )
+        return connection
+
+    def _transaction(self, prefix, entry_id, scan, allocate):
+        with closing(self._connect()) as connection:
+            # takes the write lock before reading, so no other process can
+            # allocate between reading and updating the sequence
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                last_number = self._seed(connection, prefix, scan)
+                result = allocate(connection, last_number)
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        return result
+
+    def _seed(self, connection, prefix, scan):
+        row = connection.execute(
+            'SELECT last_number FROM sequences WHERE prefix = ?', (prefix,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        numbers = list(scan())
+        connection.executemany(
+            'INSERT OR IGNORE INTO allocations VALUES (?, ?, ?)',
+            [
+                (prefix, entry_id, number)
+                for entry_id, number in numbers
+                if entry_id is not None
+            ],
+        )
+        last_number = max((number for _, number in numbers), default=0)
+        connection.execute('INSERT INTO sequences VALUES (?, ?)', (prefix, last_number))
+        return last_number
+
+    def _allocated(self, connection, prefix, entry_id):
+        row = connection.execute(
+            'SELECT number FROM allocations WHERE prefix = ? AND entry_id = ?',
+            (prefix, entry_id),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _store(self, connection, prefix, entry_id, number, last_number):
+        connection.execute(
+            'INSERT OR REPLACE INTO allocations VALUES (?, ?, ?)',
+            (prefix, entry_id, number),
+        )
+        if number > last_number:
+            connection.execute(
+                'UPDATE sequences SET last_number = ? WHERE prefix = ?',
+                (number, prefix),
+            )
+
+    def next_id(self, prefix, entry_id, scan):
+        def allocate(connection, last_number):
+            number = self._allocated(connection, prefix, entry_id)
+            if number is None:
+                number = last_number + 1
+                self._store(connection, prefix, entry_id, number, last_number)
+            return number
+
+        return self._transaction(prefix, entry_id, scan, allocate)
+
+    def reserve(self, prefix, entry_id, number, scan):
+        """
+        Records a number chosen by the user for the entry. Returns False if the
+        number already belongs to another entry.
+        """
+
+        def allocate(connection, last_number):
+            row = connection.execute(
+                'SELECT entry_id FROM allocations WHERE prefix = ? AND number = ?',
+                (prefix, number),
+            ).fetchone()
+            if row is not None and row[0] != entry_id:
+                return False
+            self._store(connection, prefix, entry_id, number, last_number)
+            return True
+
+        return self._transaction(prefix, entry_id, scan, allocate)
+
+
+# the allocator used by next_sample_number, see get_id_allocator
+_id_allocator = {}
+
+
+def set_id_allocator(allocator):
+    _id_allocator['allocator'] = allocator
+
+
+def get_id_allocator():
+    if 'allocator' not in _id_allocator:
+        path = os.environ.get(LAB_ID_DATABASE_VARIABLE)
+        set_id_allocator(SQLiteIDAllocator(path) if path else SearchIDAllocator())
+    return _id_allocator['allocator']
+
+
+def _scan(archive, query, parse):
+    def scan():
+        from nomad.app.v1.models import MetadataRequired
+
+        from baseclasses.helper.utilities import search_all
+
+        hits = search_all(
+            archive,
+            query,
+            MetadataRequired(include=['entry_id', 'results.eln.lab_ids']),
+        )
+        return project_sample_numbers(hits, parse)
+
+    return scan
+
+
+def next_sample_number(archive, prefix, query, parse=parse_project_sample_number):
+    """
+    Returns the next number for the lab id prefix of the archive's entry.
+    ``query`` selects the entries that are scanned for numbers in use.
+    """
+    return get_id_allocator().next_id(
+        prefix, archive.metadata.entry_id, _scan(archive, query, parse)
+    )
+
+
+def reserve_sample_number(
+    archive, prefix, query, number, parse=parse_project_sample_number
+):
+    """
+    Records a number chosen for the archive's entry. Returns False if it is
+    already taken by another entry.
+    """
+    return get_id_allocator().reserve(
+        prefix, archive.metadata.entry_id, number, _scan(archive, query, parse)
+    )
@@ -1,5 +1,108 @@
+import hashlib
+import json
+
+import numpy as np
 import plotly.graph_objects as go
 
+# points per trace that the figures of the schemas are decimated to
+MAX_PLOT_POINTS = 2000
+MAX_CACHED_FIGURES = 256
+
+_figures = {}
+
+
+def lttb_indices(x, y, max_points):
+    """Indices of the points kept by largest-triangle-three-buckets."""
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    indices = np.empty(max_points, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        mean_x = x[end:next_end].mean()
+        mean_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[selected] - mean_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (mean_y - y[selected])
+        )
+        selected = start + int(np.argmax(area))
+        indices[bucket + 1] = selected
+    return indices
+
+
+def minmax_indices(y, max_points):
+    """Indices of the minimum and maximum of max_points / 2 equal buckets."""
+    n = len(y)
+    if n <= max_points or max_points < 2:
+        return np.arange(n)
+    edges = np.linspace(0, n, max_points // 2 + 1).astype(int)
+    buckets = np.repeat(np.arange(len(edges) - 1), np.diff(edges))
+    order = np.lexsort((y, buckets))
+    return np.unique(np.concatenate((order[edges[:-1]], order[edges[1:] - 1])))
+
+
+def decimate(x, y, max_points=None, method='lttb'):
+    """
+    Returns x and y (as plain arrays, without units) reduced to at most
+    max_points (by default MAX_PLOT_POINTS) with 'lttb' or 'minmax'. Without x,
+    the indices are returned as x.
+    """
+    if max_points is None:
+        max_points = MAX_PLOT_POINTS
+    y = np.asarray(getattr(y, 'magnitude', y), dtype=np.float64)
+    x = np.arange(len(y)) if x is None else getattr(x, 'magnitude', x)
+    x = np.asarray(x, dtype=np.float64)
+    if method == 'minmax':
+        indices = minmax_indices(y, max_points)
+    else:
+        indices = lttb_indices(x, y, max_points)
+    return x[indices], y[indices]
+
+
+def figure_key(*data):
+    """A hash of arrays (with their units), numbers, strings and lists of them."""
+    digest = hashlib.sha1()
+
+    def update(value):
+        if isinstance(value, list | tuple):
+            digest.update(b'[')
+            for item in value:
+                update(item)
+            digest.update(b']')
+        elif hasattr(value, 'magnitude'):
+            digest.update(str(getattr(value, 'units', '')).encode())
+            update(value.magnitude)
+        elif isinstance(value, np.ndarray):
+            digest.update(f'{value.dtype}{value.shape}'.encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b'|')
+
+    for value in data:
+        update(value)
+    return digest.hexdigest()
+
+
+def cached_figure(build, *args, key_data=None):
+    """
+    Returns the plotly json of the figure build(*args). The json is cached by
+    the hash of args, or of key_data if given.
+    """
+    key = figure_key(
+        getattr(build, '__qualname__', repr(build)),
+        *(args if key_data is None else key_data),
+    )
+    if key not in _figures:
+        if len(_figures) >= MAX_CACHED_FIGURES:
+            _figures.clear()
+        _figures[key] = build(*args).to_json()
+    return json.loads(_figures[key])
+
 
 def make_xas_plot(title, x, x_label, y_list, y_label):
     fig = go.Figure().update_layout(
@@ -8,11 +111,12 @@ def make_xas_plot(title, x, x_label, y_list, y_label):
     if x is None or y_list is None or len(y_list) < 1:
         return fig
     for y in y_list:
+        trace_x, trace_y = decimate(x, y)
         fig.add_traces(
             go.Scatter(
                 name=y_label,
-                x=x,
-                y=y,
+                x=trace_x,
+                y=trace_y,
                 mode='lines',
                 hoverinfo='x+y+name',
             )
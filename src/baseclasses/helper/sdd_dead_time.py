@@ -0,0 +1,165 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Dead time fits of silicon drift detector channels, OCR = a * (1 - exp(-k * ICR)).
+
+All channels of a scan are fitted together with a vectorized Levenberg-Marquardt
+on scaled data. The fits are cached by the hash of the channel data, so
+normalizing an entry again does not refit unchanged channels.
+"""
+
+import hashlib
+
+import numpy as np
+
+MAX_CACHED_FITS = 1024
+# (a, k) of channels that cannot be fitted, as with a failing curve_fit before
+FAILED_FIT = (1.0, 1.0)
+
+_fits = {}
+
+
+def channel_key(icr, ocr):
+    digest = hashlib.sha1()
+    for values in (icr, ocr):
+        array = np.ascontiguousarray(values, dtype=np.float64)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def _model_cost(a, k, x, y):
+    residuals = y - a[:, None] * (1 - np.exp(-k[:, None] * x))
+    return (residuals * residuals).sum(axis=1)
+
+
+def fit_dead_time(icr, ocr, max_iterations=200, tolerance=1e-10):
+    """
+    Fits every row of the 2d arrays icr and ocr. Returns the arrays a and k,
+    channels that cannot be fitted get FAILED_FIT.
+    """
+    icr = np.asarray(icr, dtype=np.float64)
+    ocr = np.asarray(ocr, dtype=np.float64)
+    x_scale = np.abs(icr).max(axis=1, initial=0)
+    y_scale = np.abs(ocr).max(axis=1, initial=0)
+    valid = (
+        np.isfinite(icr).all(axis=1)
+        & np.isfinite(ocr).all(axis=1)
+        & (x_scale > 0)
+        & (icr.shape[1] > 1)
+    )
+    x_scale[~valid] = 1
+    y_scale[y_scale == 0] = 1
+    x = np.where(valid[:, None], icr / x_scale[:, None], 0)
+    y = np.where(valid[:, None], ocr / y_scale[:, None], 0)
+
+    # start at the maximum and the initial slope of a line through the origin
+    a = y.max(axis=1, initial=0)
+    xx = (x * x).sum(axis=1)
+    slope = np.divide((x * y).sum(axis=1), xx, out=np.zeros_like(xx), where=xx > 0)
+    k = np.where(a > 0, slope / np.where(a > 0, a, 1), 1e-5 * x_scale)
+    cost = _model_cost(a, k, x, y)
+
+    # weakly saturating channels are far from their maximum, they start at the
+    # fit of the expansion a * k * x - a * k**2 * x**2 / 2 if it is better
+    with np.errstate(all='ignore'):
+        x3, x4 = (x**3).sum(axis=1), (x**4).sum(axis=1)
+        xy, x2y = (x * y).sum(axis=1), (x * x * y).sum(axis=1)
+        det = xx * x4 - x3 * x3
+        c1 = (x4 * xy - x3 * x2y) / det
+        c2 = (xx * x2y - x3 * xy) / det
+        parabola_k = -2 * c2 / c1
+        parabola_a = c1 / parabola_k
+        parabola_cost = _model_cost(parabola_a, parabola_k, x, y)
+    parabola = (parabola_k > 0) & (parabola_a > 0) & (parabola_cost < cost)
+    a = np.where(parabola, parabola_a, a)
+    k = np.where(parabola, parabola_k, k)
+    cost = np.where(parabola, parabola_cost, cost)
+
+    damping = np.full(len(a), 1e-3)
+    active = np.flatnonzero(valid)
+    with np.errstate(all='ignore'):
+        for _ in range(max_iterations):
+            if not len(active):
+                break
+            x_active, y_active = x[active], y[active]
+            a_active, k_active = a[active], k[active]
+            decay = np.exp(-k_active[:, None] * x_active)
+            jac_a = 1 - decay
+            jac_k = a_active[:, None] * x_active * decay
+            residuals = y_active - a_active[:, None] * jac_a
+            s_aa = (jac_a * jac_a).sum(axis=1)
+            s_kk = (jac_k * jac_k).sum(axis=1)
+            s_ak = (jac_a * jac_k).sum(axis=1)
+            g_a = (jac_a * residuals).sum(axis=1)
+            g_k = (jac_k * residuals).sum(axis=1)
+
+            # converged if the undamped Gauss-Newton step is negligible, the
+            # damped steps can be small far from the minimum
+            det = s_aa * s_kk - s_ak * s_ak
+            newton_a = (s_kk * g_a - s_ak * g_k) / det
+            newton_k = (s_aa * g_k - s_ak * g_a) / det
+            converged = (
+                (np.abs(newton_a) <= tolerance * (np.abs(a_active) + tolerance))
+                & (np.abs(newton_k) <= tolerance * (np.abs(k_active) + tolerance))
+            ) | (g_a * newton_a + g_k * newton_k <= tolerance * cost[active])
+
+            s_aa = s_aa * (1 + damping[active])
+            s_kk = s_kk * (1 + damping[active])
+            det = s_aa * s_kk - s_ak * s_ak
+            step_a = (s_kk * g_a - s_ak * g_k) / det
+            step_k = (s_aa * g_k - s_ak * g_a) / det
+
+            new_a, new_k = a_active + step_a, k_active + step_k
+            new_cost = _model_cost(new_a, new_k, x_active, y_active)
+            better = ~converged & np.isfinite(new_cost) & (new_cost <= cost[active])
+            updated = active[better]
+            a[updated], k[updated] = new_a[better], new_k[better]
+            cost[updated] = new_cost[better]
+            damping[active] = np.where(
+                better, damping[active] / 10, damping[active] * 10
+            )
+            active = active[~converged & (damping[active] < 1e16)]
+
+    fitted = valid & np.isfinite(a) & np.isfinite(k)
+    return (
+        np.where(fitted, a * y_scale, FAILED_FIT[0]),
+        np.where(fitted, k / x_scale, FAILED_FIT[1]),
+    )
+
+
+def fit_dead_time_channels(channels):
+    """
+    Returns the (a, k) fit of every (icr, ocr) channel. Channels that were not
+    fitted before are fitted together, grouped by length.
+    """
+    keys = [channel_key(icr, ocr) for icr, ocr in channels]
+    if len(_fits) + len(keys) > MAX_CACHED_FITS:
+        _fits.clear()
+    missing = {}
+    for key, (icr, ocr) in zip(keys, channels):
+        if key not in _fits:
+            missing.setdefault(len(icr), {})[key] = (icr, ocr)
+
+    for group in missing.values():
+        icr, ocr = zip(*group.values())
+        for key, a, k in zip(group, *fit_dead_time(icr, ocr)):
+            _fits[key] = (float(a), float(k))
+
+    return [_fits[key] for key in keys]
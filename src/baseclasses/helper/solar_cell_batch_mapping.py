@@ -1,4 +1,6 @@
+import logging
 from datetime import datetime
+from functools import lru_cache
 
 import pandas as pd
 from nomad.datamodel.metainfo.basesections import CompositeSystemReference
@@ -51,6 +53,8 @@ from baseclasses.wet_chemical_deposition.slot_die_coating import (
 )
 from baseclasses.wet_chemical_deposition.spin_coating import SpinCoatingRecipeSteps
 
+logger = logging.getLogger(__name__)
+
 
 def get_entry_id_from_file_name(file_name, upload_id):
     from nomad.utils import hash
@@ -95,6 +99,24 @@ def get_value(data, key, default=None, number=True, unit=None, factor=1.0):
         raise e
 
 
+# supported date formats, with and without time
+DATE_FORMATS = [
+    '%d-%m-%Y',
+    '%d/%m/%Y',
+    '%d.%m.%Y',
+    '%Y-%m-%d',  # ISO date
+    '%d-%m-%y',
+    '%d/%m/%y',
+    '%Y-%m-%d %H:%M:%S',  # ISO with time
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%d-%m-%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+    '%d.%m.%Y %H:%M:%S',
+]
+
+NOMAD_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
 def get_datetime(data, key):
     """
     Parse datetime from data using multiple date formats.
@@ -107,48 +129,116 @@ def get_datetime(data, key):
         str: Formatted datetime string in NOMAD format ('%Y-%m-%d %H:%M:%S.%f')
         None: If key is missing, value is NaN, or parsing fails
     """
-    import pandas as pd
-
     if key not in data or pd.isna(data[key]):
         return None
 
     date_value = str(data[key]).strip()
 
-    # List of supported date formats to try (with and without time)
-    date_formats = [
-        '%d-%m-%Y',
-        '%d/%m/%Y',
-        '%d.%m.%Y',
-        '%Y-%m-%d',  # ISO date
-        '%d-%m-%y',
-        '%d/%m/%y',
-        '%Y-%m-%d %H:%M:%S',  # ISO with time
-        '%Y-%m-%d %H:%M:%S.%f',
-        '%d-%m-%Y %H:%M:%S',
-        '%d/%m/%Y %H:%M:%S',
-        '%d.%m.%Y %H:%M:%S',
-    ]
-
-    for date_format in date_formats:
+    for date_format in DATE_FORMATS:
         try:
             dt = datetime.strptime(date_value, date_format)
-            return dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+            return dt.strftime(NOMAD_DATETIME_FORMAT)
         except ValueError:
             continue
 
     # Try pandas as a fallback (handles many formats)
     try:
         dt = pd.to_datetime(date_value)
-        return dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+        return dt.strftime(NOMAD_DATETIME_FORMAT)
     except Exception:
         pass
 
     print(
-        f"Warning: Could not parse date '{date_value}' with key '{key}'. Tried formats: {date_formats}"
+        f"Warning: Could not parse date '{date_value}' with key '{key}'. Tried formats: {DATE_FORMATS}"
     )
     return None
 
 
+def infer_datetime_format(values, sample_size=20):
+    """
+    Detect the date format of a column from a sample of its non-null cells.
+
+    Args:
+        values: pandas Series with the date values as strings
+        sample_size: Number of non-null cells to look at
+
+    Returns:
+        str: The first format of DATE_FORMATS matching most of the sampled cells
+        None: If no format matches any sampled cell
+    """
+    sample = values.dropna().head(sample_size).tolist()
+    best_format, best_matches = None, 0
+    for date_format in DATE_FORMATS:
+        matches = 0
+        for date_value in sample:
+            try:
+                datetime.strptime(date_value, date_format)
+                matches += 1
+            except ValueError:
+                continue
+        if matches == len(sample):
+            return date_format
+        if matches > best_matches:
+            best_format, best_matches = date_format, matches
+    return best_format
+
+
+def get_datetime_column(data, key, strict=False, sample_size=20):
+    """
+    Parse a whole datetime column, detecting its format only once.
+
+    Args:
+        data: DataFrame containing the date column
+        key: Name of the date column
+        strict: If True, cells not matching the detected format are None.
+            Otherwise they are parsed one by one like in get_datetime.
+        sample_size: Number of non-null cells used to detect the format
+
+    Returns:
+        tuple: List of formatted datetime strings in NOMAD format (or None) and
+            a dict with the index and value of each cell not matching the
+            detected format
+    """
+    if key not in data:
+        return [None] * len(data), {}
+
+    column = data[key]
+    missing = column.isna()
+    if pd.api.types.is_datetime64_any_dtype(column):
+        parsed = column
+        values = column.astype(object)
+    else:
+        values = column.astype(str).str.strip().where(~missing)
+        date_format = infer_datetime_format(values, sample_size)
+        if date_format is None:
+            parsed = pd.Series(pd.NaT, index=column.index)
+        else:
+            parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+
+    formatted = parsed.dt.strftime(NOMAD_DATETIME_FORMAT)
+    unmatched = {
+        index: values[index] for index in column.index[parsed.isna() & ~missing]
+    }
+    for index in unmatched:
+        formatted[index] = None if strict else get_datetime({key: values[index]}, key)
+    return formatted.astype(object).where(formatted.notna(), None).tolist(), unmatched
+
+
+def get_dates(data, strict=False):
+    """
+    The 'Date' column of data parsed by get_datetime_column. The cells that do
+    not match the detected format are reported as a warning.
+    """
+    dates, unmatched = get_datetime_column(data, 'Date', strict)
+    if unmatched:
+        logger.warning(
+            'Dates not matching the format of the column%s: %s',
+            ' are not set' if strict else '',
+            '; '.join(f'row {index}: "{value}"' for index, value in unmatched.items()),
+        )
+    return dates
+
+
 def map_basic_sample(data, substrate_name, upload_id, sample_class):
     archive = sample_class(
         datetime=get_datetime(data, 'Date'),
@@ -161,6 +251,21 @@ def map_basic_sample(data, substrate_name, upload_id, sample_class):
     return (data['Nomad ID'], archive)
 
 
+def map_basic_samples(data, substrate_names, upload_id, sample_class, strict=False):
+    """
+    map_basic_sample for every row of data, with the 'Date' column parsed once
+    by get_dates.
+    """
+    dates = get_dates(data, strict)
+    rows = data.drop(columns='Date', errors='ignore')
+    samples = []
+    for (_, row), substrate_name, date in zip(rows.iterrows(), substrate_names, dates):
+        lab_id, archive = map_basic_sample(row, substrate_name, upload_id, sample_class)
+        archive.datetime = date
+        samples.append((lab_id, archive))
+    return samples
+
+
 def map_batch(batch_ids, batch_id, upload_id, batch_class):
     archive = batch_class(
         name=batch_id,
@@ -228,6 +333,134 @@ def map_layer(data):
         ]
 
 
+# columns of a solvent, solute or additive slot, e.g. 'Solute 1 type',
+# as (quantity, [(column suffix, unit, factor), ...])
+SOLUTION_CHEMICAL_COLUMNS = {
+    'solvent': [
+        ('name', [('name', None, 1)]),
+        ('chemical_volume', [('volume [uL]', 'uL', 1)]),
+        ('amount_relative', [('relative amount', None, 1)]),
+        ('chemical_id', [('chemical ID', None, 1)]),
+    ],
+    'solute': [
+        ('name', [('type', None, 1), ('name', None, 1)]),
+        ('concentration_mol', [('Concentration [mM]', 'mM', 1)]),
+        (
+            'concentration_mass',
+            [
+                ('Concentration [wt%]', 'mg/ml', 10),
+                ('Concentration [mg/ml]', 'mg/ml', 1),
+            ],
+        ),
+        ('amount_relative', [('relative amount', None, 1)]),
+        ('chemical_id', [('chemical ID', None, 1)]),
+    ],
+    'additive': [
+        ('name', [('name', None, 1)]),
+        ('concentration_mol', [('Concentration [mM]', 'mM', 1)]),
+        (
+            'concentration_mass',
+            [
+                ('Concentration [wt%]', 'mg/ml', 10),
+                ('Concentration [mg/ml]', 'mg/ml', 1),
+            ],
+        ),
+        ('amount_relative', [('relative amount', None, 1)]),
+        ('chemical_id', [('chemical ID', None, 1)]),
+    ],
+}
+
+SOLUTION_CHEMICAL_TEXT = ['name', 'chemical_id']
+
+
+class SolutionSlot:
+    """The columns of one solvent, solute or additive, e.g. 'Solvent 1'."""
+
+    def __init__(self, slot, columns):
+        self.slot = slot
+        # quantity -> (column, unit, factor) of the first column in the sheet
+        self.columns = columns
+
+    def get_value(self, data, quantity):
+        if quantity not in self.columns:
+            return None
+        column, unit, factor = self.columns[quantity]
+        if quantity in SOLUTION_CHEMICAL_TEXT:
+            return get_value(data, column, None, False)
+        return get_value(data, column, None, unit=unit, factor=factor)
+
+
+class SolutionColumnIndex:
+    """
+    The solvent, solute and additive slots of a sheet, built once from its
+    columns. Columns that look like solution columns but do not fit a slot are
+    collected in ``errors``.
+    """
+
+    def __init__(self, columns):
+        self.errors = []
+        slot_columns = {kind: {} for kind in SOLUTION_CHEMICAL_COLUMNS}
+        for column in columns:
+            kind = column.split(' ')[0].lower()
+            if kind not in SOLUTION_CHEMICAL_COLUMNS:
+                continue
+            slot = ' '.join(column.split(' ')[:2])
+            slot_columns[kind].setdefault(slot, set()).add(column)
+
+        for kind, fields in SOLUTION_CHEMICAL_COLUMNS.items():
+            slots = []
+            for slot, present in sorted(slot_columns[kind].items()):
+                resolved = {}
+                known = set()
+                for quantity, candidates in fields:
+                    for suffix, unit, factor in candidates:
+                        known.add(f'{slot} {suffix}')
+                        if quantity not in resolved and f'{slot} {suffix}' in present:
+                            resolved[quantity] = (f'{slot} {suffix}', unit, factor)
+                for column in sorted(present - known):
+                    self.errors.append(f'Unknown {kind} column "{column}"')
+                if 'name' not in resolved:
+                    self.errors.append(f'{slot} has no name column')
+                slots.append(SolutionSlot(slot, resolved))
+            setattr(self, kind, slots)
+
+    def validate(self, strict=False):
+        """Reports the errors as a warning, or raises a ValueError if strict."""
+        if not self.errors:
+            return
+        message = 'Malformed solution columns: ' + '; '.join(self.errors)
+        if strict:
+            raise ValueError(message)
+        logger.warning(message)
+
+
+@lru_cache(maxsize=32)
+def _get_solution_column_index(columns):
+    index = SolutionColumnIndex(columns)
+    # reported once per header, as the index is cached
+    index.validate()
+    return index
+
+
+def get_solution_column_index(columns):
+    """Returns the cached SolutionColumnIndex of the columns of a sheet."""
+    return _get_solution_column_index(tuple(columns))
+
+
+def map_solution_chemical(data, slot):
+    return SolutionChemical(
+        chemical_2=PubChemPureSubstanceSectionCustom(
+            name=slot.get_value(data, 'name'),
+            load_data=False,
+        ),
+        chemical_volume=slot.get_value(data, 'chemical_volume'),
+        concentration_mol=slot.get_value(data, 'concentration_mol'),
+        concentration_mass=slot.get_value(data, 'concentration_mass'),
+        amount_relative=slot.get_value(data, 'amount_relative'),
+        chemical_id=slot.get_value(data, 'chemical_id'),
+    )
+
+
 def map_solutions(data):
     filtration = None
 
@@ -238,90 +471,12 @@ def map_solutions(data):
             filter_pore_size=get_value(data, 'Filter Pore Size [um]', None, unit='um'),
         )
 
-    solvents = []
-    solutes = []
-    additives = []
-    for col in data.index:
-        if col.lower().startswith('solvent'):
-            solvents.append(' '.join(col.split(' ')[:2]))
-        if col.lower().startswith('solute'):
-            solutes.append(' '.join(col.split(' ')[:2]))
-        if col.lower().startswith('additive'):
-            additives.append(' '.join(col.split(' ')[:2]))
-
-    final_solvents = []
-    final_solutes = []
-    final_additives = []
-
-    for solvent in sorted(set(solvents)):
-        final_solvents.append(
-            SolutionChemical(
-                chemical_2=PubChemPureSubstanceSectionCustom(
-                    name=get_value(data, f'{solvent} name', None, False),
-                    load_data=False,
-                ),
-                chemical_volume=get_value(
-                    data, f'{solvent} volume [uL]', None, unit='uL'
-                ),
-                amount_relative=get_value(data, f'{solvent} relative amount', None),
-                chemical_id=get_value(data, f'{solvent} chemical ID', None, False),
-            )
-        )
-    for solute in sorted(set(solutes)):
-        final_solutes.append(
-            SolutionChemical(
-                chemical_2=PubChemPureSubstanceSectionCustom(
-                    name=get_value(
-                        data, [f'{solute} type', f'{solute} name'], None, False
-                    ),
-                    load_data=False,
-                ),
-                concentration_mol=get_value(
-                    data, f'{solute} Concentration [mM]', None, unit='mM'
-                ),
-                concentration_mass=get_value(
-                    data,
-                    [
-                        f'{solute} Concentration [wt%]',
-                        f'{solute} Concentration [mg/ml]',
-                    ],
-                    None,
-                    unit=['mg/ml', 'mg/ml'],
-                    factor=[10, 1],
-                ),
-                amount_relative=get_value(data, f'{solute} relative amount', None),
-                chemical_id=get_value(data, f'{solute} chemical ID', None, False),
-            )
-        )
-    for additive in sorted(set(additives)):
-        final_additives.append(
-            SolutionChemical(
-                chemical_2=PubChemPureSubstanceSectionCustom(
-                    name=get_value(data, [f'{additive} name'], None, False),
-                    load_data=False,
-                ),
-                concentration_mol=get_value(
-                    data, f'{additive} Concentration [mM]', None, unit='mM'
-                ),
-                concentration_mass=get_value(
-                    data,
-                    [
-                        f'{additive} Concentration [wt%]',
-                        f'{additive} Concentration [mg/ml]',
-                    ],
-                    None,
-                    unit=['mg/ml', 'mg/ml'],
-                    factor=[10, 1],
-                ),
-                amount_relative=get_value(data, f'{additive} relative amount', None),
-                chemical_id=get_value(data, f'{additive} chemical ID', None, False),
-            )
-        )
+    index = get_solution_column_index(data.index)
 
     archive = Solution(
-        solvent=final_solvents,
-        solute=final_solutes,
-        additive=final_additives,
+        solvent=[map_solution_chemical(data, slot) for slot in index.solvent],
+        solute=[map_solution_chemical(data, slot) for slot in index.solute],
+        additive=[map_solution_chemical(data, slot) for slot in index.additive],
         filtration=filtration,
     )
 
@@ -995,6 +1150,21 @@ def map_substrate(data, substrate_class):
     return archive
 
 
+def map_substrates(data, substrate_class, strict=False):
+    """
+    map_substrate for every row of data, with the 'Date' column parsed once by
+    get_dates.
+    """
+    dates = get_dates(data, strict)
+    rows = data.drop(columns='Date', errors='ignore')
+    substrates = []
+    for (_, row), date in zip(rows.iterrows(), dates):
+        archive = map_substrate(row, substrate_class)
+        archive.datetime = date
+        substrates.append(archive)
+    return substrates
+
+
 def map_evaporation(
     i, j, lab_ids, data, upload_id, evaporation_class, coevaporation=False
 ):
@@ -0,0 +1,1124 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Declarative column schemas for the solar cell batch excel import.
+
+The ``map_*`` functions in ``solar_cell_batch_mapping`` look up every value cell
+by cell. Here each process type is described once as a tree of columns with
+pre-bound units. A process step of a batch sheet is coerced column by column
+with pandas, turned into plain process dicts and only then into metainfo
+sections. The resulting archives are the same as the ones of the ``map_*``
+functions.
+"""
+
+import math
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+
+import pandas as pd
+from nomad.datamodel.metainfo.basesections import CompositeSystemReference
+from nomad.units import ureg
+
+from baseclasses import LayerProperties, PubChemPureSubstanceSectionCustom
+from baseclasses.atmosphere import Atmosphere
+from baseclasses.helper.solar_cell_batch_mapping import (
+    get_reference,
+    get_solution_column_index,
+)
+from baseclasses.material_processes_misc import (
+    AirKnifeGasQuenching,
+    Annealing,
+    AntiSolventQuenching,
+    GasQuenchingWithNozzle,
+    LaminationSettings,
+    PlasmaCleaning,
+    SolutionCleaning,
+    UVCleaning,
+    VacuumQuenching,
+)
+from baseclasses.material_processes_misc.laser_scribing import LaserScribingProperties
+from baseclasses.solar_energy.carbonpaste import CarbonPasteLayerProperties
+from baseclasses.solution import Solution, SolutionChemical, SolutionWaschingFiltration
+from baseclasses.vapour_based_deposition.atomic_layer_deposition import (
+    ALDMaterial,
+    ALDPropertiesIris,
+)
+from baseclasses.vapour_based_deposition.close_space_sublimation import CSSProcess
+from baseclasses.vapour_based_deposition.sputtering import SputteringProcess
+from baseclasses.wet_chemical_deposition import PrecursorSolution
+from baseclasses.wet_chemical_deposition.blade_coating import BladeCoatingProperties
+from baseclasses.wet_chemical_deposition.dip_coating import DipCoatingProperties
+from baseclasses.wet_chemical_deposition.gravure_printing import (
+    GravurePrintingProperties,
+)
+from baseclasses.wet_chemical_deposition.slot_die_coating import (
+    SlotDieCoatingProperties,
+)
+from baseclasses.wet_chemical_deposition.spin_coating import SpinCoatingRecipeSteps
+
+
+def _as_tuple(value, length=None):
+    if isinstance(value, list | tuple):
+        return tuple(value)
+    return (value,) * (length or 1)
+
+
+@cache
+def bound_unit(unit):
+    return ureg(unit).units
+
+
+class Column:
+    """
+    One value of the excel sheet, with the same semantics as ``get_value``.
+
+    ``keys`` are alternative column names, the first one present in the sheet is
+    used. ``unit`` and ``factor`` can be given per key. Numbers are converted to
+    the unit of the first key, so a coerced column always has one unit.
+    """
+
+    def __init__(self, keys, unit=None, factor=1.0, number=True, default=None):
+        self.keys = _as_tuple(keys)
+        self.units = _as_tuple(unit, len(self.keys))
+        self.factors = _as_tuple(factor, len(self.keys))
+        self.number = number
+        self.default = default
+
+    @property
+    def unit(self):
+        return self.units[0]
+
+    def resolve(self, columns):
+        for key, unit, factor in zip(self.keys, self.units, self.factors):
+            if key in columns:
+                return key, unit, factor
+        return None
+
+    def coerce(self, frame):
+        """Returns the values of this column for all rows of ``frame``."""
+        resolved = self.resolve(frame.columns)
+        if resolved is None:
+            return [self.default] * len(frame)
+        key, unit, factor = resolved
+        values = frame[key]
+        missing = values.isna()
+        if not self.number:
+            values = values.astype(str).str.strip()
+        else:
+            try:
+                values = pd.to_numeric(values, errors='raise') * factor
+            except (TypeError, ValueError) as e:
+                raise ValueError(f'Column "{key}" contains non numeric values') from e
+            if unit and self.unit and unit != self.unit:
+                values = pd.Series(
+                    ureg.Quantity(values.to_numpy(dtype=float), bound_unit(unit))
+                    .to(bound_unit(self.unit))
+                    .magnitude,
+                    index=values.index,
+                )
+        return values.astype(object).where(~missing, self.default).tolist()
+
+    def to_value(self, value):
+        if value is None or not self.number or not self.unit:
+            return value
+        return ureg.Quantity(value, bound_unit(self.unit))
+
+
+class Section:
+    """
+    A metainfo section filled from columns.
+
+    ``when`` is an optional condition ``when(lookup)``, where ``lookup(column)``
+    returns the coerced value of a column in the current row. If the condition
+    fails the section is not created.
+    """
+
+    def __init__(
+        self,
+        section_def,
+        quantities=None,
+        sub_sections=None,
+        constants=None,
+        when=None,
+    ):
+        self.section_def = section_def
+        self.quantities = quantities or {}
+        self.sub_sections = sub_sections or {}
+        self.constants = constants or {}
+        self.when = when
+
+    @property
+    def name(self):
+        return getattr(self.section_def, '__name__', None)
+
+    def expand(self, columns):
+        sub_sections = {
+            name: node.expand(columns) for name, node in self.sub_sections.items()
+        }
+        if all(sub_sections[name] is node for name, node in self.sub_sections.items()):
+            return self
+        return Section(
+            self.section_def, self.quantities, sub_sections, self.constants, self.when
+        )
+
+    def applies(self, lookup):
+        return self.when is None or bool(self.when(lookup))
+
+    def record(self, lookup):
+        if not self.applies(lookup):
+            return None
+        record = {'m_def': self.name}
+        for name, column in self.quantities.items():
+            record[name] = lookup(column)
+        for name, node in self.sub_sections.items():
+            record[name] = node.record(lookup)
+        return record
+
+    def build(self, record, section_def=None):
+        if record is None:
+            return None
+        kwargs = dict(self.constants)
+        for name, column in self.quantities.items():
+            kwargs[name] = column.to_value(record.get(name))
+        for name, node in self.sub_sections.items():
+            kwargs[name] = node.build(record.get(name))
+        # unset values are left out, setting them to None is not for free
+        kwargs = {name: value for name, value in kwargs.items() if value is not None}
+        return (section_def or self.section_def)(**kwargs)
+
+
+class _Options:
+    def __init__(self, *options):
+        self.options = options
+
+    def expand(self, columns):
+        options = [option.expand(columns) for option in self.options]
+        if all(new is old for new, old in zip(options, self.options)):
+            return self
+        return type(self)(*options)
+
+    def option(self, name):
+        for option in self.options:
+            if option.name == name:
+                return option
+
+
+class OneOf(_Options):
+    """A single sub section, the first option whose condition holds."""
+
+    def record(self, lookup):
+        for option in self.options:
+            record = option.record(lookup)
+            if record is not None:
+                return record
+        return None
+
+    def build(self, record):
+        if record is None:
+            return None
+        return self.option(record['m_def']).build(record)
+
+
+class Each(_Options):
+    """A repeating sub section with one entry per option whose condition holds."""
+
+    def record(self, lookup):
+        records = [option.record(lookup) for option in self.options]
+        return [record for record in records if record is not None]
+
+    def build(self, records):
+        return [self.option(record['m_def']).build(record) for record in records]
+
+
+class SolutionChemicals:
+    """
+    The solvents, solutes or additives of a solution.
+
+    The number of chemicals is only known from the header of the sheet, so the
+    node is expanded into one option per chemical for every process step.
+    """
+
+    def __init__(self, kind, make_section):
+        self.kind = kind
+        self.make_section = make_section
+
+    def expand(self, columns):
+        slots = getattr(get_solution_column_index(columns), self.kind)
+        return Each(*[self.make_section(slot.slot) for slot in slots])
+
+
+ProcessSchema = namedtuple(
+    'ProcessSchema',
+    ['key', 'section', 'name', 'file_name', 'label', 'position', 'match'],
+    defaults=(None, 'positon_in_experimental_plan', ()),
+)
+ProcessSchema.__doc__ = """
+Schema of one process type of the batch sheet.
+
+``name`` and ``file_name`` are format strings, ``{label}`` is the value of the
+``label`` column, ``{label_}`` the same with underscores instead of blanks.
+"""
+
+ProcessStep = namedtuple('ProcessStep', ['i', 'data', 'lab_ids', 'upload_id'])
+ProcessStep.__doc__ = """
+A process step of a batch sheet: its position ``i`` in the sheet, its columns
+with one row per sample and the lab ids of the samples in the same order.
+"""
+
+ShardPool = namedtuple('ShardPool', ['processes', 'shard_size'], defaults=(None,))
+ShardPool.__doc__ = """
+The number of worker processes of ``map_sheet_dicts`` and the number of rows per
+shard, by default one shard per process.
+"""
+
+
+def group_rows(step):
+    """
+    Groups identical rows of a process step, in the order of their first
+    occurrence. Returns a list of ``(row_hash, first_position, positions)``.
+    """
+    groups = {}
+    row_hashes = pd.util.hash_pandas_object(step, index=False).tolist()
+    for position, row_hash in enumerate(row_hashes):
+        groups.setdefault(row_hash, []).append(position)
+    return [
+        (row_hash, positions[0], positions) for row_hash, positions in groups.items()
+    ]
+
+
+def _step_records(step, schema):
+    lab_ids = list(step.lab_ids)
+    section = schema.section.expand(step.data.columns)
+    groups = group_rows(step.data)
+    first_rows = step.data.iloc[[position for _, position, _ in groups]]
+
+    coerced = {}
+
+    def column_values(column):
+        if column not in coerced:
+            coerced[column] = column.coerce(first_rows)
+        return coerced[column]
+
+    records = []
+    for n, (row_hash, position, positions) in enumerate(groups):
+
+        def lookup(column, n=n):
+            return column_values(column)[n]
+
+        record = section.record(lookup)
+        label = lookup(schema.label) if schema.label is not None else ''
+        fmt = dict(i=step.i, j=step.data.index[position], label=label)
+        fmt['label_'] = label.replace(' ', '_')
+        record['name'] = schema.name.format(**fmt)
+        record[schema.position] = step.i
+        record['samples'] = [
+            {
+                'reference': get_reference(
+                    step.upload_id, f'{lab_ids[p]}.archive.json'
+                ),
+                'lab_id': lab_ids[p],
+            }
+            for p in positions
+        ]
+        records.append((row_hash, schema.file_name.format(**fmt), record))
+    return records
+
+
+def process_records(step, schema):
+    """
+    Maps one ``ProcessStep`` of a batch sheet to plain process dicts.
+
+    Identical rows are merged into one process like for the ``map_*``
+    functions. Returns a list of ``(file_name, record)``.
+    """
+    return [(file_name, record) for _, file_name, record in _step_records(step, schema)]
+
+
+def build_process(record, section, process_class, schema):
+    """Creates the process archive of a record from ``process_records``."""
+    archive = section.build(record, process_class)
+    archive.name = record['name']
+    setattr(archive, schema.position, record[schema.position])
+    archive.samples = [
+        CompositeSystemReference(**sample) for sample in record['samples']
+    ]
+    return archive
+
+
+def map_step(step, process_class, schema):
+    """
+    Maps one ``ProcessStep`` of a batch sheet like the ``map_*`` functions.
+
+    Returns a list of ``(file_name, archive)``, one for each distinct row.
+    """
+    section = schema.section.expand(step.data.columns)
+    return [
+        (file_name, build_process(record, section, process_class, schema))
+        for file_name, record in process_records(step, schema)
+    ]
+
+
+def map_shard(step, process_class, schema_key):
+    """
+    Maps a shard of the rows of a process step to archive dicts.
+
+    Runs in the worker processes of ``map_sheet_dicts``, so it takes the key of
+    the schema and returns plain dicts only. Returns a list of
+    ``(row_hash, file_name, archive_dict)``.
+    """
+    schema = PROCESS_SCHEMAS[schema_key]
+    section = schema.section.expand(step.data.columns)
+    return [
+        (
+            row_hash,
+            file_name,
+            build_process(record, section, process_class, schema).m_to_dict(
+                with_root_def=True
+            ),
+        )
+        for row_hash, file_name, record in _step_records(step, schema)
+    ]
+
+
+def merge_shards(shards):
+    """
+    Merges the results of ``map_shard`` for consecutive shards of one step.
+
+    A row which shows up in several shards is kept at its first occurrence with
+    the samples of all shards, so the result is the same as for a single shard.
+    """
+    merged = {}
+    for shard in shards:
+        for row_hash, file_name, archive in shard:
+            if row_hash in merged:
+                merged[row_hash][1].setdefault('samples', []).extend(
+                    archive.get('samples', [])
+                )
+            else:
+                merged[row_hash] = (file_name, archive)
+    return list(merged.values())
+
+
+def get_schema(step_name):
+    """Returns the schema of a process step by the name of its sheet column."""
+    for schema in PROCESS_SCHEMAS.values():
+        if any(match in step_name for match in schema.match):
+            return schema
+    return None
+
+
+def map_sheet(sheet, upload_id, process_classes, id_column=None):
+    """
+    Maps all process steps of a batch sheet.
+
+    ``sheet`` has a two level header, the first level being the process step.
+    ``process_classes`` maps schema keys to the process classes of the lab.
+    Steps without a schema or class are left to the ``map_*`` functions.
+    """
+    id_column = id_column or ('Experiment Info', 'Nomad ID')
+    lab_ids = sheet[id_column].tolist()
+    archives = []
+    for i, step_name in enumerate(sheet.columns.get_level_values(0).unique()):
+        schema = get_schema(step_name)
+        if schema is None or schema.key not in process_classes:
+            continue
+        step = ProcessStep(i, sheet[step_name], lab_ids, upload_id)
+        archives.extend(map_step(step, process_classes[schema.key], schema))
+    return archives
+
+
+def map_sheet_dicts(sheet, upload_id, process_classes, id_column=None, pool=None):
+    """
+    Maps all process steps of a batch sheet to archive dicts.
+
+    Same as ``map_sheet``, but returns ``(file_name, archive_dict)`` with the
+    ``m_to_dict(with_root_def=True)`` of each archive. With a ``ShardPool`` the
+    rows of every step are split into shards, which are mapped in a process pool.
+    The result does not depend on the number of processes.
+    """
+    id_column = id_column or ('Experiment Info', 'Nomad ID')
+    lab_ids = sheet[id_column].tolist()
+    processes, shard_size = pool or ShardPool(None)
+    tasks = []
+    for i, step_name in enumerate(sheet.columns.get_level_values(0).unique()):
+        schema = get_schema(step_name)
+        if schema is None or schema.key not in process_classes:
+            continue
+        step = sheet[step_name]
+        size = shard_size or max(1, math.ceil(len(step) / (processes or 1)))
+        for start in range(0, len(step), size):
+            shard = ProcessStep(
+                i,
+                step.iloc[start : start + size],
+                lab_ids[start : start + size],
+                upload_id,
+            )
+            tasks.append((shard, process_classes[schema.key], schema.key))
+
+    if processes and processes > 1 and tasks:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            shards = list(executor.map(map_shard, *zip(*tasks)))
+    else:
+        shards = [map_shard(*task) for task in tasks]
+
+    steps = {}
+    for task, shard in zip(tasks, shards):
+        steps.setdefault(task[0].i, []).append(shard)
+    archives = []
+    for step_shards in steps.values():
+        archives.extend(merge_shards(step_shards))
+    return archives
+
+
+# Shared blocks
+
+MATERIAL_NAME = Column('Material name', number=False, default='')
+LAYER_TYPE = Column('Layer type', number=False, default='')
+
+PUBCHEM_CONSTANTS = {'load_data': False}
+
+
+def pubchem(column):
+    return Section(
+        PubChemPureSubstanceSectionCustom,
+        {'name': column},
+        constants=PUBCHEM_CONSTANTS,
+    )
+
+
+def common_quantities(description_default=''):
+    return {
+        'location': Column('Tool/GB name', number=False, default=''),
+        'description': Column('Notes', number=False, default=description_default),
+    }
+
+
+ANNEALING = Section(
+    Annealing,
+    {
+        'temperature': Column('Annealing temperature [°C]', unit='°C'),
+        'time': Column('Annealing time [min]', unit='minute'),
+        'atmosphere': Column(
+            ['Annealing athmosphere', 'Annealing atmosphere'], number=False
+        ),
+    },
+)
+
+ATMOSPHERE = Section(
+    Atmosphere,
+    {
+        'oxygen_level_ppm': Column('GB oxygen level [ppm]'),
+        'relative_humidity': Column(['rel. humidity [%]', 'Room/GB humidity [%]']),
+        'temperature': Column('Room temperature [°C]', unit='°C'),
+    },
+)
+
+LAYER = Each(
+    Section(
+        CarbonPasteLayerProperties,
+        {
+            'layer_type': Column('Layer type', number=False),
+            'layer_material_name': Column('Material name', number=False),
+            'layer_thickness': Column('Layer thickness [nm]', unit='nm'),
+            'supplier': Column('Supplier', number=False),
+            'batch': Column('Batch', number=False),
+            'drying_time': Column('Drying Time [s]', unit='s'),
+            'cost': Column('Cost [EUR]'),
+        },
+        when=lambda lookup: 'Carbon Paste Layer' in lookup(LAYER_TYPE),
+    ),
+    Section(
+        LayerProperties,
+        {
+            'layer_type': Column('Layer type', number=False),
+            'layer_material_name': Column('Material name', number=False),
+            'layer_thickness': Column('Layer thickness [nm]', unit='nm'),
+            'layer_transmission': Column('Transmission [%]'),
+            'layer_morphology': Column('Morphology', number=False),
+            'layer_sheet_resistance': Column('Sheet Resistance [Ohms/square]'),
+        },
+        when=lambda lookup: 'Carbon Paste Layer' not in lookup(LAYER_TYPE),
+    ),
+)
+
+
+def solvent_section(slot):
+    return Section(
+        SolutionChemical,
+        {
+            'chemical_volume': Column(f'{slot} volume [uL]', unit='uL'),
+            'amount_relative': Column(f'{slot} relative amount'),
+            'chemical_id': Column(f'{slot} chemical ID', number=False),
+        },
+        {'chemical_2': pubchem(Column(f'{slot} name', number=False))},
+    )
+
+
+def solute_section(slot, name_keys):
+    return Section(
+        SolutionChemical,
+        {
+            'concentration_mol': Column(f'{slot} Concentration [mM]', unit='mM'),
+            'concentration_mass': Column(
+                [f'{slot} Concentration [wt%]', f'{slot} Concentration [mg/ml]'],
+                unit=['mg/ml', 'mg/ml'],
+                factor=[10, 1],
+            ),
+            'amount_relative': Column(f'{slot} relative amount'),
+            'chemical_id': Column(f'{slot} chemical ID', number=False),
+        },
+        {'chemical_2': pubchem(Column(name_keys, number=False))},
+    )
+
+
+FILTER_MATERIAL = Column('Filter Material', number=False)
+
+SOLUTION = Section(
+    Solution,
+    sub_sections={
+        'solvent': SolutionChemicals('solvent', solvent_section),
+        'solute': SolutionChemicals(
+            'solute',
+            lambda slot: solute_section(slot, [f'{slot} type', f'{slot} name']),
+        ),
+        'additive': SolutionChemicals(
+            'additive', lambda slot: solute_section(slot, [f'{slot} name'])
+        ),
+        'filtration': OneOf(
+            Section(
+                SolutionWaschingFiltration,
+                {
+                    'filter_material': FILTER_MATERIAL,
+                    'filter_pore_size': Column('Filter Pore Size [um]', unit='um'),
+                },
+                constants={'washing_technique': 'Filtration'},
+                when=lambda lookup: lookup(FILTER_MATERIAL),
+            )
+        ),
+    },
+)
+
+PRECURSOR_SOLUTION = Each(
+    Section(
+        PrecursorSolution,
+        {
+            'solution_volume': Column(
+                ['Solution volume [um]', 'Solution volume [uL]'], unit=['uL', 'uL']
+            ),
+            'solution_viscosity': Column('Viscosity [mPa*s]', unit='mPa*s'),
+            'solution_contact_angle': Column('Contact angle [°]', unit='°'),
+        },
+        {'solution_details': SOLUTION},
+    )
+)
+
+ANTI_SOLVENT_NAME = Column('Anti solvent name', number=False)
+
+ANTI_SOLVENT_QUENCHING = Section(
+    AntiSolventQuenching,
+    {
+        'anti_solvent_volume': Column('Anti solvent volume [ml]', unit='mL'),
+        'anti_solvent_dropping_time': Column(
+            'Anti solvent dropping time [s]', unit='s'
+        ),
+        'anti_solvent_dropping_height': Column(
+            'Anti solvent dropping heigt [mm]', unit='mm'
+        ),
+        'anti_solvent_dropping_flow_rate': Column(
+            [
+                'Anti solvent dropping speed [ul/s]',
+                'Anti solvent dropping speed [uL/s]',
+            ],
+            unit=['uL/s', 'uL/s'],
+        ),
+    },
+    {'anti_solvent_2': pubchem(ANTI_SOLVENT_NAME)},
+    when=lambda lookup: lookup(ANTI_SOLVENT_NAME),
+)
+
+VACUUM_QUENCHING_DURATION = Column('Vacuum quenching duration [s]', unit='s')
+
+VACUUM_QUENCHING = Section(
+    VacuumQuenching,
+    {
+        'start_time': Column('Vacuum quenching start time [s]', unit='s'),
+        'duration': VACUUM_QUENCHING_DURATION,
+        'pressure': Column('Vacuum quenching pressure [bar]', unit='bar'),
+    },
+    when=lambda lookup: lookup(VACUUM_QUENCHING_DURATION),
+)
+
+QUENCHING_GAS = Column('Gas', number=False)
+
+GAS_QUENCHING_WITH_NOZZLE = Section(
+    GasQuenchingWithNozzle,
+    {
+        'starting_delay': Column('Gas quenching start time [s]', unit='s'),
+        'flow_rate': Column('Gas quenching flow rate [ml/s]', unit='ml/s'),
+        'height': Column('Gas quenching height [mm]', unit='mm'),
+        'duration': Column('Gas quenching duration [s]', unit='s'),
+        'pressure': Column('Gas quenching pressure [bar]', unit='bar'),
+        'velocity': Column('Gas quenching velocity [m/s]', unit='m/s'),
+        'nozzle_shape': Column('Nozzle shape', number=False),
+        'nozzle_size': Column('Nozzle size [mm²]', number=False),
+        'gas': QUENCHING_GAS,
+    },
+    when=lambda lookup: lookup(QUENCHING_GAS),
+)
+
+AIR_KNIFE_ANGLE = Column('Air knife angle [°]', unit='°')
+
+AIR_KNIFE_GAS_QUENCHING = Section(
+    AirKnifeGasQuenching,
+    {
+        'air_knife_angle': AIR_KNIFE_ANGLE,
+        'bead_volume': Column('Bead volume [mm/s]', unit='mm/s'),
+        'drying_speed': Column('Drying speed [cm/min]', unit='cm/minute'),
+        'air_knife_distance_to_thin_film': Column('Air knife gap [cm]', unit='cm'),
+        'drying_gas_temperature': Column(
+            ['Drying gas temperature [°]', 'Drying gas temperature [°C]'],
+            unit=['°C', '°C'],
+        ),
+        'heat_transfer_coefficient': Column(
+            'Heat transfer coefficient [W m^-2 K^-1]', unit='W/(K*m**2)'
+        ),
+    },
+    when=lambda lookup: lookup(AIR_KNIFE_ANGLE),
+)
+
+
+def solution_process(description_default=None, **sub_sections):
+    sub_sections = {
+        'solution': PRECURSOR_SOLUTION,
+        'layer': LAYER,
+        'atmosphere': ATMOSPHERE,
+        'annealing': ANNEALING,
+        **sub_sections,
+    }
+    return Section(
+        None,
+        common_quantities(description_default),
+        sub_sections,
+    )
+
+
+def recipe_step(step):
+    rotation_time = Column(f'Rotation time {step}[s]', unit='s')
+    return Section(
+        SpinCoatingRecipeSteps,
+        {
+            'speed': Column(f'Rotation speed {step}[rpm]', unit='rpm'),
+            'time': rotation_time,
+            'acceleration': Column(f'Acceleration {step}[rpm/s]', unit='rpm/s'),
+        },
+        when=lambda lookup: lookup(rotation_time),
+    )
+
+
+SPIN_COATING = solution_process(
+    quenching=OneOf(
+        ANTI_SOLVENT_QUENCHING, VACUUM_QUENCHING, GAS_QUENCHING_WITH_NOZZLE
+    ),
+    recipe_steps=Each(*[recipe_step(step) for step in ['', '1 ', '2 ', '3 ', '4 ']]),
+    description_default='',
+)
+
+BLADE_COATING = solution_process(
+    properties=Section(
+        BladeCoatingProperties,
+        {
+            'blade_speed': Column('Blade Speed [mm/s]', unit='mm/s'),
+            'dispensed_volume': Column('Dispensed Ink Volume [uL]', unit='uL'),
+            'blade_substrate_gap': Column('Blade Gap [um]', unit='um'),
+            'blade_size': Column('Blade Size', number=False),
+            'coating_width': Column('Coating Width [mm]', unit='mm'),
+            'coating_length': Column('Coating Length [mm]', unit='mm'),
+            'dead_length': Column('Dead Length [mm]', unit='mm'),
+            'bed_temperature': Column('Bed Temperature [°C]', unit='°C'),
+            'ink_temperature': Column('Ink Temperature [°C]', unit='°C'),
+        },
+    ),
+    quenching=OneOf(
+        VACUUM_QUENCHING, GAS_QUENCHING_WITH_NOZZLE, AIR_KNIFE_GAS_QUENCHING
+    ),
+)
+
+GRAVURE_PRINTING = solution_process(
+    properties=Section(
+        GravurePrintingProperties,
+        {
+            'gp_coating_speed': Column('Coating Speed [m/min]', unit='m/minute'),
+            'screen_ruling': Column('Screen Ruling [lines/cm]'),
+            'gp_method': Column('R2R or S2S', number=False, default=''),
+            'gp_direction': Column('Forward or Reverse', number=False, default=''),
+            'cell_type': Column('Cell Type', number=False),
+            'ink_temperature': Column('Ink Temperature [°C]', unit='°C'),
+        },
+    ),
+    quenching=OneOf(ANTI_SOLVENT_QUENCHING, AIR_KNIFE_GAS_QUENCHING),
+)
+
+SLOT_DIE_COATING = solution_process(
+    properties=Section(
+        SlotDieCoatingProperties,
+        {
+            'coating_run': Column('Coating run', number=False),
+            'flow_rate': Column(
+                ['Flow rate [uL/min]', 'Flow rate [ul/min]'],
+                unit=['uL/minute', 'uL/minute'],
+            ),
+            'slot_die_head_distance_to_thinfilm': Column('Head gap [mm]', unit='mm'),
+            'slot_die_head_speed': Column('Speed [mm/s]', unit='mm/s'),
+            'coated_area': Column('Coated area [mm²]', unit='mm**2'),
+            'temperature': Column('Chuck heating temperature [°C]', unit='°C'),
+        },
+    ),
+    quenching=OneOf(AIR_KNIFE_GAS_QUENCHING),
+)
+
+DIP_COATING = solution_process(
+    properties=Section(
+        DipCoatingProperties, {'time': Column('Dipping duration [s]', unit='s')}
+    ),
+)
+
+LAMINATION = Section(
+    None,
+    common_quantities(),
+    {
+        'settings': Section(
+            LaminationSettings,
+            {
+                'temperature': Column('Temperature [°C]'),
+                'pressure': Column('Pressure [MPa]'),
+                'force': Column('Force [N]'),
+                'area': Column('Area [mm²]'),
+                'time': Column('Time [s]'),
+                'heat_up_time': Column('Heat up time [s]'),
+                'cool_down_time': Column('Cool down time [s]'),
+                'stamp_material': Column('Stamp Material', number=False, default=''),
+                'stamp_thickness': Column('Stamp Thickness [mm]'),
+                'stamp_area': Column('Stamp Area [mm²]'),
+            },
+        )
+    },
+)
+
+
+def solution_cleaning(n):
+    solvent = Column(f'Solvent {n}', number=False)
+    return Section(
+        SolutionCleaning,
+        {
+            'time': Column([f'Time {n} [s]', f'Time {n} [min]'], unit=['s', 'minute']),
+            'temperature': Column(f'Temperature {n} [°C]', unit='°C'),
+        },
+        {'solvent_2': pubchem(solvent)},
+        when=lambda lookup: lookup(solvent),
+    )
+
+
+CLEANING = Section(
+    None,
+    common_quantities(),
+    {
+        'cleaning': Each(*[solution_cleaning(n) for n in range(10)]),
+        'cleaning_uv': Each(
+            Section(
+                UVCleaning,
+                {
+                    'time': Column(
+                        ['UV-Ozone Time [s]', 'UV-Ozone Time [min]'],
+                        unit=['s', 'minute'],
+                    )
+                },
+            )
+        ),
+        'cleaning_plasma': Each(
+            Section(
+                PlasmaCleaning,
+                {
+                    'time': Column(
+                        ['Gas-Plasma Time [s]', 'Gas-Plasma Time [min]'],
+                        unit=['s', 'minute'],
+                    ),
+                    'power': Column('Gas-Plasma Power [W]', unit='W'),
+                    'plasma_type': Column('Gas-Plasma Gas', number=False),
+                },
+            )
+        ),
+    },
+)
+
+ANNEALING_PROCESS = Section(
+    None,
+    common_quantities(),
+    {
+        'annealing': ANNEALING,
+        'atmosphere': Section(
+            Atmosphere, {'relative_humidity': Column('Relative humidity [%]')}
+        ),
+    },
+)
+
+SPUTTERING = Section(
+    None,
+    common_quantities(),
+    {
+        'layer': LAYER,
+        'atmosphere': ATMOSPHERE,
+        'processes': Each(
+            Section(
+                SputteringProcess,
+                {
+                    'thickness': Column('Thickness [nm]', unit='nm'),
+                    'gas_flow_rate': Column(
+                        'Gas flow rate [cm^3/min]', unit='cm**3/minute'
+                    ),
+                    'rotation_rate': Column('Rotation rate [rpm]'),
+                    'power': Column('Power [W]', unit='W'),
+                    'temperature': Column('Temperature [°C]', unit='°C'),
+                    'deposition_time': Column('Deposition time [s]', unit='s'),
+                    'burn_in_time': Column('Burn in time [s]', unit='s'),
+                    'pressure': Column('Pressure [mbar]', unit='mbar'),
+                },
+                {
+                    'target_2': pubchem(Column('Material name', number=False)),
+                    'gas_2': pubchem(Column('Gas', number=False)),
+                },
+            )
+        ),
+    },
+)
+
+CLOSE_SPACE_SUBLIMATION = Section(
+    None,
+    common_quantities(),
+    {
+        'layer': LAYER,
+        'process': Section(
+            CSSProcess,
+            {
+                'thickness': Column('Thickness [nm]', unit='nm'),
+                'substrate_temperature': Column(
+                    'Substrate temperature [°C]', unit='°C'
+                ),
+                'source_temperature': Column('Source temperature [°C]', unit='°C'),
+                'substrate_source_distance': Column(
+                    'Substrate source distance [mm]', unit='mm'
+                ),
+                'deposition_time': Column('Deposition Time [s]', unit='s'),
+                'carrier_gas': Column('Carrier gas', number=False),
+                'pressure': Column('Process pressure [bar]', unit='bar'),
+                'material_state': Column('Material state', number=False),
+            },
+            {'chemical_2': pubchem(Column('Material name', number=False))},
+        ),
+    },
+)
+
+LASER_SCRIBING = Section(
+    None,
+    {
+        'description': Column('Notes', number=False),
+        'recipe_file': Column('Recipe file', number=False),
+        'patterning': Column('Patterning Step', number=False),
+        'layout': Column('Layout', number=False),
+    },
+    {
+        'properties': Section(
+            LaserScribingProperties,
+            {
+                'laser_wavelength': Column('Laser wavelength [nm]'),
+                'laser_pulse_time': Column('Laser pulse time [ps]'),
+                'laser_pulse_frequency': Column('Laser pulse frequency [kHz]'),
+                'speed': Column('Speed [mm/s]'),
+                'fluence': Column('Fluence [J/cm2]'),
+                'power_in_percent': Column('Power [%]'),
+                'cell_width': Column('Width of cell [mm]'),
+                'dead_area': Column('Dead area [cm2]'),
+                'number_of_cells': Column('Number of cells'),
+            },
+        )
+    },
+)
+
+
+def ald_material(n, precursor_key, manifold_temperature):
+    return Section(
+        ALDMaterial,
+        {
+            'pulse_duration': Column(f'Pulse duration {n} [s]'),
+            'pulse_flow_rate': Column(f'Pulse flow rate {n} [ccm]'),
+            'manifold_temperature': manifold_temperature,
+            'purge_duration': Column(f'Purge duration {n} [s]'),
+            'purge_flow_rate': Column(f'Purge flow rate {n} [ccm]'),
+            'bottle_temperature': Column(f'Bottle temperature {n} [°C]'),
+        },
+        {'material': pubchem(Column(precursor_key, number=False))},
+    )
+
+
+ATOMIC_LAYER_DEPOSITION = Section(
+    None,
+    common_quantities(),
+    {
+        'layer': LAYER,
+        'atmosphere': ATMOSPHERE,
+        'properties': Section(
+            ALDPropertiesIris,
+            {
+                'source': Column('Source', number=False),
+                'thickness': Column('Thickness [nm]'),
+                'temperature': Column(
+                    ['Temperature [°C]', 'Reactor Temperature [°C]'],
+                    unit=['°C', '°C'],
+                ),
+                'rate': Column('Rate [A/s]'),
+                'time': Column('Time [s]'),
+                'number_of_cycles': Column('Number of cycles'),
+            },
+            {
+                'material': ald_material(
+                    1,
+                    'Precursor 1',
+                    Column(
+                        [
+                            'Manifold Temperature [°C]',
+                            'Manifold temperature [°C]',
+                            'Manifold temperature 1 [°C]',
+                        ],
+                        unit=['°C', '°C', '°C'],
+                    ),
+                ),
+                'oxidizer_reducer': ald_material(
+                    2,
+                    'Precursor 2 (Oxidizer/Reducer)',
+                    Column('Manifold temperature 2 [°C]'),
+                ),
+            },
+        ),
+    },
+)
+
+GENERIC = Section(None, {'description': Column('Notes', number=False, default='')})
+
+
+def _material_process(key, section, title, tag, match):
+    return ProcessSchema(
+        key,
+        section,
+        name=f'{title} {{label}}',
+        file_name=f'{{i}}_{{j}}_{tag}_{{label}}',
+        label=MATERIAL_NAME,
+        match=match,
+    )
+
+
+PROCESS_SCHEMAS = {
+    schema.key: schema
+    for schema in [
+        ProcessSchema(
+            'cleaning',
+            CLEANING,
+            name='Cleaning',
+            file_name='{i}_{j}_cleaning',
+            match=('Cleaning',),
+        ),
+        ProcessSchema(
+            'laser_scribing',
+            LASER_SCRIBING,
+            name='laser scribing',
+            file_name='{i}_{j}_laser_scribing',
+            match=('Laser Scribing',),
+        ),
+        ProcessSchema(
+            'generic',
+            GENERIC,
+            name='{label}',
+            file_name='{i}_{j}_generic_process_{label_}',
+            label=Column('Name', number=False, default=''),
+            match=('Generic Process',),
+        ),
+        ProcessSchema(
+            'lamination',
+            LAMINATION,
+            name='Lamination',
+            file_name='{i}_{j}_lamination',
+            position='position_in_experimental_plan',
+            match=('Lamination',),
+        ),
+        ProcessSchema(
+            'annealing',
+            ANNEALING_PROCESS,
+            name='Thermal Annealing',
+            file_name='{i}_{j}_annealing',
+            match=('Annealing',),
+        ),
+        _material_process(
+            'spin_coating',
+            SPIN_COATING,
+            'spin coating',
+            'spin_coating',
+            ('Spin Coating',),
+        ),
+        _material_process(
+            'blade_coating',
+            BLADE_COATING,
+            'blade coating',
+            'blade_coating',
+            ('Blade Coating',),
+        ),
+        _material_process(
+            'gravure_printing',
+            GRAVURE_PRINTING,
+            'gravure printing',
+            'gravure_printing',
+            ('Gravure Printing',),
+        ),
+        _material_process(
+            'slot_die_coating',
+            SLOT_DIE_COATING,
+            'slot die coating',
+            'slot_die_coating',
+            ('Slot Die Coating',),
+        ),
+        _material_process(
+            'dip_coating', DIP_COATING, 'dip coating', 'dip_coating', ('Dip Coating',)
+        ),
+        _material_process(
+            'sputtering', SPUTTERING, 'sputtering', 'sputtering', ('Sputtering',)
+        ),
+        _material_process(
+            'close_space_sublimation',
+            CLOSE_SPACE_SUBLIMATION,
+            'Close Space Sublimation',
+            'close_space_subimation',
+            ('Close Space Sublimation',),
+        ),
+        _material_process(
+            'atomic_layer_deposition',
+            ATOMIC_LAYER_DEPOSITION,
+            'atomic layer deposition',
+            'ALD',
+            ('ALD', 'Atomic Layer Deposition'),
+        ),
+    ]
+}
@@ -19,19 +19,23 @@
 import json
 import random
 import string
+import threading
+import weakref
+from collections import namedtuple
 from datetime import datetime
 
 import chardet
 import pandas as pd
 import pytz
-from ase.formula import Formula as ASEFormula
 from nomad.datamodel.metainfo.basesections import CompositeSystemReference
 from nomad.datamodel.results import ELN, Results
 from tabulate import tabulate
 
 
 def get_elements_from_formula(formula):
-    return list(ASEFormula(formula).count().keys())
+    from baseclasses.helper.chemical_formula import formula_elements
+
+    return formula_elements(formula)
 
 
 def export_lab_id(archive, lab_id):
@@ -301,6 +305,7 @@ def create_archive(entity, archive, file_name, overwrite=False):
         with archive.m_context.raw_file(file_name, 'w') as outfile:
             json.dump({'data': entity_entry}, outfile)
         archive.m_context.process_updated_raw_file(file_name, allow_modify=overwrite)
+        search_cache.invalidate()
         return True
     return False
 
@@ -309,14 +314,67 @@ def get_reference(upload_id, entry_id):
     return f'../uploads/{upload_id}/archive/{entry_id}#data'
 
 
-def search_entry_by_id(archive, entry, search_id):
-    from nomad.search import search
+class SearchCache(threading.local):
+    """
+    Memoizes the results of the search helpers while one archive is processed.
+    The cache belongs to the processed archive, it starts empty for every other
+    archive, and is cleared by ``invalidate``, which create_archive calls for
+    every new entry. Searches without hits are not cached, the entry might
+    still be created. Every thread has its own cache.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.start(None)
+
+    def start(self, archive):
+        self.archive = weakref.ref(archive) if archive is not None else None
+        self.results = {}
+        # entity references resolved in this run, see resolve_entity_references
+        self.entries = {}
+        self.lab_ids = {}
+
+    def enter(self, archive):
+        if self.archive is None or self.archive() is not archive:
+            self.start(archive)
+
+    def invalidate(self):
+        self.results = {}
+        self.entries = {}
+        self.lab_ids = {}
+
+    def stats(self):
+        return dict(
+            size=len(self.results),
+            entries=len(self.entries),
+            lab_ids=len(self.lab_ids),
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+    def search(self, archive, query):
+        from nomad.search import search
+
+        user_id = archive.metadata.main_author.user_id
+        self.enter(archive)
+        key = (user_id, json.dumps(query, sort_keys=True, default=str))
+        if key in self.results:
+            self.hits += 1
+            return self.results[key]
+        self.misses += 1
+        search_result = search(owner='all', query=query, user_id=user_id)
+        if search_result.data:
+            self.results[key] = search_result
+        return search_result
+
+
+search_cache = SearchCache()
 
+
+def search_entry_by_id(archive, entry, search_id):
     query = {'results.eln.lab_ids': search_id}
-    search_result = search(
-        owner='all', query=query, user_id=archive.metadata.main_author.user_id
-    )
-    return search_result
+    return search_cache.search(archive, query)
 
 
 def log_error(class_obj, logger, msg):
@@ -327,13 +385,8 @@ def log_error(class_obj, logger, msg):
 
 
 def search_sampleid_in_upload(archive, sample_id, upload_id):
-    from nomad.search import search
-
     query = {'results.eln.lab_ids': sample_id, 'upload_id': upload_id}
-    search_result = search(
-        owner='all', query=query, user_id=archive.metadata.main_author.user_id
-    )
-    return search_result
+    return search_cache.search(archive, query)
 
 
 def set_sample_reference(archive, entry, search_id, upload_id=None):
@@ -372,24 +425,17 @@ def set_sample_reference(archive, entry, search_id, upload_id=None):
 
 
 def create_short_id(archive, lab_id_base, entry_type):
-    from nomad.app.v1.models import MetadataPagination
-    from nomad.search import search
-
-    query = {'entry_type': entry_type, 'results.eln.lab_ids': lab_id_base}
-    pagination = MetadataPagination()
-    pagination.page_size = 9999
-    search_result = search(
-        owner='all',
-        query=query,
-        pagination=pagination,
-        user_id=archive.metadata.main_author.user_id,
-    )
-    from nomad_chemical_energy.schema_packages.hzb_catlab_package import (
-        get_next_project_sample_number,
+    from baseclasses.helper.id_allocator import (
+        next_sample_number,
+        parse_short_sample_number,
     )
 
-    project_sample_number = get_next_project_sample_number(
-        search_result.data, archive.metadata.entry_id
+    query = {'entry_type': entry_type, 'results.eln.lab_ids': lab_id_base}
+    project_sample_number = next_sample_number(
+        archive,
+        f'{entry_type}:{lab_id_base}',
+        query,
+        parse=lambda lab_id: parse_short_sample_number(lab_id, lab_id_base),
     )
 
     return f'{lab_id_base}{project_sample_number:04d}'
@@ -404,16 +450,12 @@ def get_entry_reference(archive, entry, search_id):
 
 
 def find_sample_by_id(archive, sample_id):
-    from nomad.search import search
-
     if sample_id is None:
         return None
 
     query = {'results.eln.lab_ids': sample_id}
 
-    search_result = search(
-        owner='all', query=query, user_id=archive.metadata.main_author.user_id
-    )
+    search_result = search_cache.search(archive, query)
     if len(search_result.data) > 0:
         entry_id = search_result.data[0]['entry_id']
         upload_id = search_result.data[0]['upload_id']
@@ -421,46 +463,209 @@ def find_sample_by_id(archive, sample_id):
 
 
 def search_class(archive, entry_type):
-    from nomad.search import search
-
     query = {'upload_id': archive.metadata.upload_id, 'entry_type': entry_type}
-    search_result = search(
-        owner='all', query=query, user_id=archive.metadata.main_author.user_id
-    )
+    search_result = search_cache.search(archive, query)
     if len(search_result.data) == 1:
         data = search_result.data[0]
         return data
 
 
-def get_processes(archive, entry_id):
-    from nomad import files
-    from nomad.app.v1.models import MetadataPagination
-    from nomad.search import search
-
-    # search for all archives referencing this archive
-    query = {
-        'entry_references.target_entry_id': entry_id,
+def resolve_entity_references(archive, references, logger):
+    """
+    Normalizes entity references like EntityReference.normalize does one by
+    one, but finds the entries of all missing references with one search and
+    reads the lab id of every referenced entry once per processing run.
+    """
+    from nomad.app.v1.models import MetadataRequired
+    from nomad.metainfo import MProxy
+
+    references = [reference for reference in references if reference is not None]
+    search_cache.enter(archive)
+    entries = search_cache.entries
+
+    lab_ids = {
+        reference.lab_id
+        for reference in references
+        if reference.reference is None
+        and reference.lab_id is not None
+        and reference.lab_id not in entries
     }
-    pagination = MetadataPagination()
-    pagination.page_size = 100
-    search_result = search(
+    if lab_ids:
+        found = {}
+        for res in search_all(
+            archive,
+            {'results.eln.lab_ids:any': sorted(lab_ids)},
+            MetadataRequired(include=['entry_id', 'upload_id', 'results.eln.lab_ids']),
+        ):
+            for lab_id in set(res['results']['eln']['lab_ids']) & lab_ids:
+                found.setdefault(lab_id, []).append(
+                    get_reference(res['upload_id'], res['entry_id'])
+                )
+        # lab ids that were not found are not searched again in this run
+        entries.update({lab_id: found.get(lab_id, []) for lab_id in lab_ids})
+
+    for reference in references:
+        if reference.reference is None and reference.lab_id is not None:
+            found = entries.get(reference.lab_id)
+            if found:
+                reference.reference = found[0]
+                if len(found) > 1:
+                    logger.warn(
+                        f'Found {len(found)} entries with lab_id: '
+                        f'"{reference.lab_id}". Will use the first one found.'
+                    )
+            else:
+                logger.warn(f'Found no entries with lab_id: "{reference.lab_id}".')
+                # EntityReference.normalize would search the lab id again
+                if reference.name is None:
+                    reference.name = reference.lab_id
+                continue
+        elif reference.lab_id is None and reference.reference is not None:
+            section = reference.reference
+            if isinstance(section, MProxy):
+                url = section.m_proxy_value
+                if url not in search_cache.lab_ids:
+                    search_cache.lab_ids[url] = section.lab_id
+                reference.lab_id = search_cache.lab_ids[url]
+            else:
+                reference.lab_id = section.lab_id
+        # only sets the name now, reference and lab id are filled in
+        reference.normalize(archive, logger)
+
+
+ProcessRecord = namedtuple(
+    'ProcessRecord', ['position', 'name', 'entry_id', 'upload_id', 'fields']
+)
+
+# data fields read by get_processes if nothing else is required
+PROCESS_FIELDS = ['m_def', 'name', 'datetime', 'positon_in_experimental_plan']
+
+
+def search_all(archive, query, required=None):
+    """Yields all hits of a search for the main author of the archive."""
+    from nomad.search import search_iterator
+
+    return search_iterator(
         owner='all',
         query=query,
-        pagination=pagination,
+        required=required,
         user_id=archive.metadata.main_author.user_id,
     )
-    processes = []
-    for res in search_result.data:
-        with files.UploadFiles.get(upload_id=res['upload_id']).read_archive(
-            entry_id=res['entry_id']
-        ) as arch:
-            entry_id = res['entry_id']
-            entry_data = arch[entry_id]['data']
-            if 'positon_in_experimental_plan' in entry_data:
-                processes.append(
-                    (
-                        entry_data.get('positon_in_experimental_plan'),
-                        entry_data.get('name'),
-                    )
+
+
+def read_process_records(entries, required):
+    """
+    Reads the required data fields of the given entries, opening the files of
+    every upload once. ``entries`` maps upload ids to lists of entry ids.
+    Entries without a position in the experimental plan are skipped.
+    """
+    from nomad import files
+
+    for upload_id, entry_ids in entries.items():
+        upload_files = files.UploadFiles.get(upload_id=upload_id)
+        try:
+            for entry_id in entry_ids:
+                with upload_files.read_archive(entry_id=entry_id) as arch:
+                    entry_data = arch[entry_id]['data']
+                    if 'positon_in_experimental_plan' not in entry_data:
+                        continue
+                    fields = {}
+                    for field in required:
+                        value = entry_data.get(field)
+                        fields[field] = (
+                            value.to_json() if hasattr(value, 'to_json') else value
+                        )
+                yield ProcessRecord(
+                    fields['positon_in_experimental_plan'],
+                    fields['name'],
+                    entry_id,
+                    upload_id,
+                    fields,
                 )
-    return sorted(processes, key=lambda pair: pair[0])
+        finally:
+            upload_files.close()
+
+
+def _process_fields(required):
+    required = list(required or PROCESS_FIELDS)
+    for field in ['positon_in_experimental_plan', 'name']:
+        if field not in required:
+            required.append(field)
+    return required
+
+
+def get_processes(archive, entry_id, required=None):
+    """
+    Returns the processes referencing an entry, sorted by their position in the
+    experimental plan, as ProcessRecord (position, name, entry_id, upload_id,
+    fields). Only the ``required`` data fields are read from the archives.
+    """
+    from nomad.app.v1.models import MetadataRequired
+
+    required = _process_fields(required)
+
+    # search for all archives referencing this archive
+    query = {
+        'entry_references.target_entry_id': entry_id,
+    }
+    entries = {}
+    for res in search_all(
+        archive, query, MetadataRequired(include=['entry_id', 'upload_id'])
+    ):
+        entries.setdefault(res['upload_id'], []).append(res['entry_id'])
+
+    processes = read_process_records(entries, required)
+    return sorted(processes, key=lambda process: process.position)
+
+
+def get_processes_bulk(archive, entry_ids, required=None):
+    """
+    Like get_processes, but for many entries with one search.
+    Returns a dict with the sorted list of ProcessRecord per entry id.
+    """
+    from nomad.app.v1.models import MetadataRequired
+
+    required = _process_fields(required)
+    processes = {entry_id: [] for entry_id in entry_ids}
+    if not processes:
+        return processes
+
+    # search for all archives referencing any of the entries
+    query = {'entry_references.target_entry_id:any': list(processes)}
+    entries = {}
+    targets = {}
+    for res in search_all(
+        archive,
+        query,
+        MetadataRequired(include=['entry_id', 'upload_id', 'entry_references']),
+    ):
+        entries.setdefault(res['upload_id'], []).append(res['entry_id'])
+        references = {
+            ref.get('target_entry_id') for ref in res.get('entry_references', [])
+        }
+        targets[res['entry_id']] = [ref for ref in references if ref in processes]
+
+    for process in read_process_records(entries, required):
+        for target in targets[process.entry_id]:
+            processes[target].append(process)
+
+    return {
+        entry_id: sorted(entry_processes, key=lambda process: process.position)
+        for entry_id, entry_processes in processes.items()
+    }
+
+
+def write_batch_ids(outfile, samples, processes):
+    """
+    Writes the lab id and the process names of every (lab_id, entry_id) sample
+    as one row, in the layout of a pandas DataFrame.to_csv of the rows.
+    ``processes`` is the result of get_processes_bulk.
+    """
+    import csv
+
+    n_columns = 1 + max((len(p) for p in processes.values()), default=0)
+    writer = csv.writer(outfile, lineterminator='\n')
+    writer.writerow([''] + list(range(n_columns)))
+    for index, (sample_id, sample_entry_id) in enumerate(samples):
+        row = [sample_id] + [p[1] for p in processes[sample_entry_id]]
+        writer.writerow([index] + row + [''] * (n_columns - len(row)))
@@ -0,0 +1,154 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Merging of repeated XAS scans of the same edge.
+
+The scans are aligned by cross-correlating the derivatives of their reference
+foil absorbance, interpolated onto the energy range that all scans cover,
+scans that deviate from the median scan are rejected and the others averaged.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+MergedXAS = namedtuple(
+    'MergedXAS', ['energy', 'absorbance', 'uncertainty', 'shifts', 'rejected']
+)
+MergedXAS.__doc__ = """
+The common energy grid, the mean absorbance and its standard error, the energy
+shift added to every scan and the indices of the rejected scans.
+"""
+
+
+def common_energy_grid(energies, step=None):
+    """
+    The energy grid over the range covered by all scans, by default with the
+    median step of the scans.
+    """
+    start = max(np.min(energy) for energy in energies)
+    stop = min(np.max(energy) for energy in energies)
+    if stop <= start:
+        raise ValueError('The scans do not have a common energy range')
+    if step is None:
+        step = np.median(np.concatenate([np.abs(np.diff(e)) for e in energies]))
+    return np.arange(start, stop + step / 2, step)[: int((stop - start) / step) + 1]
+
+
+def interpolate_scans(energies, values, grid):
+    """
+    Interpolates every scan onto grid with a single np.interp call. The scans
+    are moved apart along the energy axis so that they form one increasing
+    sequence.
+    """
+    lengths = [len(energy) for energy in energies]
+    index = np.repeat(np.arange(len(energies)), lengths)
+    energy = np.concatenate(energies).astype(np.float64)
+    value = np.concatenate(values).astype(np.float64)
+    span = max(energy.max(), grid.max()) - min(energy.min(), grid.min()) + 1
+    order = np.lexsort((energy, index))
+    offsets = np.arange(len(energies))[:, None] * span
+    return np.interp(
+        (grid[None, :] + offsets).ravel(), (energy + index * span)[order], value[order]
+    ).reshape(len(energies), len(grid))
+
+
+def reference_shifts(energies, references, max_shift=None, smoothing=5):
+    """
+    The energy shift of every scan that aligns its reference absorbance with the
+    one of the first scan, from the maximum of the cross-correlation of their
+    derivatives, smoothed over the given number of grid steps. Returns 0 for
+    scans where the maximum is at the end of the lags within max_shift.
+    """
+    grid = common_energy_grid(energies)
+    step = grid[1] - grid[0] if len(grid) > 1 else 1.0
+    derivatives = np.gradient(interpolate_scans(energies, references, grid), axis=1)
+    derivatives -= derivatives.mean(axis=1, keepdims=True)
+
+    size = 2 * len(grid)
+    spectra = np.fft.rfft(derivatives, size, axis=1)
+    # gaussian smoothing of the noisy derivatives
+    frequencies = np.fft.rfftfreq(size)
+    spectra *= np.exp(-((2 * np.pi * frequencies * smoothing) ** 2) / 2)
+    correlation = np.fft.irfft(spectra * np.conj(spectra[0]), size, axis=1)
+    # lags -len(grid) + 1 ... len(grid) - 1
+    correlation = np.roll(correlation, len(grid) - 1, axis=1)[:, : size - 1]
+    lags = np.arange(-len(grid) + 1, len(grid))
+    if max_shift is not None:
+        window = np.abs(lags) <= max_shift / step
+        correlation, lags = correlation[:, window], lags[window]
+
+    peak = correlation.argmax(axis=1)
+    rows = np.arange(len(peak))
+    inner = (peak > 0) & (peak < len(lags) - 1)
+    left = correlation[rows, np.where(inner, peak - 1, peak)]
+    center = correlation[rows, peak]
+    right = correlation[rows, np.where(inner, peak + 1, peak)]
+    curvature = left - 2 * center + right
+    offset = np.divide(
+        left - right,
+        2 * curvature,
+        out=np.zeros_like(center),
+        where=inner & (curvature < 0),
+    )
+    return np.where(inner, -(lags[peak] + offset) * step, 0.0)
+
+
+def reject_outliers(spectra, threshold=3.5):
+    """
+    Indices of the scans whose RMS deviation from the median scan has a robust
+    z-score (from the median absolute deviation) above threshold.
+    """
+    if len(spectra) < 3:
+        return np.zeros(0, dtype=int)
+    median = np.nanmedian(spectra, axis=0)
+    deviation = np.sqrt(np.nanmean((spectra - median) ** 2, axis=1))
+    center = np.median(deviation)
+    mad = 1.4826 * np.median(np.abs(deviation - center))
+    if mad == 0:
+        return np.zeros(0, dtype=int)
+    return np.flatnonzero((deviation - center) / mad > threshold)
+
+
+def merge_xas_scans(
+    energies, absorbances, references=None, outlier_threshold=3.5, step=None
+):
+    """
+    Merges the absorbance of repeated scans. Aligns the scans with the
+    reference absorbances, if given, before they are interpolated onto their
+    common energy grid.
+    """
+    energies = [np.asarray(energy, dtype=np.float64) for energy in energies]
+    if references is not None:
+        shifts = reference_shifts(energies, references)
+    else:
+        shifts = np.zeros(len(energies))
+    energies = [energy + shift for energy, shift in zip(energies, shifts)]
+
+    grid = common_energy_grid(energies, step)
+    spectra = interpolate_scans(energies, absorbances, grid)
+    rejected = reject_outliers(spectra, outlier_threshold)
+    kept = np.delete(spectra, rejected, axis=0)
+
+    absorbance = kept.mean(axis=0)
+    if len(kept) > 1:
+        uncertainty = kept.std(axis=0, ddof=1) / np.sqrt(len(kept))
+    else:
+        uncertainty = np.full(len(grid), np.nan)
+    return MergedXAS(grid, absorbance, uncertainty, shifts, rejected)
@@ -24,6 +24,7 @@ from nomad.metainfo import Quantity, Reference, Section, SectionProxy, SubSectio
 
 from .. import BasicSample
 from ..design import ActiveFactor, Design, PassiveFactor
+from ..helper.chemical_formula import set_material_formulas
 
 
 class DesignSampleID(SampleID):
@@ -173,26 +174,6 @@ class DesignSample(BasicSample):
                 archive.results = Results()
             if not archive.results.material:
                 archive.results.material = Material()
-            material = archive.results.material
-            from ase import Atoms
-            from pymatgen.core import Composition
-
-            formulas = [
-                Atoms(Composition(formula.strip()).get_integer_formula_and_factor()[0])
-                for formula in self.chemical_composition_or_formulas.split(',')
-            ]
-            elements = []
-            for f in formulas:
-                elements.extend(f.get_chemical_symbols())
-            material.elements = list(set(elements))
-            if len(formulas) == 1:
-                formula = formulas[0]
-                material.chemical_formula_hill = formula.get_chemical_formula(
-                    mode='hill'
-                )
-                material.chemical_formula_reduced = formula.get_chemical_formula(
-                    mode='reduce'
-                )
-                material.chemical_formula_descriptive = (
-                    self.chemical_composition_or_formulas
-                )
+            set_material_formulas(
+                archive.results.material, self.chemical_composition_or_formulas
+            )
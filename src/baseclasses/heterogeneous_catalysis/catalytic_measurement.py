@@ -23,6 +23,11 @@ from nomad.datamodel.data import ArchiveSection
 from nomad.metainfo import Quantity, Section, SubSection
 
 from .. import MeasurementOnSample
+from ..helper.catalytic_reaction_table import (
+    PRODUCT_QUANTITIES,
+    product_yields,
+    read_reaction_table,
+)
 
 
 class Reactant(ArchiveSection):
@@ -62,6 +67,11 @@ class Product(ArchiveSection):
     selectivity = Quantity(type=np.dtype(np.float64), shape=['*'])
     relative_rate = Quantity(type=np.dtype(np.float64), shape=['*'])
     absolute_rate = Quantity(type=np.dtype(np.float64), shape=['*'])
+    product_yield = Quantity(
+        type=np.dtype(np.float64),
+        shape=['*'],
+        description='exchange * selectivity / 100',
+    )
 
 
 class CatalyticReactionData(ArchiveSection):
@@ -135,69 +145,30 @@ class CatalyticReaction(MeasurementOnSample):
             import pandas as pd
 
             data = pd.read_csv(f.name).dropna(axis=1, how='all')
-        feed = Feed()
-        cat_data = CatalyticReactionData()
-        reactants = []
-        products = []
-        number_of_runs = 0
-        for col in data.columns:
-            if len(data[col]) < 1:
-                continue
-            col_split = col.split(' ')
-            if len(col_split) < 2:
-                continue
-
-            number_of_runs = max(len(data[col]), number_of_runs)
-
-            if col_split[0] == 'x':
-                reactant = Reactant(name=col_split[1], amount=data[col])
-                reactants.append(reactant)
-            if col_split[0] == 'temperature':
-                cat_data.temperature = data[col]
-
-            if col_split[0] == 'C-balance':
-                cat_data.c_balance = data[col]
-
-            if col_split[0] == 'GHSV':
-                feed.flow_volume = data[col]
-
-            if len(col_split) < 3 or col_split[2] != '(%)':
-                continue
-
-            product = Product(name=col_split[1])
-            for i, p in enumerate(products):
-                if p.name == col_split[1]:
-                    product = products.pop(i)
-                    break
-
-            products.append(product)
-
-            if col_split[0] == 'x_p':
-                product.exchange = data[col]
-
-            if col_split[0] == 'S_p':
-                product.selectivity = data[col]
-
-            if col_split[0] == 'x_r':
-                product.relative_rate = data[col]
-
-            if col_split[0] == 'r':
-                product.absolute_rate = data[col]
-
-        for p in products:
-            if p.exchange is None or len(p.exchange) == 0:
-                p.exchange = number_of_runs * [0]
-            if p.selectivity is None or len(p.selectivity) == 0:
-                p.selectivity = number_of_runs * [0]
-            if p.relative_rate is None or len(p.relative_rate) == 0:
-                p.relative_rate = number_of_runs * [0]
-            if p.absolute_rate is None or len(p.absolute_rate) == 0:
-                p.absolute_rate = number_of_runs * [0]
-
-        feed.reactants = reactants
-        feed.runs = np.linspace(0, number_of_runs - 1, number_of_runs)
-        cat_data.products = products
-        cat_data.runs = np.linspace(0, number_of_runs - 1, number_of_runs)
+        table = read_reaction_table(data)
+        yields = product_yields(table)
+        quantities = list(PRODUCT_QUANTITIES.values())
+
+        feed = Feed(flow_volume=table.columns.get('flow_volume'))
+        feed.reactants = [
+            Reactant(name=name, amount=amount)
+            for name, amount in zip(table.reactants, table.amounts)
+        ]
+        feed.runs = np.linspace(0, table.number_of_runs - 1, table.number_of_runs)
+
+        cat_data = CatalyticReactionData(
+            temperature=table.columns.get('temperature'),
+            c_balance=table.columns.get('c_balance'),
+        )
+        cat_data.products = [
+            Product(
+                name=name,
+                product_yield=yields[position],
+                **dict(zip(quantities, table.values[:, position])),
+            )
+            for position, name in enumerate(table.products)
+        ]
+        cat_data.runs = np.linspace(0, table.number_of_runs - 1, table.number_of_runs)
 
         self.feed = feed
         self.data = cat_data
@@ -25,6 +25,7 @@ from baseclasses import PubChemPureSubstanceSectionCustom
 
 from .. import LayerDeposition
 from ..chemical import Chemical
+from ..helper.chemical_formula import parse_formula
 
 
 class SputteringProcess(ArchiveSection):
@@ -382,8 +383,17 @@ class MultiTargetSputtering(LayerDeposition):
                     continue
                 active = step.bias_voltage > 0
                 active_targets = [t for i, t in enumerate(self.targets) if active[i]]
-                new_elements = [v.material.molecular_formula for v in active_targets]
-                elements.extend(new_elements)
+                for target in active_targets:
+                    try:
+                        elements.extend(
+                            parse_formula(target.material.molecular_formula).elements
+                        )
+                    except Exception as e:
+                        logger.warn(
+                            'could not analyse target material '
+                            f'{target.material.molecular_formula}',
+                            exc_info=e,
+                        )
 
             if not archive.results.material:
                 archive.results.material = Material()
@@ -0,0 +1,200 @@
+import contextlib
+import io
+import sys
+import types
+
+import pandas as pd
+from nomad import files
+
+from baseclasses.helper import utilities
+
+ARCHIVES = {
+    'upload_1': {
+        'process_a': {'name': 'Cleaning', 'positon_in_experimental_plan': 1},
+        'process_b': {'name': 'Spin Coating', 'positon_in_experimental_plan': 2},
+        'measurement': {'name': 'JV'},
+    },
+    'upload_2': {
+        'process_c': {'name': 'Evaporation', 'positon_in_experimental_plan': 3},
+    },
+}
+
+REFERENCES = {
+    'process_a': ['sample_1', 'sample_2'],
+    'process_b': ['sample_1', 'sample_1'],
+    'measurement': ['sample_1'],
+    'process_c': ['sample_2', 'batch'],
+}
+
+
+class UploadFiles:
+    opened = []
+
+    def __init__(self, upload_id):
+        self.upload_id = upload_id
+        UploadFiles.opened.append(upload_id)
+
+    @contextlib.contextmanager
+    def read_archive(self, entry_id):
+        yield {entry_id: {'data': ARCHIVES[self.upload_id][entry_id]}}
+
+    def close(self):
+        pass
+
+
+def search_all(archive, query, required=None):
+    targets = set(query['entry_references.target_entry_id:any'])
+    for upload_id, entries in ARCHIVES.items():
+        for entry_id in entries:
+            if targets & set(REFERENCES[entry_id]):
+                yield {
+                    'entry_id': entry_id,
+                    'upload_id': upload_id,
+                    'entry_references': [
+                        {'target_entry_id': target} for target in REFERENCES[entry_id]
+                    ],
+                }
+
+
+def test_batch_ids_csv_matches_dataframe_layout(monkeypatch):
+    monkeypatch.setattr(utilities, 'search_all', search_all)
+    monkeypatch.setattr(files.UploadFiles, 'get', UploadFiles)
+    UploadFiles.opened = []
+    archive = types.SimpleNamespace()
+
+    # sample_1 is in the batch twice, sample_3 has no processes
+    samples = [
+        ('S1', 'sample_1'),
+        ('S2', 'sample_2'),
+        ('S1', 'sample_1'),
+        ('S3', 'sample_3'),
+    ]
+    processes = utilities.get_processes_bulk(
+        archive, [entry_id for _, entry_id in samples]
+    )
+    assert [p.name for p in processes['sample_1']] == ['Cleaning', 'Spin Coating']
+    assert [p.name for p in processes['sample_2']] == ['Cleaning', 'Evaporation']
+    assert processes['sample_3'] == []
+    assert sorted(UploadFiles.opened) == ['upload_1', 'upload_2']
+
+    outfile = io.StringIO()
+    utilities.write_batch_ids(outfile, samples, processes)
+
+    expected = io.StringIO()
+    pd.DataFrame(
+        [
+            ['S1', 'Cleaning', 'Spin Coating'],
+            ['S2', 'Cleaning', 'Evaporation'],
+            ['S1', 'Cleaning', 'Spin Coating'],
+            ['S3'],
+        ]
+    ).to_csv(expected)
+    assert outfile.getvalue() == expected.getvalue()
+
+    outfile = io.StringIO()
+    utilities.write_batch_ids(outfile, [('S3', 'sample_3')], {'sample_3': []})
+    expected = io.StringIO()
+    pd.DataFrame([['S3']]).to_csv(expected)
+    assert outfile.getvalue() == expected.getvalue()
+
+
+class Datetime:
+    def to_json(self):
+        return '2024-01-02T03:04:05'
+
+
+def test_read_process_records_projects_required_fields(monkeypatch):
+    monkeypatch.setattr(files.UploadFiles, 'get', UploadFiles)
+    monkeypatch.setitem(ARCHIVES['upload_1']['process_a'], 'datetime', Datetime())
+    monkeypatch.setitem(ARCHIVES['upload_1']['process_a'], 'samples', ['large'])
+
+    records = list(
+        utilities.read_process_records(
+            {'upload_1': ['process_a', 'measurement'], 'upload_2': ['process_c']},
+            ['datetime', 'positon_in_experimental_plan', 'name'],
+        )
+    )
+    assert records == [
+        utilities.ProcessRecord(
+            1,
+            'Cleaning',
+            'process_a',
+            'upload_1',
+            {
+                'datetime': '2024-01-02T03:04:05',
+                'positon_in_experimental_plan': 1,
+                'name': 'Cleaning',
+            },
+        ),
+        utilities.ProcessRecord(
+            3,
+            'Evaporation',
+            'process_c',
+            'upload_2',
+            {
+                'datetime': None,
+                'positon_in_experimental_plan': 3,
+                'name': 'Evaporation',
+            },
+        ),
+    ]
+
+
+def test_get_processes_required_fields(monkeypatch):
+    searches = []
+
+    def search_referencing(archive, query, required=None):
+        searches.append((query, required.include))
+        yield {'entry_id': 'process_b', 'upload_id': 'upload_1'}
+        yield {'entry_id': 'process_a', 'upload_id': 'upload_1'}
+
+    monkeypatch.setattr(utilities, 'search_all', search_referencing)
+    monkeypatch.setattr(files.UploadFiles, 'get', UploadFiles)
+
+    processes = utilities.get_processes(
+        types.SimpleNamespace(), 'sample_1', required=['m_def']
+    )
+    assert searches == [
+        (
+            {'entry_references.target_entry_id': 'sample_1'},
+            ['entry_id', 'upload_id'],
+        )
+    ]
+    assert [(p.position, p.name) for p in processes] == [
+        (1, 'Cleaning'),
+        (2, 'Spin Coating'),
+    ]
+    assert list(processes[0].fields) == [
+        'm_def',
+        'positon_in_experimental_plan',
+        'name',
+    ]
+
+
+def test_search_all_uses_search_iterator(monkeypatch):
+    calls = []
+
+    def search_iterator(**kwargs):
+        calls.append(kwargs)
+        yield from [{'entry_id': 'a'}, {'entry_id': 'b'}]
+
+    monkeypatch.setitem(
+        sys.modules,
+        'nomad.search',
+        types.SimpleNamespace(search_iterator=search_iterator),
+    )
+    archive = types.SimpleNamespace(
+        metadata=types.SimpleNamespace(
+            main_author=types.SimpleNamespace(user_id='user')
+        )
+    )
+    hits = list(utilities.search_all(archive, {'upload_id': 'upload_1'}, 'fields'))
+    assert hits == [{'entry_id': 'a'}, {'entry_id': 'b'}]
+    assert calls == [
+        {
+            'owner': 'all',
+            'query': {'upload_id': 'upload_1'},
+            'required': 'fields',
+            'user_id': 'user',
+        }
+    ]
@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from baseclasses.helper.catalytic_reaction_table import (
+    compile_reaction_header,
+    product_yields,
+    read_reaction_table,
+)
+
+
+def test_read_reaction_table():
+    data = pd.DataFrame(
+        {
+            'step': [1, 2, 3],
+            'x CH4': [10.0, 11.0, 12.0],
+            'temperature (°C)': [300.0, 350.0, 400.0],
+            'x_p CO (%)': [1.0, 2.0, 3.0],
+            'x_p CO2 (%)': [4.0, 5.0, 6.0],
+            'S_p CO (%)': [50.0, 40.0, 30.0],
+            'C-balance (%)': [99.0, 98.0, 97.0],
+            'r H2O (%)': [7.0, 8.0, 9.0],
+        }
+    )
+    table = read_reaction_table(data)
+
+    assert table.number_of_runs == 3
+    assert table.reactants == ['CH4']
+    assert np.array_equal(table.amounts, [[10.0, 11.0, 12.0]])
+    assert np.array_equal(table.columns['temperature'], [300.0, 350.0, 400.0])
+    assert np.array_equal(table.columns['c_balance'], [99.0, 98.0, 97.0])
+    assert 'flow_volume' not in table.columns
+    # products are ordered by their last column, as before
+    assert table.products == ['CO2', 'CO', 'H2O']
+    exchange, selectivity, relative_rate, absolute_rate = table.values
+    assert np.array_equal(exchange, [[4, 5, 6], [1, 2, 3], [0, 0, 0]])
+    assert np.array_equal(selectivity, [[0, 0, 0], [50, 40, 30], [0, 0, 0]])
+    assert not relative_rate.any()
+    assert np.array_equal(absolute_rate[2], [7, 8, 9])
+    assert np.allclose(product_yields(table)[1], [0.5, 0.8, 0.9])
+
+
+def test_wide_reaction_table():
+    runs, species = 200, 500
+    rng = np.random.default_rng(0)
+    columns = {'x CH4': rng.random(runs)}
+    for prefix in ['x_p', 'S_p', 'x_r', 'r']:
+        for product in range(species):
+            columns[f'{prefix} P{product} (%)'] = rng.random(runs)
+    data = pd.DataFrame(columns)
+
+    compile_reaction_header.cache_clear()
+    start = time.perf_counter()
+    table = read_reaction_table(data)
+    assert time.perf_counter() - start < 2
+    assert table.values.shape == (4, species, runs)
+    assert np.array_equal(table.values[1, 7], data['S_p P7 (%)'])
+    assert compile_reaction_header.cache_info().misses == 1
+    read_reaction_table(data)
+    assert compile_reaction_header.cache_info().hits == 1
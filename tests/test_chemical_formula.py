@@ -0,0 +1,99 @@
+import types
+
+import pytest
+from ase import Atoms
+from ase.formula import Formula
+from pymatgen.core import Composition
+
+from baseclasses.helper.chemical_formula import (
+    formula_elements,
+    parse_formula,
+    parse_formulas,
+    set_material_formulas,
+)
+
+FORMULAS = [
+    'H2O',
+    ' TiO2 ',
+    'OH',
+    'C6H12O6',
+    'CuSO4.5H2O',
+    'Ca(OH)2',
+    'Fe2(SO4)3',
+    'La0.6Sr0.4CoO3',
+    'Cs0.05Pb1I2.5Br0.5',
+]
+
+INVALID = ['', 'Cu(', 'CuSO4·5H2O', 'MAPbI3', 'Xx2']
+
+
+def legacy_atoms(formula):
+    """The parsing of the schemas before parse_formula."""
+    return Atoms(Composition(formula.strip()).get_integer_formula_and_factor()[0])
+
+
+@pytest.mark.parametrize('formula', FORMULAS)
+def test_parse_formula_matches_ase_and_pymatgen(formula):
+    atoms = legacy_atoms(formula)
+    parsed = parse_formula(formula)
+
+    assert parsed.formula == formula.strip()
+    assert parsed.hill == atoms.get_chemical_formula(mode='hill')
+    assert parsed.reduced == atoms.get_chemical_formula(mode='reduce')
+    # elements in order of their first appearance, like get_chemical_symbols
+    assert list(parsed.elements) == list(dict.fromkeys(atoms.get_chemical_symbols()))
+    symbols = atoms.get_chemical_symbols()
+    assert dict(parsed.stoichiometry) == {e: symbols.count(e) for e in symbols}
+
+
+@pytest.mark.parametrize('formula', INVALID)
+def test_parse_formula_invalid(formula):
+    with pytest.raises(Exception):
+        legacy_atoms(formula)
+    with pytest.raises(Exception):
+        parse_formula(formula)
+
+
+def test_fractional_and_hydrate_counts():
+    assert parse_formula('La0.6Sr0.4CoO3').stoichiometry == (
+        ('Sr', 2),
+        ('La', 3),
+        ('Co', 5),
+        ('O', 15),
+    )
+    assert dict(parse_formula('CuSO4.5H2O').stoichiometry) == {
+        'Cu': 2,
+        'H': 4,
+        'S': 2,
+        'O': 11,
+    }
+
+
+def test_set_material_formulas_matches_legacy():
+    material = types.SimpleNamespace()
+    set_material_formulas(material, 'TiO2')
+    atoms = legacy_atoms('TiO2')
+    assert sorted(material.elements) == ['O', 'Ti']
+    assert material.chemical_formula_hill == atoms.get_chemical_formula(mode='hill')
+    assert material.chemical_formula_reduced == atoms.get_chemical_formula(
+        mode='reduce'
+    )
+    assert material.chemical_formula_descriptive == 'TiO2'
+
+    material = types.SimpleNamespace()
+    set_material_formulas(material, 'TiO2,Ca(OH)2,')
+    assert sorted(material.elements) == ['Ca', 'H', 'O', 'Ti']
+    assert not hasattr(material, 'chemical_formula_hill')
+    assert [p.hill for p in parse_formulas('TiO2,Ca(OH)2,')] == ['O2Ti', 'H2CaO2']
+
+    with pytest.raises(Exception):
+        set_material_formulas(types.SimpleNamespace(), 'TiO2,Xx2')
+
+
+@pytest.mark.parametrize('formula', ['H2O', 'Ca(OH)2', 'MAPbI3', 'Xx'])
+def test_formula_elements_matches_ase(formula):
+    assert formula_elements(formula) == list(Formula(formula).count())
+
+
+def test_parse_formula_is_cached():
+    assert parse_formula('Fe2(SO4)3') is parse_formula('Fe2(SO4)3')
@@ -0,0 +1,105 @@
+import sys
+import types
+
+from nomad.datamodel.metainfo.basesections import CompositeSystemReference
+
+from baseclasses.helper import utilities
+
+
+class Archive:
+    metadata = types.SimpleNamespace(upload_id='upload_resolve')
+
+
+def test_resolve_entity_references_searches_each_lab_id_once(monkeypatch):
+    searched = []
+
+    def search_all(archive, query, required=None):
+        lab_ids = query['results.eln.lab_ids:any']
+        searched.extend(lab_ids)
+        for lab_id in lab_ids:
+            yield {
+                'entry_id': f'entry_{lab_id}',
+                'upload_id': 'upload',
+                'results': {'eln': {'lab_ids': [lab_id, 'sample']}},
+            }
+
+    monkeypatch.setattr(utilities, 'search_all', search_all)
+    archive = Archive()
+    logger = types.SimpleNamespace(warn=lambda *args, **kwargs: None)
+
+    for _ in range(100):
+        samples = [
+            CompositeSystemReference(lab_id=f'sample_{k:04d}') for k in range(50)
+        ]
+        utilities.resolve_entity_references(archive, samples, logger)
+        assert [sample.name for sample in samples] == [
+            f'sample_{k:04d}' for k in range(50)
+        ]
+        assert samples[7].m_get(CompositeSystemReference.reference).m_proxy_value == (
+            '../uploads/upload/archive/entry_sample_0007#data'
+        )
+
+    assert sorted(searched) == [f'sample_{k:04d}' for k in range(50)]
+
+
+def test_resolve_entity_references_memo_per_run(monkeypatch):
+    searched = []
+
+    def search_all(archive, query, required=None):
+        searched.append(query['results.eln.lab_ids:any'])
+        yield {
+            'entry_id': f'entry_{len(searched)}',
+            'upload_id': 'upload',
+            'results': {'eln': {'lab_ids': ['sample']}},
+        }
+
+    monkeypatch.setattr(utilities, 'search_all', search_all)
+    logger = types.SimpleNamespace(warn=lambda *args, **kwargs: None)
+
+    def resolve(archive):
+        sample = CompositeSystemReference(lab_id='sample')
+        utilities.resolve_entity_references(archive, [sample], logger)
+        return sample.m_get(CompositeSystemReference.reference).m_proxy_value
+
+    archive = Archive()
+    assert resolve(archive) == '../uploads/upload/archive/entry_1#data'
+    assert resolve(archive) == '../uploads/upload/archive/entry_1#data'
+    assert len(searched) == 1
+
+    # a new entry was created, the lab id might belong to it now
+    utilities.search_cache.lab_ids['../uploads/upload/archive/other#data'] = 'old'
+    utilities.search_cache.invalidate()
+    assert utilities.search_cache.stats()['lab_ids'] == 0
+    assert resolve(archive) == '../uploads/upload/archive/entry_2#data'
+
+    # the next processing run does not reuse the resolved references
+    assert resolve(Archive()) == '../uploads/upload/archive/entry_3#data'
+    assert len(searched) == 3
+
+
+def test_resolve_entity_references_remembers_missing_lab_ids(monkeypatch):
+    searched = []
+
+    def search_all(archive, query, required=None):
+        searched.append(query['results.eln.lab_ids:any'])
+        yield from []
+
+    def search(**kwargs):
+        raise AssertionError('missing lab ids are not searched one by one')
+
+    monkeypatch.setattr(utilities, 'search_all', search_all)
+    monkeypatch.setitem(
+        sys.modules, 'nomad.search', types.SimpleNamespace(search=search)
+    )
+    warnings = []
+    logger = types.SimpleNamespace(warn=warnings.append)
+
+    archive = Archive()
+    for _ in range(3):
+        sample = CompositeSystemReference(lab_id='missing')
+        utilities.resolve_entity_references(archive, [sample], logger)
+        assert sample.reference is None
+        assert sample.name == 'missing'
+
+    assert searched == [['missing']]
+    assert warnings == ['Found no entries with lab_id: "missing".'] * 3
@@ -0,0 +1,183 @@
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from baseclasses.helper.file_parser.fhi_parsers import (
+    read_ray_file,
+    read_text_table,
+    read_txt_sem_ov,
+    read_uxd,
+    read_xlsx_catalytic_reaction,
+    read_xy,
+    readTXTSEM_ov,
+    readUXD,
+)
+
+UXD = """; File converted from RAW
+_FILEVERSION = 1
+_SAMPLE = 'sample 1'
+
+; Data for range 1
+_STEPSIZE = 0.02
+;  2THETA\tCnt2D1
+  10.000\t  123
+  10.020\t  125.5
+
+; Data for range 2
+_STEPSIZE = 0.05
+;  2THETA\tCnt2D1
+  20.000\t  1
+_COMMENT = split block
+  20.050\t  2
+  20.100\t  3
+"""
+
+
+def test_read_uxd(tmp_path):
+    path = tmp_path / 'scan.uxd'
+    path.write_text(UXD)
+
+    data, metadata = read_uxd(path)
+    assert np.array_equal(data[' Data for range 1']['2THETA'], [10.0, 10.02])
+    assert np.array_equal(data[' Data for range 2']['Cnt2D1'], [1.0, 2.0, 3.0])
+    assert metadata == {
+        ' File converted from RAW': {'FILEVERSION': 1.0, 'SAMPLE': "'sample 1'"},
+        ' Data for range 1': {'STEPSIZE': 0.02},
+        ' Data for range 2': {'STEPSIZE': 0.05, 'COMMENT': 'split block'},
+    }
+
+    assert readUXD(path)[' Data for range 1']['Cnt2D1'] == [123.0, 125.5]
+    assert readUXD(path, False) == metadata
+
+
+def test_read_xlsx_catalytic_reaction(tmp_path):
+    wb = Workbook()
+    sheet = wb.active
+    sheet.append(['time', 'name', 'T', 'conversion', 'T'])
+    sheet.append(['s', '', 'C', '%', 'C'])
+    for k in range(1000):
+        sheet.append([k, 'run', 20.0 + k, k if k < 10 else None, '3.5'])
+    wb.save(tmp_path / 'reaction.xlsx')
+
+    data = read_xlsx_catalytic_reaction(tmp_path / 'reaction.xlsx')
+    assert list(data) == ['time', 'T', 'conversion', 'T 2']
+    assert np.array_equal(data['time'], np.arange(1000))
+    assert np.array_equal(data['T'], 20.0 + np.arange(1000))
+    assert np.array_equal(data['conversion'], np.arange(10))
+    assert np.all(data['T 2'] == 3.5)
+
+
+RAY = """<?xml version="1.0"?>
+<Session>
+<TreeNode name="Reference"><FitCurve><RawCurve CriticalAngle="9"/></FitCurve></TreeNode>
+<TreeNode name="Fit Curve"><FitCurve>
+  <RawCurve CriticalAngle="0.51"><Data><x0>1 2 3</x0><y0>4 5 6</y0></Data></RawCurve>
+  <FitSolutions><Conditions chi2Mode="2" method="0"/>
+  <Solution chi2="1.5"><SimCurve>
+    <Data><x0>0.1 0.2</x0><y>10 20</y></Data>
+    <Sample><LayersGroups><LayersGroup><Layers>
+      <Layer index="1"><Geometry roughness="9"/><Density top="9"/></Layer>
+      <Layer index="0"><Geometry roughness="0.4"/><Density top="5.1"/>
+        <Parameters><Parameter id="17" stdDeviation="0.02"/>
+        <Parameter id="18" stdDeviation="0.03"/></Parameters></Layer>
+    </Layers></LayersGroup></LayersGroups></Sample>
+    <SimParam poisson="0.1" background_poisson="0.2"/>
+  </SimCurve></Solution>
+  <Solution chi2="2.5"/>
+  </FitSolutions></FitCurve></TreeNode>
+</Session>
+"""
+
+
+def test_read_ray_file(tmp_path):
+    path = tmp_path / 'fit.ray'
+    path.write_text(RAY)
+
+    data, data_nice = read_ray_file(path)
+    assert data['Critcal Angle'] == 0.51
+    assert data['chi2'] == 1.5
+    assert data['chi2mode'] == 'Logarithm N'
+    assert data['method'] == 'Levenberg-Marquardt'
+    assert data['Apparent Roughness'] == 0.4
+    assert data['Apparent Density Std'] == 0.03
+    assert data['Detector Noise'] == 0.2
+    assert np.array_equal(data['x0 raw'], [1, 2, 3])
+    assert np.array_equal(data['y sim'], [10, 20])
+    assert data_nice['Apparent Density'] == {
+        'symbol': 'rho',
+        'value': 5.1,
+        'std. error': 0.03,
+        'unit': 'g/cm^3',
+    }
+    assert 'x0 sim' not in read_ray_file(path, False)[0]
+
+
+SEM_HEADER = 'Bruker Nano GmbH Berlin\nDate: 01.02.2020\nReal time: 30000\n\n'
+SEM_METADATA = {
+    'name': 'Bruker Nano GmbH Berlin',
+    'Date': '01.02.2020',
+    'Real time': '30000',
+}
+
+
+def test_read_txt_sem_ov(tmp_path):
+    path = tmp_path / 'spectrum.txt'
+    path.write_text(SEM_HEADER + 'Energy\tCounts\n0.01\t3\n0.02\t5\n')
+
+    res = read_txt_sem_ov(path)
+    assert np.array_equal(res.pop('energy'), [0.01, 0.02])
+    assert np.array_equal(res.pop('count'), [3, 5])
+    assert res == SEM_METADATA
+    assert readTXTSEM_ov(path)['count'] == [3.0, 5.0]
+    assert readTXTSEM_ov(path, False) == {'name': 'Bruker Nano GmbH Berlin'}
+
+
+def test_read_txt_sem_ov_without_table(tmp_path):
+    for name, text in [
+        ('comma.txt', SEM_HEADER + '0,01\t3\n0,02\t5\n'),
+        ('long.txt', SEM_HEADER + 'comment\n' * 300 + '0.01\t3\n'),
+        ('header.txt', SEM_HEADER),
+    ]:
+        path = tmp_path / name
+        path.write_text(text)
+        assert readTXTSEM_ov(path, False) == {'name': 'Bruker Nano GmbH Berlin'}
+        assert readTXTSEM_ov(path) == dict(SEM_METADATA, energy=[], count=[])
+
+
+def test_read_text_table_formats(tmp_path):
+    rows = [(0.5 * k, k, -k) for k in range(100)]
+    for name, header, delimiter in [
+        ('scan.xy', "'Id: scan' 2Theta\n", ' '),
+        ('spectrum.txt', 'Bruker Nano GmbH\nDate: 01.02.2020\n\nenergy\tcount\n', '\t'),
+        ('export.csv', 'a,b,c\n', ','),
+    ]:
+        path = tmp_path / name
+        path.write_text(
+            header + ''.join(f'{delimiter.join(map(str, row))}\n' for row in rows)
+        )
+        assert np.array_equal(read_text_table(path), rows)
+        assert np.array_equal(read_text_table(path, True, block_size=64), rows)
+
+
+def test_read_xy_benchmark(tmp_path):
+    path = tmp_path / 'scan.xy'
+    angles = np.linspace(5, 90, 1_000_000)
+    counts = np.random.default_rng(0).integers(0, 100_000, 1_000_000)
+    with open(path, 'w') as f:
+        f.write("'Id: scan' 2Theta Intensity\n")
+        np.savetxt(f, np.column_stack((angles, counts)), fmt='%.6f %d')
+
+    start = time.perf_counter()
+    data = pd.read_csv(path, skiprows=1, header=None, delimiter=' ')
+    expected = {'2Theta': list(data[0]), 'Intensity': list(data[1])}
+    pandas_duration = time.perf_counter() - start
+
+    for memory_map in (False, True):
+        start = time.perf_counter()
+        result = read_xy(path, memory_map)
+        duration = time.perf_counter() - start
+        assert np.array_equal(result['2Theta'], expected['2Theta'])
+        assert np.array_equal(result['Intensity'], expected['Intensity'])
+        assert duration < max(10 * pandas_duration, 5)
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from baseclasses.helper import folder_sync
+
+
+def write(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def test_sync_folder_copies_only_changes(tmp_path):
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    src.mkdir()
+    dst.mkdir()
+    manifest = str(dst / '.manifest.json')
+    for k in range(5):
+        write(src / f'image_{k}.tif', f'image {k}')
+    # copied before the manifest existed
+    write(dst / 'image_0.tif', 'image 0')
+
+    names, changed, removed = folder_sync.sync_folder(src, dst, manifest)
+    assert sorted(names) == [f'image_{k}.tif' for k in range(5)]
+    assert sorted(changed) == [f'image_{k}.tif' for k in range(1, 5)]
+    assert removed == []
+
+    assert folder_sync.sync_folder(src, dst, manifest)[1:] == ([], [])
+
+    write(src / 'image_2.tif', 'image 2 changed')
+    os.remove(src / 'image_3.tif')
+    _, changed, removed = folder_sync.sync_folder(src, dst, manifest)
+    assert changed == ['image_2.tif']
+    assert removed == ['image_3.tif']
+    assert (dst / 'image_2.tif').read_text() == 'image 2 changed'
+    assert (dst / 'image_3.tif').exists()
+
+
+def test_sync_folder_keeps_differing_files(tmp_path, caplog):
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    src.mkdir()
+    dst.mkdir()
+    manifest = str(dst / '.manifest.json')
+    write(src / 'image_0.tif', 'image 0')
+    write(src / 'image_1.tif', 'image 1')
+    # in the upload before the first sync, with a different content
+    write(dst / 'image_0.tif', 'image 0 edited')
+
+    for _ in range(2):
+        caplog.clear()
+        names, changed, _ = folder_sync.sync_folder(src, dst, manifest)
+        assert sorted(names) == ['image_0.tif', 'image_1.tif']
+        assert (dst / 'image_0.tif').read_text() == 'image 0 edited'
+        assert len(caplog.records) == 1
+        assert 'image_0.tif' in caplog.records[0].getMessage()
+    assert changed == []
+
+    os.remove(dst / 'image_0.tif')
+    assert folder_sync.sync_folder(src, dst, manifest)[1] == ['image_0.tif']
+    assert (dst / 'image_0.tif').read_text() == 'image 0'
+
+
+def test_sync_folder_resumes_after_interruption(tmp_path, monkeypatch):
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    src.mkdir()
+    dst.mkdir()
+    manifest = str(dst / '.manifest.json')
+    for k in range(10):
+        write(src / f'image_{k}.tif', f'image {k}')
+
+    copy_file = folder_sync.copy_file
+    copied = []
+
+    def failing_copy_file(source, destination):
+        if len(copied) == 6:
+            raise OSError('worker died')
+        copy_file(source, destination)
+        copied.append(os.path.basename(destination))
+
+    monkeypatch.setattr(folder_sync, 'copy_file', failing_copy_file)
+    with pytest.raises(OSError):
+        folder_sync.sync_folder(src, dst, manifest, save_every=4)
+    monkeypatch.setattr(folder_sync, 'copy_file', copy_file)
+
+    assert len(folder_sync.read_manifest(manifest)) == 4
+    _, changed, _ = folder_sync.sync_folder(src, dst, manifest)
+    assert sorted(copied[4:] + changed) == sorted(
+        set(f'image_{k}.tif' for k in range(10)) - set(copied[:4])
+    )
+    assert len(changed) == 4
+    assert not [name for name in os.listdir(dst) if name.endswith('.part')]
@@ -0,0 +1,46 @@
+import time
+
+from baseclasses.helper.formula_normalizer import (
+    PerovskiteFormulaNormalizer,
+    normalize_formula,
+)
+
+
+def test_clean_formula():
+    assert PerovskiteFormulaNormalizer('MAPbI').clean_formula() == (
+        'H6Pb1C1I3N1',
+        ['C', 'H', 'I', 'N', 'Pb'],
+    )
+    assert PerovskiteFormulaNormalizer('(PEA)2PbI4').clean_formula() == (
+        'H24Pb1C16I4N2',
+        ['C', 'H', 'I', 'N', 'Pb'],
+    )
+    assert PerovskiteFormulaNormalizer('CsPbI3').clean_formula() == (
+        'Cs1Pb1I3',
+        ['Cs', 'I', 'Pb'],
+    )
+    assert PerovskiteFormulaNormalizer('(PGA)PbI3').clean_formula() is None
+    assert PerovskiteFormulaNormalizer('FA(').clean_formula() == (None, None)
+
+
+def test_clean_formula_benchmark():
+    cations = ['FA', 'MA', 'Cs', 'PEA', 'BA', 'GA', 'EA', 'Rb']
+    formulas = [
+        f'{a}{x / 10:.1f}{b}{1 - x / 10:.1f}Pb(I{y / 10:.1f}Br{1 - y / 10:.1f})3'
+        for a in cations
+        for b in cations
+        for x in range(1, 10)
+        for y in range(1, 10, 2)
+    ]
+    normalize_formula.cache_clear()
+
+    start = time.perf_counter()
+    results = [
+        PerovskiteFormulaNormalizer(formulas[k % len(formulas)]).clean_formula()
+        for k in range(100_000)
+    ]
+    duration = time.perf_counter() - start
+
+    assert len(results) == 100_000
+    assert all(result[0] is not None for result in results)
+    assert duration < 30
@@ -0,0 +1,87 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from baseclasses.chemical_energy.cesample import get_next_project_sample_number
+from baseclasses.helper.id_allocator import (
+    SearchIDAllocator,
+    SQLiteIDAllocator,
+    project_sample_numbers,
+)
+
+EXISTING = [('existing_1', 1), ('existing_2', 7)]
+
+
+def scan():
+    return EXISTING
+
+
+def allocate(path, worker, n_entries):
+    allocator = SQLiteIDAllocator(path)
+    return [
+        (entry_id, allocator.next_id('HZB_Project_MaMu', entry_id, scan))
+        for entry_id in [f'entry_{worker}_{k}' for k in range(n_entries)]
+    ]
+
+
+def test_sqlite_allocator_seeds_once_and_repeats_numbers(tmp_path):
+    path = str(tmp_path / 'lab_ids.sqlite')
+    scans = []
+
+    def counting_scan():
+        scans.append(1)
+        return EXISTING
+
+    allocator = SQLiteIDAllocator(path)
+    assert allocator.next_id('prefix', 'existing_1', counting_scan) == 1
+    assert allocator.next_id('prefix', 'new_1', counting_scan) == 8
+    assert allocator.next_id('prefix', 'new_2', counting_scan) == 9
+    assert allocator.next_id('prefix', 'new_1', counting_scan) == 8
+    assert allocator.next_id('other', 'new_1', counting_scan) == 8
+    assert len(scans) == 2
+
+    assert not allocator.reserve('prefix', 'new_3', 9, counting_scan)
+    assert allocator.reserve('prefix', 'new_3', 20, counting_scan)
+    assert allocator.next_id('prefix', 'new_4', counting_scan) == 21
+
+    assert SearchIDAllocator().next_id('prefix', 'new_1', scan) == 8
+    assert SearchIDAllocator().next_id('prefix', 'existing_1', scan) == 1
+
+
+def test_sqlite_allocator_parallel_no_duplicates(tmp_path):
+    path = str(tmp_path / 'lab_ids.sqlite')
+    n_workers, n_entries = 8, 50
+
+    with ProcessPoolExecutor(n_workers) as executor:
+        results = executor.map(
+            allocate, [path] * n_workers, range(n_workers), [n_entries] * n_workers
+        )
+        allocations = [allocation for result in results for allocation in result]
+
+    numbers = [number for _, number in allocations]
+    assert len(allocations) == n_workers * n_entries
+    assert len(set(numbers)) == len(numbers)
+    assert sorted(numbers) == list(range(8, 8 + n_workers * n_entries))
+
+
+def test_search_allocator_only_reuses_the_first_lab_id():
+    data = [
+        {'entry_id': 'a', 'results': {'eln': {'lab_ids': ['P_0003', 'P']}}},
+        {'entry_id': 'b', 'results': {'eln': {'lab_ids': ['P_x', 'P_0005', 'P']}}},
+        {'entry_id': 'c', 'results': {'eln': {'lab_ids': ['P_12', 'P_0002']}}},
+    ]
+    numbers = project_sample_numbers(data)
+    assert numbers == [('a', 3), (None, 5), (None, 2)]
+
+    for entry_id in ['a', 'b', 'c', 'new']:
+        assert SearchIDAllocator().next_id(
+            'P', entry_id, lambda: numbers
+        ) == get_next_project_sample_number(data, entry_id)
+    assert SearchIDAllocator().next_id('P', 'b', lambda: numbers) == 6
+
+
+def test_sqlite_allocator_seeds_other_lab_ids_as_used(tmp_path):
+    data = [
+        {'entry_id': 'a', 'results': {'eln': {'lab_ids': ['P_x', 'P_0004']}}},
+    ]
+    allocator = SQLiteIDAllocator(str(tmp_path / 'lab_ids.sqlite'))
+    assert allocator.next_id('P', 'a', lambda: project_sample_numbers(data)) == 5
+    assert allocator.next_id('P', 'a', lambda: project_sample_numbers(data)) == 5
@@ -0,0 +1,64 @@
+import h5py
+import numpy as np
+
+from baseclasses.characterizations.electron_microscopy.TEM_Lambda_750k_detector import (
+    TEM_lambda750k,
+    get_block_frames,
+    integrate_frames,
+)
+
+
+def test_integrate_frames_in_blocks(tmp_path):
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 1000, size=(37, 3, 8, 6), dtype=np.uint16)
+    with h5py.File(tmp_path / 'frames.nxs', 'w') as f:
+        f.create_dataset('data', data=data, chunks=(2, 3, 8, 6))
+
+    with h5py.File(tmp_path / 'frames.nxs', 'r') as f:
+        dataset = f['data']
+        # 2 frames per chunk, 3 * 8 * 6 * 2 bytes per entry of the first axis
+        assert get_block_frames(dataset, block_size=1200) == 4
+        total, mean, maximum, intensities = integrate_frames(dataset, block_size=1200)
+
+    frames = data.reshape(-1, 8, 6).astype(np.float64)
+    assert np.array_equal(total, frames.sum(axis=0))
+    assert np.allclose(mean, frames.mean(axis=0))
+    assert np.array_equal(maximum, frames.max(axis=0))
+    assert np.array_equal(intensities, frames.sum(axis=(1, 2)))
+
+
+def test_integrate_frames_reads_bounded_blocks():
+    class Dataset:
+        shape = (100_000, 16, 16)
+        chunks = (10, 16, 16)
+        dtype = np.dtype(np.uint32)
+
+        def __init__(self):
+            self.reads = []
+
+        def __getitem__(self, item):
+            start, stop = item.start, min(item.stop, self.shape[0])
+            self.reads.append(stop - start)
+            return np.ones((stop - start, *self.shape[1:]), dtype=self.dtype)
+
+    dataset = Dataset()
+    total, _, maximum, intensities = integrate_frames(dataset, block_size=1024**2)
+
+    assert max(dataset.reads) * 16 * 16 * 4 <= 1024**2
+    assert max(dataset.reads) % 10 == 0
+    assert sum(dataset.reads) == 100_000
+    assert np.all(total == 100_000)
+    assert np.all(maximum == 1)
+    assert len(intensities) == 100_000
+
+
+def test_get_data_logs_unreadable_files(tmp_path, caplog, capsys):
+    file_name = str(tmp_path / 'incomplete.nxs')
+    with h5py.File(file_name, 'w') as f:
+        f.create_dataset('/entry/instrument/detector/data', data=np.zeros((1, 2, 2)))
+
+    assert TEM_lambda750k.get_data(file_name) is None
+    assert not capsys.readouterr().out
+    assert len(caplog.records) == 1
+    assert 'incomplete.nxs' in caplog.records[0].getMessage()
+    assert caplog.records[0].exc_info
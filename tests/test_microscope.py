@@ -0,0 +1,108 @@
+import os
+import threading
+import types
+
+from baseclasses.characterizations.electron_microscopy import microscope
+
+
+class Context:
+    def __init__(self, raw_dir, local):
+        self.raw_dir = raw_dir
+        self.local = local
+        self.opened = []
+        self.upload_files = self
+
+    def raw_file_object(self, image):
+        path = os.path.join(self.raw_dir, image)
+        return types.SimpleNamespace(os_path=path if image in self.local else None)
+
+    def raw_file(self, image, mode):
+        self.opened.append(image)
+        return open(os.path.join(self.raw_dir, image), mode)
+
+
+def test_read_images_in_order_and_once(tmp_path):
+    images = [f'image_{k}.tif' for k in range(10)]
+    for image in images:
+        (tmp_path / image).write_bytes(image.encode())
+    context = Context(str(tmp_path), local=set(images[::2]))
+    archive = types.SimpleNamespace(m_context=context)
+
+    calls = []
+
+    def get_data(file_name, original_file_name=None):
+        with open(file_name, 'rb') as f:
+            content = f.read().decode()
+        calls.append((content, threading.current_thread()))
+        return content
+
+    results = microscope.read_images(archive, get_data, images)
+
+    assert results == images
+    assert [content for content, _ in calls] == images
+    assert {thread for _, thread in calls} == {threading.current_thread()}
+    # only the files that are not on the local file system are copied
+    assert sorted(context.opened) == sorted(images[1::2])
+
+
+def test_load_signal_is_lazy(tmp_path):
+    import dask.array as da
+    import hyperspy.api as hs
+    import numpy as np
+
+    file_name = str(tmp_path / 'image.hspy')
+    hs.signals.Signal2D(np.arange(64 * 48, dtype=np.uint16).reshape(48, 64)).save(
+        file_name
+    )
+
+    signal = microscope.load_signal(file_name)
+    assert signal._lazy
+    assert isinstance(signal.data, da.Array)
+    assert signal.axes_manager.signal_shape == (64, 48)
+
+
+class ZeissSignal:
+    original_metadata = {
+        'CZ_SEM': {
+            'dp_image_store': ('Store resolution', '1024 * 768'),
+            'ap_date': ('Date', '02 Jan 2024'),
+            'ap_time': ('Time', '10:11:12'),
+            'dp_detector_type': ('Detector', 'SE2'),
+        }
+    }
+
+    def __init__(self):
+        self.saved = []
+
+    @property
+    def data(self):
+        raise AssertionError('the pixel data is not needed')
+
+    def save(self, file_name, overwrite=None):
+        self.saved.append(file_name)
+        with open(file_name, 'wb') as f:
+            f.write(b'png')
+
+
+def test_zeiss_preview_is_written_once(tmp_path, monkeypatch):
+    from baseclasses.characterizations.electron_microscopy import SEM_Zeiss_detector
+
+    signals = []
+
+    def load_signal(file_name):
+        signals.append(ZeissSignal())
+        return signals[-1]
+
+    monkeypatch.setattr(SEM_Zeiss_detector, 'load_signal', load_signal)
+    file_name = str(tmp_path / 'image.tif')
+    get_data = SEM_Zeiss_detector.SEM_Microscope_Merlin.get_data
+
+    image = get_data(file_name, file_name)
+    assert image.detector == 'SE2'
+    assert image.store_resolution_x.magnitude == 1024
+    assert image.image_preview == 'image_preview.png'
+    assert signals[0].saved == [str(tmp_path / 'image_preview.png')]
+
+    image = get_data(file_name, file_name)
+    assert image.image_preview == 'image_preview.png'
+    assert signals[1].saved == []
@@ -0,0 +1,87 @@
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from baseclasses.helper.file_parser.parse_files_pecvd_pvcomb import (
+    parse_log,
+    parse_recipe,
+    parse_time_diff,
+)
+from baseclasses.vapour_based_deposition.plasma_enhanced_physical_vapour_deposition import (  # noqa: E501
+    PECVDProcess,
+)
+
+RECIPE = """  // PC2_rPower[0] = 100
+PC2_rProcPressure[0] = 2.5 // ubar
+PC2_rPower[0]\t=\t300
+PC2_rSetpHub[0] = 12
+PC2_iTimeProcess[0] = 600
+PC2_rSetpointSiH4[0] = 10.5
+PC2_rSetpointH2[0] = 0
+PC2_rSetpointXe[0] = 3
+"""
+
+
+def test_parse_recipe():
+    process = PECVDProcess()
+    parse_recipe(io.StringIO(RECIPE), process)
+
+    assert process.pressure.magnitude == 2.5
+    assert process.power.magnitude == 300
+    assert process.plate_spacing.magnitude == 12
+    assert process.time.magnitude == 600
+    assert [(gas.gas_str, gas.gas_flow_rate.magnitude) for gas in process.gases] == [
+        ('SiH4', 10.5)
+    ]
+
+
+def test_parse_time_diff():
+    values = pd.Series([' 00:00:01.5', '01:02:03'])
+    assert np.array_equal(parse_time_diff(values), [1.5, 3723.0])
+
+    values = pd.Series([' 00:00:01.5', np.nan, '1 days 00:00:02'])
+    expected = pd.to_timedelta(values.str.strip()) / np.timedelta64(1, 's')
+    assert np.array_equal(parse_time_diff(values), expected, equal_nan=True)
+    assert np.isnan(parse_time_diff(values)[1])
+
+
+def test_parse_log_benchmark(tmp_path):
+    # five hours at 10 Hz
+    rows = 180_000
+    rng = np.random.default_rng(0)
+    seconds = np.arange(rows) / 10
+    power_set = np.where((seconds > 100) & (seconds < 110), 300, 50)
+    power = rng.normal(50, 2, rows).round(3)
+    temperature = rng.normal(200, 1, rows).round(2)
+    pressure = rng.normal(2, 0.1, rows).round(4)
+    path = tmp_path / 'log.txt'
+    with open(path, 'w') as f:
+        f.write(
+            'TimeDiff\tDETAIL_PC2.PC2_RFG.SETP\tDETAIL_PC2.PC2_RFG.ACTVALUE\t'
+            'DETAIL_PC2.PC2_HT1.TEMP\tDETAIL_PC2.PC2_BG.OUTPUT\tOTHER\n'
+        )
+        for k in range(rows):
+            t = seconds[k]
+            values = f'{power_set[k]}\t{power[k]}\t{temperature[k]}\t{pressure[k]}'
+            f.write(
+                f' {int(t // 3600):02d}:{int(t // 60) % 60:02d}:{t % 60:06.3f}\t'
+                + values.replace('.', ',')
+                + '\tmanual\n'
+            )
+
+    start = time.perf_counter()
+    with open(path) as f:
+        data = parse_log(f, None, time=600, shift=30)
+    duration = time.perf_counter() - start
+
+    ignite = np.flatnonzero(power_set == 300)[-1]
+    window = slice(ignite + 30, ignite + 630)
+    assert np.allclose(data.time.magnitude, seconds)
+    assert np.allclose(data.pressure.magnitude, pressure)
+    assert np.isclose(data.power_mean.magnitude, power[window].mean())
+    assert np.isclose(data.power_var.magnitude, power[window].var(ddof=1))
+    assert np.isclose(data.temperature_var.magnitude, temperature[window].var(ddof=1))
+    assert np.isclose(data.pressure_mean.magnitude, pressure[window].mean())
+    assert duration < 5
@@ -0,0 +1,49 @@
+import numpy as np
+
+from baseclasses.helper import plotly_plots
+from baseclasses.helper.plotly_plots import (
+    cached_figure,
+    decimate,
+    make_xas_plot,
+    minmax_indices,
+)
+
+
+def test_decimate_keeps_extrema():
+    x = np.linspace(0, 10, 100_000)
+    y = np.sin(x)
+    y[31_415] = 5.0
+    y[71_828] = -5.0
+
+    trace_x, trace_y = decimate(x, y, max_points=500)
+    assert len(trace_x) == 500
+    assert trace_x[0] == x[0] and trace_x[-1] == x[-1]
+    assert np.all(np.diff(trace_x) > 0)
+    assert trace_y.max() == 5.0 and trace_y.min() == -5.0
+
+    indices = minmax_indices(y, 500)
+    assert len(indices) <= 500
+    assert 31_415 in indices and 71_828 in indices
+
+    short_x, short_y = decimate(None, y[:10])
+    assert np.array_equal(short_x, np.arange(10))
+    assert np.array_equal(short_y, y[:10])
+
+
+def test_cached_figure_builds_once():
+    calls = []
+
+    def build(title, x, y):
+        calls.append(title)
+        return make_xas_plot(title, x, 'Energy', [y], 'µ')
+
+    x = np.linspace(0, 1, 50_000)
+    y = x**2
+    first = cached_figure(build, 'cached', x, y)
+    second = cached_figure(build, 'cached', x, y.copy())
+    assert calls == ['cached']
+    assert first == second
+    assert len(first['data'][0]['x']) <= plotly_plots.MAX_PLOT_POINTS
+
+    cached_figure(build, 'cached', x, y + 1)
+    assert calls == ['cached', 'cached']
@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+from baseclasses.helper import sdd_dead_time
+from baseclasses.helper.sdd_dead_time import (
+    FAILED_FIT,
+    fit_dead_time,
+    fit_dead_time_channels,
+)
+
+
+def make_channels(channels=13, points=2000, saturation=(0.2, 1)):
+    """Channels with k * max(ICR) in the range saturation."""
+    rng = np.random.default_rng(1)
+    icr = np.sort(rng.uniform(1000, 200_000, (channels, points)), axis=1)
+    a = rng.uniform(2e5, 5e5, channels)
+    k = rng.uniform(*saturation, channels) / 200_000
+    noise = rng.normal(1, 0.01, (channels, points))
+    return icr, a[:, None] * (1 - np.exp(-k[:, None] * icr)) * noise
+
+
+def test_fit_dead_time_matches_curve_fit():
+    icr, ocr = make_channels()
+    ocr[5, 7] = np.nan
+
+    a, k = fit_dead_time(icr, ocr)
+
+    for channel in range(len(icr)):
+        if channel == 5:
+            assert (a[channel], k[channel]) == FAILED_FIT
+            continue
+        (a_ref, k_ref), _ = curve_fit(
+            lambda x, a, k: a * (1 - np.exp(-k * x)),
+            icr[channel],
+            ocr[channel],
+            p0=(ocr[channel].max(), 1e-5),
+            maxfev=10000,
+        )
+        assert np.isclose(a[channel] * k[channel], a_ref * k_ref, rtol=1e-6)
+
+
+def model(x, a, k):
+    return a * (1 - np.exp(-k * x))
+
+
+def test_fit_dead_time_weak_saturation():
+    # saturating and hardly saturating channels are fitted together
+    icr, ocr = make_channels(40, saturation=(0.01, 0.06))
+    icr[::4], ocr[::4] = make_channels(10)
+
+    a, k = fit_dead_time(icr, ocr)
+
+    for channel in range(len(icr)):
+        (a_ref, k_ref), _ = curve_fit(
+            model,
+            icr[channel],
+            ocr[channel],
+            p0=(ocr[channel].max(), 1e-5),
+            maxfev=10000,
+        )
+        cost = ((ocr[channel] - model(icr[channel], a[channel], k[channel])) ** 2).sum()
+        cost_ref = ((ocr[channel] - model(icr[channel], a_ref, k_ref)) ** 2).sum()
+        assert cost <= cost_ref * (1 + 1e-9)
+        assert np.isclose(a[channel] * k[channel], a_ref * k_ref, rtol=1e-4)
+
+
+def test_fit_dead_time_channels_benchmark(monkeypatch):
+    icr, ocr = make_channels()
+    channels = list(zip(icr, ocr))
+    fits = []
+    monkeypatch.setattr(
+        sdd_dead_time,
+        'fit_dead_time',
+        lambda *args: fits.append(len(args[0])) or fit_dead_time(*args),
+    )
+
+    start = time.perf_counter()
+    first = fit_dead_time_channels(channels)
+    duration = time.perf_counter() - start
+    assert fit_dead_time_channels(channels[3:5]) == first[3:5]
+    assert fits == [13]
+    assert duration < 1
@@ -0,0 +1,71 @@
+import sys
+import threading
+import types
+
+from baseclasses.helper import utilities
+
+
+class Archive:
+    def __init__(self, upload_id='upload'):
+        self.metadata = types.SimpleNamespace(
+            upload_id=upload_id,
+            main_author=types.SimpleNamespace(user_id='user'),
+        )
+
+
+def stub_search(monkeypatch, hits):
+    queries = []
+
+    def search(owner, query, user_id):
+        queries.append(query)
+        return types.SimpleNamespace(
+            data=list(hits.get(query['results.eln.lab_ids'], []))
+        )
+
+    monkeypatch.setitem(
+        sys.modules, 'nomad.search', types.SimpleNamespace(search=search)
+    )
+    return queries
+
+
+def test_search_cache_hits_and_scope(monkeypatch):
+    queries = stub_search(monkeypatch, {'sample_1': [{'entry_id': 'entry_1'}]})
+    cache = utilities.SearchCache()
+    assert cache.stats() == dict(size=0, entries=0, lab_ids=0, hits=0, misses=0)
+
+    archive = Archive()
+    query = {'results.eln.lab_ids': 'sample_1'}
+    assert cache.search(archive, query).data == [{'entry_id': 'entry_1'}]
+    assert cache.search(archive, dict(query)).data == [{'entry_id': 'entry_1'}]
+    assert len(queries) == 1
+    assert cache.stats()['hits'] == 1
+
+    # searches without hits are repeated
+    missing = {'results.eln.lab_ids': 'sample_2'}
+    cache.search(archive, missing)
+    cache.search(archive, missing)
+    assert len(queries) == 3
+
+    # the next processing run of the same upload searches again
+    cache.search(Archive(), query)
+    assert len(queries) == 4
+
+    cache.invalidate()
+    cache.search(archive, query)
+    cache.search(archive, query)
+    assert len(queries) == 5
+
+
+def test_search_cache_per_thread(monkeypatch):
+    queries = stub_search(monkeypatch, {'sample_1': [{'entry_id': 'entry_1'}]})
+    cache = utilities.SearchCache()
+    archive = Archive()
+    query = {'results.eln.lab_ids': 'sample_1'}
+    cache.search(archive, query)
+
+    thread = threading.Thread(target=cache.search, args=(archive, query))
+    thread.start()
+    thread.join()
+    assert len(queries) == 2
+    cache.search(archive, query)
+    assert len(queries) == 2
@@ -0,0 +1,198 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseclasses import PubChemPureSubstanceSectionCustom
+from baseclasses.helper.solar_cell_batch_mapping import (
+    SolutionColumnIndex,
+    get_datetime,
+    get_datetime_column,
+    get_solution_column_index,
+    get_value,
+    map_basic_sample,
+    map_basic_samples,
+    map_solutions,
+    map_substrates,
+)
+from baseclasses.solar_energy import SolcarCellSample, Substrate
+from baseclasses.solution import Solution, SolutionChemical
+
+
+def test_get_datetime_column_strict_and_lenient():
+    data = pd.DataFrame(
+        {'Date': ['01-02-2024', '03-04-2024', np.nan, '2024-05-06', 'no date']}
+    )
+
+    lenient, unmatched = get_datetime_column(data, 'Date')
+    assert lenient == [get_datetime(row, 'Date') for _, row in data.iterrows()]
+    assert lenient[:3] == [
+        '2024-02-01 00:00:00.000000',
+        '2024-04-03 00:00:00.000000',
+        None,
+    ]
+    assert lenient[3] == '2024-05-06 00:00:00.000000'
+    assert lenient[4] is None
+    assert unmatched == {3: '2024-05-06', 4: 'no date'}
+
+    strict, strict_unmatched = get_datetime_column(data, 'Date', strict=True)
+    assert strict == lenient[:3] + [None, None]
+    assert strict_unmatched == unmatched
+
+
+def test_get_datetime_column_mixed_and_missing():
+    mixed = pd.DataFrame(
+        {'Date': ['2024-01-02 10:11:12', '05.06.2024', '07/08/24', '2024-01-03']}
+    )
+    dates, _ = get_datetime_column(mixed, 'Date')
+    assert dates == [get_datetime(row, 'Date') for _, row in mixed.iterrows()]
+    assert None not in dates
+
+    empty = pd.DataFrame({'Date': [np.nan, np.nan]})
+    assert get_datetime_column(empty, 'Date') == ([None, None], {})
+    assert get_datetime_column(empty, 'Other') == ([None, None], {})
+
+    timestamps = pd.DataFrame({'Date': pd.to_datetime(['2024-01-02', None])})
+    assert get_datetime_column(timestamps, 'Date') == (
+        ['2024-01-02 00:00:00.000000', None],
+        {},
+    )
+
+
+def test_map_basic_samples_matches_map_basic_sample():
+    data = pd.DataFrame(
+        {
+            'Nomad ID': ['sample_1', 'sample_2', 'sample_3'],
+            'Date': ['01-02-2024', np.nan, '2024-05-06'],
+            'Variation': ['a', 'b', 'c'],
+            'Number of junctions': [1, 2, 1],
+        }
+    )
+    substrates = ['substrate_1', None, 'substrate_1']
+
+    samples = map_basic_samples(data, substrates, 'upload_id', SolcarCellSample)
+    for (lab_id, archive), (_, row), substrate in zip(
+        samples, data.iterrows(), substrates
+    ):
+        expected_id, expected = map_basic_sample(
+            row, substrate, 'upload_id', SolcarCellSample
+        )
+        assert lab_id == expected_id
+        assert archive.m_to_dict() == expected.m_to_dict()
+
+
+def test_unmatched_dates_are_logged(caplog):
+    data = pd.DataFrame(
+        {
+            'Nomad ID': ['sample_1', 'sample_2', 'sample_3'],
+            'Date': ['01-02-2024', '2024-05-06', '03-04-2024'],
+        }
+    )
+
+    with caplog.at_level(logging.WARNING):
+        samples = map_basic_samples(data, [None] * 3, 'upload_id', SolcarCellSample)
+    assert samples[1][1].datetime is not None
+    assert len(caplog.records) == 1
+    assert 'row 1: "2024-05-06"' in caplog.records[0].getMessage()
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        substrates = map_substrates(data, Substrate, strict=True)
+    assert substrates[1].datetime is None
+    assert len(caplog.records) == 1
+    assert 'are not set: row 1: "2024-05-06"' in caplog.records[0].getMessage()
+
+
+def legacy_map_solutions(data):
+    """map_solutions before the column index, with a lookup for every cell."""
+    slots = {'solvent': set(), 'solute': set(), 'additive': set()}
+    for col in data.index:
+        for kind, kind_slots in slots.items():
+            if col.lower().startswith(kind):
+                kind_slots.add(' '.join(col.split(' ')[:2]))
+
+    def chemical(slot, name_keys):
+        solvent = slot.startswith('Solvent')
+        return SolutionChemical(
+            chemical_2=PubChemPureSubstanceSectionCustom(
+                name=get_value(data, name_keys, None, False), load_data=False
+            ),
+            chemical_volume=get_value(data, f'{slot} volume [uL]', None, unit='uL')
+            if solvent
+            else None,
+            concentration_mol=None
+            if solvent
+            else get_value(data, f'{slot} Concentration [mM]', None, unit='mM'),
+            concentration_mass=None
+            if solvent
+            else get_value(
+                data,
+                [f'{slot} Concentration [wt%]', f'{slot} Concentration [mg/ml]'],
+                None,
+                unit=['mg/ml', 'mg/ml'],
+                factor=[10, 1],
+            ),
+            amount_relative=get_value(data, f'{slot} relative amount', None),
+            chemical_id=get_value(data, f'{slot} chemical ID', None, False),
+        )
+
+    return Solution(
+        solvent=[chemical(s, f'{s} name') for s in sorted(slots['solvent'])],
+        solute=[
+            chemical(s, [f'{s} type', f'{s} name']) for s in sorted(slots['solute'])
+        ],
+        additive=[chemical(s, [f'{s} name']) for s in sorted(slots['additive'])],
+    )
+
+
+def test_map_solutions_matches_cell_lookup():
+    rows = pd.DataFrame(
+        {
+            'Solvent 1 name': ['DMF', 'DMSO'],
+            'Solvent 1 volume [uL]': [100, np.nan],
+            'Solvent 1 Concentration [mM]': [1.0, 2.0],
+            'Solvent 2 name': ['GBL', np.nan],
+            'Solvent 2 relative amount': [0.2, 0.8],
+            'Solute 1 type': ['PbI2', np.nan],
+            'Solute 1 name': ['lead iodide', 'CsI'],
+            'Solute 1 Concentration [mM]': [1.2, 1.5],
+            'Solute 2 name': ['FAI', 'MABr'],
+            'Solute 2 Concentration [wt%]': [np.nan, 3.0],
+            'Solute 2 Concentration [mg/ml]': [20.0, 30.0],
+            'Solute 2 chemical ID': ['id 1', np.nan],
+            'Additive 1 name': ['MACl', np.nan],
+            'Additive 1 Concentration [mg/ml]': [5.0, 6.0],
+            'Additive 1 volume [uL]': [7.0, 8.0],
+        }
+    )
+    for _, row in rows.iterrows():
+        assert map_solutions(row).m_to_dict() == legacy_map_solutions(row).m_to_dict()
+
+
+def test_solution_column_index_errors(caplog):
+    columns = (
+        'Solvent 1 name',
+        'Solvent 1 supplier',
+        'Solute 1 Concentration [mM]',
+        'Additive 1 name',
+    )
+    index = SolutionColumnIndex(columns)
+    assert index.errors == [
+        'Unknown solvent column "Solvent 1 supplier"',
+        'Solute 1 has no name column',
+    ]
+    assert [slot.slot for slot in index.solute] == ['Solute 1']
+    with pytest.raises(ValueError, match='Solvent 1 supplier'):
+        index.validate(strict=True)
+
+    with caplog.at_level(logging.WARNING):
+        get_solution_column_index(columns)
+        get_solution_column_index(list(columns))
+    assert len(caplog.records) == 1
+    assert 'Solute 1 has no name column' in caplog.records[0].getMessage()
+
+    caplog.clear()
+    SolutionColumnIndex(('Solvent 1 name', 'Solute 1 type')).validate(strict=True)
+    get_solution_column_index(('Solvent 1 name', 'Solute 1 type'))
+    assert not caplog.records
@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from baseclasses.helper import solar_cell_batch_mapping, solar_cell_batch_schema
+from baseclasses.wet_chemical_deposition.spin_coating import SpinCoating
+
+UPLOAD_ID = 'upload_id'
+
+
+def spin_coating_step(n_rows, n_variations):
+    return pd.DataFrame(
+        {
+            'Material name': [f'Material {k % n_variations}' for k in range(n_rows)],
+            'Layer type': ['Absorber Layer'] * n_rows,
+            'Tool/GB name': ['GB 1'] * n_rows,
+            'Notes': [np.nan] * n_rows,
+            'Layer thickness [nm]': [500] * n_rows,
+            'Solvent 1 name': ['DMF'] * n_rows,
+            'Solvent 1 volume [uL]': [100] * n_rows,
+            'Solute 1 type': ['PbI2'] * n_rows,
+            'Solute 1 Concentration [mM]': [1.2] * n_rows,
+            'Solution volume [uL]': [50] * n_rows,
+            'Rotation speed [rpm]': [1000.0 * (k % 3) for k in range(n_rows)],
+            'Rotation time [s]': [30] * n_rows,
+            'Rotation time 1 [s]': [np.nan] * n_rows,
+            'Annealing temperature [°C]': [100] * n_rows,
+            'Annealing time [min]': [10] * n_rows,
+            'Anti solvent name': ['CB' if k % 2 else np.nan for k in range(n_rows)],
+            'Anti solvent volume [ml]': [0.1] * n_rows,
+            'Gas': ['N2'] * n_rows,
+            'Room temperature [°C]': [21] * n_rows,
+        }
+    )
+
+
+def test_map_step_matches_map_functions():
+    step = spin_coating_step(12, 4)
+    lab_ids = [f'sample_{k}' for k in range(len(step))]
+
+    expected = []
+    for j, row in step.drop_duplicates().iterrows():
+        row_lab_ids = [
+            lab_id
+            for lab_id, (_, other) in zip(lab_ids, step.iterrows())
+            if other.astype('object').equals(row.astype('object'))
+        ]
+        expected.append(
+            solar_cell_batch_mapping.map_spin_coating(
+                2, j, row_lab_ids, row, UPLOAD_ID, SpinCoating
+            )
+        )
+
+    actual = solar_cell_batch_schema.map_step(
+        solar_cell_batch_schema.ProcessStep(2, step, lab_ids, UPLOAD_ID),
+        SpinCoating,
+        solar_cell_batch_schema.PROCESS_SCHEMAS['spin_coating'],
+    )
+
+    assert [file_name for file_name, _ in actual] == [
+        file_name for file_name, _ in expected
+    ]
+    for (_, archive), (_, expected_archive) in zip(actual, expected):
+        assert archive.m_to_dict() == expected_archive.m_to_dict()
+
+
+def test_map_sheet_benchmark():
+    n_rows, n_steps = 500, 40
+    steps = {
+        f'{i + 1} Spin Coating': spin_coating_step(n_rows, 5) for i in range(n_steps)
+    }
+    sheet = pd.concat(
+        {
+            'Experiment Info': pd.DataFrame(
+                {'Nomad ID': [f'sample_{k}' for k in range(n_rows)]}
+            ),
+            **steps,
+        },
+        axis=1,
+    )
+
+    start = time.perf_counter()
+    archives = solar_cell_batch_schema.map_sheet(
+        sheet, UPLOAD_ID, {'spin_coating': SpinCoating}
+    )
+    duration = time.perf_counter() - start
+
+    assert len(archives) == n_steps * 30
+    assert sum(len(archive.samples) for _, archive in archives) == n_steps * n_rows
+    assert duration < 30
+
+
+def test_map_sheet_dicts_parallel_matches_serial():
+    n_rows = 40
+    sheet = pd.concat(
+        {
+            'Experiment Info': pd.DataFrame(
+                {'Nomad ID': [f'sample_{k}' for k in range(n_rows)]}
+            ),
+            '1 Spin Coating': spin_coating_step(n_rows, 3),
+            '2 Spin Coating': spin_coating_step(n_rows, 7),
+        },
+        axis=1,
+    )
+    process_classes = {'spin_coating': SpinCoating}
+
+    serial = solar_cell_batch_schema.map_sheet_dicts(sheet, UPLOAD_ID, process_classes)
+    parallel = solar_cell_batch_schema.map_sheet_dicts(
+        sheet,
+        UPLOAD_ID,
+        process_classes,
+        pool=solar_cell_batch_schema.ShardPool(2, shard_size=9),
+    )
+
+    assert parallel == serial
+    assert [archive for _, archive in serial] == [
+        archive.m_to_dict(with_root_def=True)
+        for _, archive in solar_cell_batch_schema.map_sheet(
+            sheet, UPLOAD_ID, process_classes
+        )
+    ]
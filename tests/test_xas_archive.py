@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from baseclasses.characterizations.xas import XASWithSDD
+from baseclasses.helper.archive_builder.xas_archive import (
+    XAS_COLUMNS,
+    get_xas_archive,
+    get_xas_column_map,
+    register_xas_column,
+)
+
+
+def test_get_xas_archive():
+    data = pd.DataFrame(
+        {
+            'mono_eV': [7000.0, 7001.0],
+            'time_ms': [500.0, 500.0],
+            'I0_A': [1.0, 2.0],
+            'I1_A': [3.0, 4.0],
+            'fluo.0': [5.0, 6.0],
+            'ICR.0': [7.0, 8.0],
+            'OCR.12': [9.0, 10.0],
+        }
+    )
+    entry = XASWithSDD()
+    get_xas_archive(data, '# start_time: 2024-05-06 07:08:09.5', entry)
+
+    assert entry.datetime.isoformat() == '2024-05-06T07:08:09.500000+00:00'
+    assert np.allclose(entry.energy.magnitude, [7.0, 7.001])
+    assert np.allclose(entry.seconds.magnitude, [0.5, 0.5])
+    assert np.allclose(entry.k1, [3.0, 4.0])
+    assert entry.k3 is None
+    assert len(entry.sdd_parameters) == 13
+    assert np.allclose(entry.sdd_parameters[0].icr, [7.0, 8.0])
+    assert entry.sdd_parameters[0].ocr is None
+    assert np.allclose(entry.sdd_parameters[12].ocr, [9.0, 10.0])
+
+
+def test_register_xas_column(monkeypatch):
+    monkeypatch.setitem(XAS_COLUMNS, 'k3', list(XAS_COLUMNS['k3']))
+    header = ('energy_keV', 'K0', 'Iref')
+    assert get_xas_column_map(header).quantities == ('k0',)
+
+    register_xas_column('k3', 'Iref')
+    column_map = get_xas_column_map(header)
+    assert column_map.quantities == ('k0', 'k3')
+    assert column_map.indices.tolist() == [1, 2]
+    get_xas_column_map.cache_clear()
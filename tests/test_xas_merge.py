@@ -0,0 +1,109 @@
+import numpy as np
+
+from baseclasses.helper.xas_merge import interpolate_scans, merge_xas_scans
+
+
+def edge(energy, e0):
+    return 0.5 + np.arctan((energy - e0) / 0.002) / np.pi
+
+
+def test_interpolate_scans():
+    energies = [np.array([1.0, 2.0, 3.0]), np.array([3.0, 0.0, 1.5])]
+    values = [np.array([1.0, 2.0, 3.0]), np.array([30.0, 0.0, 15.0])]
+    grid = np.array([1.0, 1.5, 2.5])
+
+    assert np.allclose(
+        interpolate_scans(energies, values, grid), [[1, 1.5, 2.5], [10, 15, 25]]
+    )
+
+
+def test_merge_xas_scans():
+    rng = np.random.default_rng(0)
+    shifts = np.concatenate(([0], rng.uniform(-0.003, 0.003, 29)))
+    energies, absorbances, references = [], [], []
+    for index, shift in enumerate(shifts):
+        energy = np.sort(rng.uniform(8.9, 9.1, 1500 + index))
+        noise = 0.05 if index == 7 else 0.002
+        energies.append(energy)
+        absorbances.append(
+            1.3 * edge(energy + shift, 9.0) + rng.normal(0, noise, len(energy))
+        )
+        references.append(
+            edge(energy + shift, 8.979) + rng.normal(0, 0.002, len(energy))
+        )
+
+    merged = merge_xas_scans(energies, absorbances, references)
+
+    assert np.allclose(merged.shifts, shifts, atol=1e-4)
+    assert merged.rejected.tolist() == [7]
+    starts = [energy[0] + shift for energy, shift in zip(energies, merged.shifts)]
+    assert merged.energy[0] == max(starts)
+    error = merged.absorbance - 1.3 * edge(merged.energy, 9.0)
+    assert np.sqrt(np.mean(error**2)) < 0.001
+    assert np.all(merged.uncertainty < 0.002)
+
+
+class Logger:
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, message, **kwargs):
+        self.warnings.append(message)
+
+
+def make_scans(shifts, reference=True):
+    from baseclasses.characterizations.xas import XASTransmission, XASWithSDD
+
+    rng = np.random.default_rng(1)
+    scans = []
+    for shift in shifts:
+        energy = np.sort(rng.uniform(8.9, 9.1, 1500))
+        absorbance = 1.3 * edge(energy + shift, 9.0) + rng.normal(0, 0.002, 1500)
+        if reference:
+            scan = XASTransmission(
+                energy=energy,
+                absorbance_of_the_reference=edge(energy + shift, 8.979),
+            )
+        else:
+            scan = XASWithSDD(energy=energy)
+        scan.absorbance_of_the_sample = absorbance
+        scans.append(scan)
+    return scans
+
+
+def test_xas_merge_indices_of_skipped_scans():
+    from baseclasses.characterizations.xas import XASMerge, XASTransmission
+
+    scans = make_scans([0, 0.002, -0.001])
+    scans.insert(1, XASTransmission())
+    merge = XASMerge(scans=scans)
+    logger = Logger()
+    merge.normalize(None, logger)
+
+    assert merge.rejected_scans == [1]
+    shifts = merge.energy_shifts.to('keV').magnitude
+    assert np.isnan(shifts[1])
+    assert np.allclose(shifts[[0, 2, 3]], [0, 0.002, -0.001], atol=1e-4)
+    assert len(logger.warnings) == 1
+    assert '[1]' in logger.warnings[0]
+
+
+def test_xas_merge_aligns_only_with_references():
+    from baseclasses.characterizations.xas import XASMerge
+
+    merge = XASMerge(scans=make_scans([0, 0.002], reference=False))
+    logger = Logger()
+    merge.normalize(None, logger)
+    assert logger.warnings == []
+    assert np.array_equal(merge.energy_shifts.magnitude, [0, 0])
+
+    merge = XASMerge(
+        scans=make_scans([0, 0.002], reference=False), align_to_reference=True
+    )
+    merge.normalize(None, logger)
+    assert logger.warnings == ['not all scans have a reference absorbance to align']
+
+    merge = XASMerge(scans=make_scans([0, 0.002]), align_to_reference=False)
+    merge.normalize(None, logger)
+    assert np.array_equal(merge.energy_shifts.magnitude, [0, 0])
+    assert len(logger.warnings) == 1